@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Predict_Learning_Web.settings')
+# Chạy qua ASGI thì dùng các view async (xem urls.py)
+os.environ.setdefault('API_MODE', 'asgi')
 
 application = get_asgi_application()
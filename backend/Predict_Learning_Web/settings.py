@@ -3,6 +3,7 @@ Django settings for Predict_Learning_Web project - MongoDB Only
 """
 
 from pathlib import Path
+import ipaddress
 import os
 from dotenv import load_dotenv
 
@@ -40,34 +41,9 @@ INSTALLED_APPS = [
     'main',
 ]
 
-# Thêm cấu hình cho drf-yasg
-SWAGGER_SETTINGS = {
-    'SECURITY_DEFINITIONS': {
-        'Bearer': {
-            'type': 'apiKey',
-            'name': 'Authorization',
-            'in': 'header'
-        }
-    }
-}
-
-# Tìm INSTALLED_APPS và thêm 'corsheaders' nếu chưa có
-INSTALLED_APPS = [
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    'corsheaders',  # Thêm dòng này
-    'rest_framework',
-    'drf_yasg',
-    'mongoengine',
-    'main',
-]
-
 # Tìm MIDDLEWARE và thêm CORS middleware ở đầu
 MIDDLEWARE = [
+    'main.middleware.MetricsMiddleware',  # đứng đầu để đo cả các middleware phía sau
     'corsheaders.middleware.CorsMiddleware',  # Thêm dòng này ở đầu
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -97,6 +73,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'Predict_Learning_Web.wsgi.application'
+ASGI_APPLICATION = 'Predict_Learning_Web.asgi.application'
+
+# 'wsgi': sync DRF views + mongoengine; 'asgi': async views + motor (set by asgi.py)
+API_MODE = os.getenv('API_MODE', 'wsgi')
 
 # Không sử dụng database SQL
 DATABASES = {
@@ -105,6 +85,18 @@ DATABASES = {
     }
 }
 
+# Password hashing: Argon2 (cost tunable per deployment), older hashes are upgraded on login
+PASSWORD_HASHERS = [
+    'main.hashers.ConfigurableArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '2'))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '102400'))  # KiB
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', '8'))
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -114,38 +106,72 @@ USE_TZ = True
 # Static files
 STATIC_URL = 'static/'
 
+# Cache framework; đổi sang Redis/Memcached để chia sẻ giữa các worker
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'predict-learning',
+    }
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # MongoDB Atlas connection
-import mongoengine
-
 MONGO_DB_USERNAME = os.getenv('MONGO_DB_USERNAME', 'doubleHuy')
 MONGO_DB_PASSWORD = os.getenv('MONGO_DB_PASSWORD', 'doubleHuy224712')
 MONGO_CLUSTER_URL = os.getenv('MONGO_CLUSTER_URL', 'predictlearning.uq08cwt.mongodb.net')
 MONGO_DATABASE_NAME = os.getenv('MONGO_DATABASE_NAME', 'PredictLearning')
 
-# Construct MongoDB Atlas connection string
-MONGODB_URI = f"mongodb+srv://{MONGO_DB_USERNAME}:{MONGO_DB_PASSWORD}@{MONGO_CLUSTER_URL}/?retryWrites=true&w=majority&appName=PredictLearning"
+# Construct MongoDB Atlas connection string (MONGODB_URI in .env wins, e.g. mongodb://db:27017)
+MONGODB_URI = os.getenv('MONGODB_URI') or (
+    f"mongodb+srv://{MONGO_DB_USERNAME}:{MONGO_DB_PASSWORD}@{MONGO_CLUSTER_URL}/"
+    "?retryWrites=true&w=majority&appName=PredictLearning"
+)
 
-# Connect to MongoDB Atlas
-try:
-    mongoengine.connect(
-        db=MONGO_DATABASE_NAME,
-        host=MONGODB_URI,
-        alias='default'
-    )
-    print("✅ Successfully connected to MongoDB Atlas!")
-except Exception as e:
-    print(f"❌ Failed to connect to MongoDB Atlas: {e}")
+# Không kết nối ở đây: main.services.mongo_connection đăng ký kết nối trong
+# AppConfig.ready(), client chỉ được tạo ở lần truy vấn đầu tiên (sau khi fork).
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '50'))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '10000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', '0'))  # 0 = no timeout
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '0'))  # 0 = keep idle connections
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0'))  # 0 = wait forever
+# "auto" warms the pool only in serving processes (gunicorn, uvicorn, runserver)
+MONGO_WARM_POOL = os.getenv('MONGO_WARM_POOL', 'auto').lower()
 
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'main.authentication.JWTAuthentication',
+    ),
+    # Số reverse proxy phía trước (nginx = 1) để lấy IP thật từ X-Forwarded-For
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES')) if os.getenv('NUM_PROXIES') else None,
+}
+
+# Token-bucket throttling cho login/register (main.throttling), kiểm tra trước khi hash mật khẩu.
+# Store: local (mỗi worker), cache (CACHES[THROTTLE_CACHE_ALIAS]) hoặc mongo (dùng chung mọi worker)
+THROTTLE_ENABLED = os.getenv('THROTTLE_ENABLED', 'True').lower() == 'true'
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'local')
+THROTTLE_CACHE_ALIAS = os.getenv('THROTTLE_CACHE_ALIAS', 'default')
+THROTTLE_RATES = {
+    'login_ip': os.getenv('THROTTLE_LOGIN_IP', '30/min'),
+    'login_username': os.getenv('THROTTLE_LOGIN_USERNAME', '10/min'),
+    'register_ip': os.getenv('THROTTLE_REGISTER_IP', '10/min'),
 }
 
+# JWT: "kid:secret,kid2:secret2"; token mới ký bằng JWT_ACTIVE_KID, các key còn lại chỉ để verify
+JWT_SIGNING_KEYS = dict(
+    item.strip().split(':', 1) for item in os.getenv('JWT_SIGNING_KEYS', '').split(',') if item.strip()
+) or {'default': SECRET_KEY}
+JWT_ACTIVE_KID = os.getenv('JWT_ACTIVE_KID', next(iter(JWT_SIGNING_KEYS)))
+JWT_ALGORITHM = 'HS256'
+JWT_ACCESS_TOKEN_LIFETIME = int(os.getenv('JWT_ACCESS_TOKEN_LIFETIME', '3600'))
+JWT_REFRESH_TOKEN_LIFETIME = int(os.getenv('JWT_REFRESH_TOKEN_LIFETIME', '86400'))
+# Mỗi worker đồng bộ danh sách refresh token đã thu hồi sau mỗi khoảng này (giây)
+REVOCATION_SYNC_INTERVAL = float(os.getenv('REVOCATION_SYNC_INTERVAL', '30'))
+
 # Swagger/OpenAPI settings
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
@@ -157,6 +183,81 @@ SWAGGER_SETTINGS = {
     }
 }
 
+# Grade prediction
+PREDICT_BATCH_MAX_SIZE = int(os.getenv('PREDICT_BATCH_MAX_SIZE', '100000'))
+MODEL_ARTIFACTS_DIR = os.getenv('MODEL_ARTIFACTS_DIR', os.path.join(BASE_DIR, 'model_artifacts'))
+MODEL_RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', '5'))
+# Cache-Control max-age của /models/current/ (nginx và trình duyệt giữ bản sao trong thời gian này)
+MODEL_INFO_MAX_AGE = int(os.getenv('MODEL_INFO_MAX_AGE', '60'))
+
+# Prediction result cache: in-process LRU + optional shared Django cache alias
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv('PREDICTION_CACHE_MAX_ENTRIES', '10000'))
+PREDICTION_CACHE_TTL = int(os.getenv('PREDICTION_CACHE_TTL', '300'))
+PREDICTION_CACHE_QUANTUM = float(os.getenv('PREDICTION_CACHE_QUANTUM', '0.01'))
+PREDICTION_CACHE_BACKEND = os.getenv('PREDICTION_CACHE_BACKEND', 'default')
+
+# What-if sweeps (/predict/sweep/): points per swept feature, points per grid, cached grids per worker
+PREDICT_SWEEP_MAX_POINTS = int(os.getenv('PREDICT_SWEEP_MAX_POINTS', '201'))
+PREDICT_SWEEP_MAX_CELLS = int(os.getenv('PREDICT_SWEEP_MAX_CELLS', '10000'))
+PREDICT_SWEEP_CACHE_MAX_ENTRIES = int(os.getenv('PREDICT_SWEEP_CACHE_MAX_ENTRIES', '256'))
+
+# Batch prediction jobs (POST /jobs/, scored by `manage.py run_prediction_worker`)
+PREDICTION_JOB_CHUNK_SIZE = int(os.getenv('PREDICTION_JOB_CHUNK_SIZE', '5000'))
+PREDICTION_JOB_MAX_ROWS = int(os.getenv('PREDICTION_JOB_MAX_ROWS', '2000000'))
+PREDICTION_JOB_LEASE_SECONDS = int(os.getenv('PREDICTION_JOB_LEASE_SECONDS', '300'))
+PREDICTION_JOB_MAX_ATTEMPTS = int(os.getenv('PREDICTION_JOB_MAX_ATTEMPTS', '3'))
+
+# Prediction history write-behind buffer (per worker)
+PREDICTION_BUFFER_SIZE = int(os.getenv('PREDICTION_BUFFER_SIZE', '500'))
+PREDICTION_BUFFER_MAX_DELAY = float(os.getenv('PREDICTION_BUFFER_MAX_DELAY', '1.0'))
+PREDICTION_BUFFER_MAX_QUEUE = int(os.getenv('PREDICTION_BUFFER_MAX_QUEUE', '10000'))
+
+# /metrics (Prometheus): nginx chặn từ bên ngoài; trong backend, nếu có METRICS_TOKEN thì
+# Prometheus phải gửi "Authorization: Bearer <token>", nếu không thì chỉ nhận các địa chỉ dưới đây
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [
+    ipaddress.ip_network(network.strip())
+    for network in os.getenv(
+        'METRICS_ALLOWED_IPS', '127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16'
+    ).split(',')
+    if network.strip()
+]
+
+# Logging: JSON lines written by a background thread; request threads only enqueue.
+# LOG_SAMPLE_RATES="main.services.auth_services=0.01,main.views=0.1" keeps that share of DEBUG records.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_SAMPLE_RATES = {
+    name.strip(): float(rate)
+    for name, rate in (
+        item.split('=', 1) for item in os.getenv('LOG_SAMPLE_RATES', '').split(',') if '=' in item
+    )
+} or {'main.services.auth_services': 0.01, 'main.views.auth_views': 0.01}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sample': {'()': 'main.log.SamplingFilter', 'rates': LOG_SAMPLE_RATES},
+        'redact': {'()': 'main.log.RedactingFilter'},
+    },
+    'formatters': {
+        'json': {'()': 'main.log.JsonFormatter'},
+    },
+    'handlers': {
+        'background': {
+            '()': 'main.log.BackgroundHandler',
+            'maxsize': LOG_QUEUE_SIZE,
+            'formatter': 'json',
+            'filters': ['sample', 'redact'],
+        },
+    },
+    'root': {'handlers': ['background'], 'level': LOG_LEVEL},
+    'loggers': {
+        'django': {'handlers': ['background'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 STATIC_URL = '/static/'
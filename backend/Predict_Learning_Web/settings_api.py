@@ -0,0 +1,38 @@
+"""
+Lean settings for the serving workers (DJANGO_SETTINGS_MODULE=Predict_Learning_Web.settings_api).
+
+The database backend is dummy, so admin, sessions and messages cannot work
+anyway; dropping them, drf_yasg and the browsable API renderer means fewer
+modules to import in every worker. Management commands keep the full profile.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+API_PROFILE_DROPPED_APPS = (
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'drf_yasg',
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_PROFILE_DROPPED_APPS]  # noqa: F405
+
+# AuthenticationMiddleware cần session; API xác thực bằng JWT trong DRF
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE  # noqa: F405
+    if middleware not in (
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    )
+]
+
+TEMPLATES[0]['OPTIONS']['context_processors'] = [  # noqa: F405
+    processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']  # noqa: F405
+    if processor != 'django.contrib.messages.context_processors.messages'
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    'DEFAULT_RENDERER_CLASSES': ('rest_framework.renderers.JSONRenderer',),
+}
@@ -1,16 +1,44 @@
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Predict Learning API",
-        default_version='v1',
-        description="API for Predict Learning Web Application",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@predictlearning.local"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+import threading
+
+from main.openapi import apply_schemas
+
+# drf_yasg chỉ được import khi có request đầu tiên tới /swagger/ hoặc /redoc/
+_lock = threading.Lock()
+_schema_view = None
+
+
+def get_schema_view():
+    global _schema_view
+    with _lock:
+        if _schema_view is None:
+            from rest_framework import permissions
+            from drf_yasg.views import get_schema_view as yasg_schema_view
+            from drf_yasg import openapi
+
+            apply_schemas()
+            _schema_view = yasg_schema_view(
+                openapi.Info(
+                    title="Predict Learning API",
+                    default_version='v1',
+                    description="API for Predict Learning Web Application",
+                    terms_of_service="https://www.google.com/policies/terms/",
+                    contact=openapi.Contact(email="contact@predictlearning.local"),
+                    license=openapi.License(name="BSD License"),
+                ),
+                public=True,
+                permission_classes=(permissions.AllowAny,),
+            )
+    return _schema_view
+
+
+def lazy_schema_view(method, *args, **kwargs):
+    """URL view for schema_view.<method>(*args, **kwargs), built on first use"""
+    view = None
+
+    def dispatch(request, *view_args, **view_kwargs):
+        nonlocal view
+        if view is None:
+            view = getattr(get_schema_view(), method)(*args, **kwargs)
+        return view(request, *view_args, **view_kwargs)
+
+    return dispatch
@@ -1,18 +1,58 @@
+from django.conf import settings
 from main.views.home_view import home
-from main.views.auth_views import RegisterView, LoginView
-from django.contrib import admin
+from main.views.metrics_view import metrics
+from main.views.auth_views import RegisterView, LoginView, RefreshView
+from main.views.predict_views import PredictView, PredictBatchView, PredictSweepView
+from main.views.history_views import PredictionHistoryView, PredictionAnalyticsView, PredictionExportView
+from main.views.job_views import JobCreateView, JobDetailView, JobResultsView
+from main.views.model_views import ModelInfoView
+from main.views.async_auth_views import AsyncRegisterView, AsyncLoginView
+from main.views.async_predict_views import (
+    AsyncPredictView, AsyncPredictBatchView, AsyncPredictSweepView, AsyncPredictionHistoryView,
+    AsyncPredictionExportView, AsyncJobResultsView,
+)
 from django.urls import path, re_path
-from .swagger import schema_view
+from .swagger import lazy_schema_view
+
+# ASGI mode (uvicorn workers): các endpoint nóng dùng view async + motor
+if settings.API_MODE == 'asgi':
+    RegisterView, LoginView = AsyncRegisterView, AsyncLoginView
+    PredictView, PredictBatchView, PredictSweepView = AsyncPredictView, AsyncPredictBatchView, AsyncPredictSweepView
+    PredictionHistoryView, PredictionExportView = AsyncPredictionHistoryView, AsyncPredictionExportView
+    JobResultsView = AsyncJobResultsView
 
 urlpatterns = [
-    path('admin/', admin.site.urls),  # admin site
     path('', home, name='home'),      # trang chủ
 
     path('auth/register/', RegisterView.as_view(), name='register'),
     path('auth/login/', LoginView.as_view(), name='login'),
-    
+    path('auth/refresh/', RefreshView.as_view(), name='token-refresh'),
+
+    path('predict/', PredictView.as_view(), name='predict'),
+    path('predict/batch/', PredictBatchView.as_view(), name='predict-batch'),
+    path('predict/sweep/', PredictSweepView.as_view(), name='predict-sweep'),
+    path('predictions/', PredictionHistoryView.as_view(), name='prediction-history'),
+    path('predictions/analytics/', PredictionAnalyticsView.as_view(), name='prediction-analytics'),
+    path('predictions/export/', PredictionExportView.as_view(), name='prediction-export'),
+
+    path('jobs/', JobCreateView.as_view(), name='job-create'),
+    path('jobs/<str:job_id>/', JobDetailView.as_view(), name='job-detail'),
+    path('jobs/<str:job_id>/results/', JobResultsView.as_view(), name='job-results'),
+
+    path('models/current/', ModelInfoView.as_view(), name='model-current'),
+
+    path('metrics', metrics, name='metrics'),  # Prometheus scrape, chỉ trong mạng nội bộ
+]
+
+# Profile "api" (settings_api.py) bỏ admin và drf_yasg khỏi INSTALLED_APPS
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    from django.contrib import admin
+    urlpatterns.insert(0, path('admin/', admin.site.urls))  # admin site
+
+if 'drf_yasg' in settings.INSTALLED_APPS:
     # Swagger URLs
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    re_path(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    re_path(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-]
\ No newline at end of file
+    urlpatterns += [
+        re_path(r'^swagger(?P<format>\.json|\.yaml)$', lazy_schema_view('without_ui', cache_timeout=0), name='schema-json'),
+        re_path(r'^swagger/$', lazy_schema_view('with_ui', 'swagger', cache_timeout=0), name='schema-swagger-ui'),
+        re_path(r'^redoc/$', lazy_schema_view('with_ui', 'redoc', cache_timeout=0), name='schema-redoc'),
+    ]
\ No newline at end of file
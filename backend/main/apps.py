@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        # Kết nối Mongo chỉ được đăng ký ở lần truy cập đầu (không tra DNS lúc khởi động);
+        # socket được mở sau khi gunicorn fork worker
+        from main import checks  # đăng ký system check cho index unique của users
+        from main.services.mongo_connection import is_serving_process, mongo_connection, should_warm_pool
+        mongo_connection.install()
+        if should_warm_pool():
+            mongo_connection.warm_in_background()
+        if is_serving_process():
+            checks.warn_missing_indexes_in_background()
+
+        # Nạp model một lần khi worker khởi động, không nạp lại theo từng request
+        from main.services.model_registry import model_registry
+        model_registry.preload()
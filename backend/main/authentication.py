@@ -0,0 +1,47 @@
+import jwt
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from main.services.token_services import ACCESS, TokenService
+
+
+class TokenUser:
+    """User built from the token claims only, no database lookup"""
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, payload):
+        self.id = payload["user_id"]
+        self.username = payload.get("username")
+        self.payload = payload
+
+    def __str__(self):
+        return self.username or self.id
+
+
+class JWTAuthentication(BaseAuthentication):
+    """
+    Verify the access tokens issued by TokenService. Everything needed is in
+    the token and the in-memory signing keys, so authenticating a request
+    costs no MongoDB round-trip.
+    """
+    keyword = b"bearer"
+
+    def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword:
+            return None
+        if len(header) != 2:
+            raise AuthenticationFailed("Invalid Authorization header")
+
+        try:
+            payload = TokenService.decode(header[1].decode("latin-1"), ACCESS)
+        except jwt.ExpiredSignatureError:
+            raise AuthenticationFailed("Token has expired")
+        except jwt.InvalidTokenError:
+            raise AuthenticationFailed("Invalid token")
+
+        return TokenUser(payload), payload
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="api"'
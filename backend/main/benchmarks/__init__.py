@@ -0,0 +1,21 @@
+"""
+Benchmarks run with `manage.py bench <name>`. Each benchmark is a function
+taking the command options and returning a dict of results.
+"""
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def load_benchmarks():
+    # Import các module để chúng tự đăng ký vào BENCHMARKS
+    from main.benchmarks import (  # noqa: F401
+        auth_service, export, http_load, login_query, login_throughput, predict_engine,
+    )
+    return BENCHMARKS
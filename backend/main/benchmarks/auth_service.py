@@ -0,0 +1,41 @@
+from django.conf import settings
+
+from main.benchmarks import benchmark
+from main.benchmarks.fixtures import benchmark_db, measure_latencies
+from main.models import User
+from main.services.auth_services import AuthService
+
+
+@benchmark("auth_service")
+def auth_service(options):
+    """AuthService.register_user / login_user latency, serial and on --concurrency threads"""
+    iterations = options["iterations"] or 100
+    concurrency = options["concurrency"]
+    results = {}
+
+    with benchmark_db(options["mongo_uri"]):
+        User._get_collection().create_index("username", unique=True)
+        User._get_collection().create_index("email", unique=True, sparse=True)
+
+        for mode, threads in (("serial", 1), ("concurrent", concurrency)):
+            def register(i):
+                AuthService.register_user({
+                    "username": f"{mode}{i}",
+                    "email": f"{mode}{i}@example.com",
+                    "password": "benchmark",
+                })
+                return True
+
+            def login(i):
+                return bool(AuthService.login_user(f"{mode}{i % iterations}", "benchmark"))
+
+            results[f"register_{mode}"] = measure_latencies(register, iterations, threads)
+            results[f"login_{mode}"] = measure_latencies(login, iterations, threads)
+
+    return {
+        "hasher": settings.PASSWORD_HASHERS[0],
+        "hash_workers": settings.PASSWORD_HASH_WORKERS,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        **results,
+    }
@@ -0,0 +1,46 @@
+"""
+Regression check between two `manage.py bench --output` files.
+
+Only metrics whose direction is known from their name are compared:
+throughputs (*_per_sec, rps) and backtest r2 should not drop, latency
+percentiles, means and backtest errors (mae, rmse) should not grow. max_ms is
+a single sample and too noisy to gate on. Also reads `manage.py backtest
+--output` files.
+"""
+
+HIGHER_IS_BETTER = ("_per_sec", "rps", "r2")
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "mae", "rmse")
+
+
+def flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, float(value)
+
+
+def direction(metric):
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(baseline, current, tolerance=10.0):
+    """
+    Rows of (metric, baseline, current, change %, regressed) for the metrics
+    present in both reports; regressed when worse by more than tolerance %.
+    """
+    before = dict(flatten(baseline.get("results", {})))
+    rows = []
+    for metric, value in flatten(current.get("results", {})):
+        sign = direction(metric)
+        if not sign or metric not in before or not before[metric]:
+            continue
+        # abs(): với baseline âm (r2 của model tệ) phép chia giữ đúng chiều tốt/xấu
+        change = (value - before[metric]) / abs(before[metric]) * 100
+        rows.append((metric, before[metric], value, change, sign * change < -tolerance))
+    return rows
@@ -0,0 +1,88 @@
+import gc
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from main.benchmarks import benchmark
+from main.benchmarks.fixtures import benchmark_db
+from main.models import Prediction
+from main.services.export_services import ENCODERS, ExportService
+from main.services.training_services import generate_synthetic_students
+
+
+COHORT = "bench"
+SEED_CHUNK = 10_000
+
+
+def rss_mb():
+    """Current resident set size; falls back to the peak where /proc is missing"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def seed_predictions(rows):
+    collection = Prediction._get_collection()
+    user_id = ObjectId()
+    started = datetime.utcnow() - timedelta(seconds=rows)
+    written = 0
+    for X, y in generate_synthetic_students(rows, seed=0, chunk_size=SEED_CHUNK):
+        collection.insert_many([
+            {
+                "user_id": user_id,
+                "study_hour_per_week": row[0],
+                "previous_grade": row[1],
+                "attendance_rate": row[2],
+                "extracurricular_activities": int(row[3]),
+                "final_grade": round(float(grade), 1),
+                "model_version": "bench",
+                "cohort": COHORT,
+                "created_at": started + timedelta(seconds=written + i),
+            }
+            for i, (row, grade) in enumerate(zip(X.tolist(), y.tolist()))
+        ], ordered=False)
+        written += len(X)
+
+
+@benchmark("export")
+def export(options):
+    """Rows/s, MB/s and RSS growth of a cohort export (CSV, and Parquet with pyarrow); --rows 1000000 --mongo-uri for the real picture"""
+    rows = options["rows"]
+    results = {"rows": rows}
+    with benchmark_db(options["mongo_uri"]):
+        seed_predictions(rows)
+        for kind in ENCODERS:
+            try:
+                encoder = ExportService.encoder(kind, "cohort")
+            except ImportError as e:
+                results[kind] = {"skipped": str(e)}
+                continue
+
+            # mongomock giữ dữ liệu trong process nên chỉ phần tăng thêm của RSS là đáng tin
+            gc.collect()
+            rss_before = peak = rss_mb()
+            size = 0
+            started = time.perf_counter()
+            for i, chunk in enumerate(ExportService.stream(ExportService.cursor("cohort", COHORT), encoder)):
+                size += len(chunk)
+                if i % 10 == 0:
+                    peak = max(peak, rss_mb())
+            elapsed = time.perf_counter() - started
+            peak = max(peak, rss_mb())
+            results[kind] = {
+                "seconds": round(elapsed, 3),
+                "rows_per_sec": round(rows / elapsed, 1),
+                "mb_per_sec": round(size / 2**20 / elapsed, 2),
+                "size_mb": round(size / 2**20, 2),
+                "rss_before_mb": round(rss_before, 1),
+                "rss_peak_mb": round(peak, 1),
+                "rss_growth_mb": round(peak - rss_before, 1),
+            }
+    return results
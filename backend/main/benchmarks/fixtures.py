@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import mongoengine
+import numpy as np
+from django.core.management.base import CommandError
+
+
+BENCH_DB = "bench_predict_learning"
+
+
+@contextmanager
+def benchmark_db(mongo_uri=None):
+    """
+    Point the 'default' mongoengine alias at a throwaway database: a local
+    mongod when mongo_uri is given, mongomock otherwise. The database is
+    dropped afterwards.
+    """
+    mongoengine.disconnect(alias="default")
+    db_name = f"{BENCH_DB}_{os.getpid()}"
+    if mongo_uri:
+        mongoengine.connect(db=db_name, host=mongo_uri, alias="default")
+    else:
+        try:
+            import mongomock
+        except ImportError:
+            raise CommandError("Install mongomock (requirements-dev.txt) or pass --mongo-uri")
+        mongoengine.connect(db=db_name, host="mongodb://localhost", alias="default",
+                            mongo_client_class=mongomock.MongoClient)
+    try:
+        yield mongoengine.get_db(alias="default")
+    finally:
+        mongoengine.get_connection(alias="default").drop_database(db_name)
+        mongoengine.disconnect(alias="default")
+
+
+def measure(func, iterations):
+    """Run func(i) for i in range(iterations), returns (seconds, ops_per_second)"""
+    started = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    elapsed = time.perf_counter() - started
+    return elapsed, iterations / elapsed if elapsed else float("inf")
+
+
+def latency_summary(latencies):
+    """p50/p95/p99/mean/max in milliseconds from a list of durations in seconds"""
+    if not latencies:
+        return {}
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def measure_latencies(func, iterations, concurrency=1):
+    """
+    Run func(i) for i in range(iterations) on `concurrency` threads, timing
+    each call. func returns True on success. Returns a dict with ops/s,
+    error count and the latency summary.
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def run(i):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok = func(i)
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            errors += not ok
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(run, range(iterations)))
+    else:
+        for i in range(iterations):
+            run(i)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": iterations,
+        "errors": errors,
+        "ops_per_sec": round(iterations / elapsed, 1) if elapsed else None,
+        **latency_summary(latencies),
+    }
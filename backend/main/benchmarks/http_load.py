@@ -0,0 +1,128 @@
+import http.client
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from main.benchmarks import benchmark
+from main.benchmarks.fixtures import benchmark_db, measure_latencies
+
+
+ENDPOINTS = ("register", "login", "predict", "predict_batch")
+PASSWORD = "Benchmark-123"
+SEED_USERS = 50
+BATCH_SIZE = 100
+
+
+class LiveServer:
+    """POSTs JSON to a running server, one keep-alive connection per thread"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise CommandError(f"Invalid --url {base_url!r}, expected e.g. http://localhost:8000")
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")  # ví dụ http://localhost/api sau nginx
+        self._local = threading.local()
+
+    def post(self, path, body):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self.connection_class(self.host, self.port, timeout=30)
+        try:
+            connection.request("POST", self.prefix + path, body=json.dumps(body),
+                               headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self._local.connection = None
+            raise
+
+
+class InProcessServer:
+    """Same requests through Django's test client: full middleware + views, no network"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def post(self, path, body):
+        from django.test import Client
+
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = Client()
+        return client.post(path, json.dumps(body), content_type="application/json").status_code
+
+
+def student(i):
+    return {
+        "studyHourPerWeek": 5 + i % 40,
+        "previousGrade": 40 + i % 60,
+        "attendanceRate": 50 + i % 50,
+        "extracurricularActivities": i % 5,
+    }
+
+
+@benchmark("http_load")
+def http_load(options):
+    """p50/p95/p99 latency and RPS per endpoint, against --url or in-process on mongomock/--mongo-uri"""
+    iterations = options["iterations"] or 200
+    concurrency = options["concurrency"]
+    endpoints = options["endpoints"] or ENDPOINTS
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        raise CommandError(f"Unknown endpoints {sorted(unknown)}, choose from {list(ENDPOINTS)}")
+
+    url = options["url"]
+    run = f"{os.getpid()}x{int(time.time())}"
+    results = {}
+
+    # In-process thì tắt throttling (mọi request cùng một IP); với --url hãy chạy server với THROTTLE_ENABLED=false
+    no_throttling = nullcontext() if url else override_settings(THROTTLE_ENABLED=False)
+    with nullcontext() if url else benchmark_db(options["mongo_uri"]), no_throttling:
+        server = LiveServer(url) if url else InProcessServer()
+
+        def register(i):
+            return server.post("/auth/register/", {
+                "username": f"load{run}u{i}", "email": f"load{run}u{i}@example.com", "password": PASSWORD,
+            }) == 201
+
+        def login(i):
+            return server.post("/auth/login/", {
+                "username": f"seed{run}u{i % SEED_USERS}", "password": PASSWORD,
+            }) == 200
+
+        def predict(i):
+            return server.post("/predict/", student(i)) == 200
+
+        def predict_batch(i):
+            return server.post("/predict/batch/", {
+                "students": [student(i + j) for j in range(BATCH_SIZE)],
+            }) == 200
+
+        requests = {"register": register, "login": login, "predict": predict, "predict_batch": predict_batch}
+
+        if "login" in endpoints:
+            for i in range(SEED_USERS):
+                server.post("/auth/register/", {"username": f"seed{run}u{i}", "password": PASSWORD})
+
+        for name in endpoints:
+            result = measure_latencies(requests[name], iterations, concurrency)
+            result["rps"] = result.pop("ops_per_sec")
+            results[name] = result
+
+    return {
+        "target": url or "in-process",
+        "concurrency": concurrency,
+        "batch_size": BATCH_SIZE,
+        **results,
+    }
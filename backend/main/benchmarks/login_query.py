@@ -0,0 +1,45 @@
+from django.contrib.auth.hashers import make_password
+
+from main.benchmarks import benchmark
+from main.benchmarks.fixtures import benchmark_db, measure
+from main.models import User
+from main.services.auth_services import AuthService
+
+
+@benchmark("login_query")
+def login_query(options):
+    """Full User document vs projected LoginUser on the login lookup"""
+    rows = options["rows"]
+    iterations = options["iterations"] or 2_000
+    password_hash = make_password("benchmark")
+
+    with benchmark_db(options["mongo_uri"]):
+        User._get_collection().create_index("username", unique=True)
+        User._get_collection().insert_many([
+            {
+                "username": f"student{i}",
+                "email": f"student{i}@example.com",
+                "password_hash": password_hash,
+                "first_name": "Bench",
+                "last_name": f"Student {i}",
+            }
+            for i in range(rows)
+        ])
+
+        def full_document(i):
+            user = User.objects(username=f"student{i % rows}").first()
+            return user.id, user.username, user.email, user.password_hash
+
+        def projected(i):
+            return AuthService.get_login_user(f"student{i % rows}")
+
+        full_seconds, full_rate = measure(full_document, iterations)
+        lean_seconds, lean_rate = measure(projected, iterations)
+
+    return {
+        "rows": rows,
+        "iterations": iterations,
+        "full_document_per_sec": round(full_rate, 1),
+        "projected_per_sec": round(lean_rate, 1),
+        "speedup": round(lean_rate / full_rate, 2),
+    }
@@ -0,0 +1,51 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+from main.benchmarks import benchmark
+from main.benchmarks.fixtures import benchmark_db
+from main.models import User
+from main.services.auth_services import AuthService
+
+
+@benchmark("login_throughput")
+def login_throughput(options):
+    """Logins/sec of one worker: serial vs concurrent requests on the hashing pool"""
+    users = min(options["rows"], 100)
+    iterations = options["iterations"] or 200
+    concurrency = options["concurrency"]
+    password_hash = make_password("benchmark")
+
+    with benchmark_db(options["mongo_uri"]):
+        User._get_collection().insert_many([
+            {"username": f"student{i}", "password_hash": password_hash} for i in range(users)
+        ])
+
+        def login(i):
+            return AuthService.login_user(f"student{i % users}", "benchmark")
+
+        started = time.perf_counter()
+        for i in range(iterations):
+            login(i)
+        serial = iterations / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as requests:
+            list(requests.map(login, range(iterations)))
+        concurrent = iterations / (time.perf_counter() - started)
+
+    return {
+        "hasher": settings.PASSWORD_HASHERS[0],
+        "argon2": {
+            "time_cost": settings.ARGON2_TIME_COST,
+            "memory_cost_kib": settings.ARGON2_MEMORY_COST,
+            "parallelism": settings.ARGON2_PARALLELISM,
+        },
+        "hash_workers": settings.PASSWORD_HASH_WORKERS,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "serial_logins_per_sec": round(serial, 1),
+        "concurrent_logins_per_sec": round(concurrent, 1),
+    }
@@ -0,0 +1,63 @@
+import time
+
+from main.benchmarks import benchmark
+from main.benchmarks.fixtures import latency_summary
+from main.services.predict_services import FEATURES, PredictService, prediction_cache
+from main.services.training_services import generate_synthetic_students
+
+
+DEFAULT_BATCH_SIZES = (1, 10, 100, 1_000, 10_000, 100_000)
+# Mỗi kích thước batch chạy khoảng chừng này hàng (tối thiểu 5 lần gọi)
+ROWS_PER_SIZE = 1_000_000
+
+
+@benchmark("predict_engine")
+def predict_engine(options):
+    """PredictService.predict_batch at batch sizes 1..100k, plus predict_one cached vs uncached"""
+    sizes = options["batch_sizes"] or DEFAULT_BATCH_SIZES
+    X, _ = next(generate_synthetic_students(max(sizes), seed=0, chunk_size=max(sizes)))
+    columns = {
+        name: X[:, i].tolist() for i, name in enumerate(FEATURES)
+    }
+
+    batches = {}
+    for size in sizes:
+        students = {name: values[:size] for name, values in columns.items()}
+        calls = options["iterations"] or max(5, ROWS_PER_SIZE // size)
+        latencies = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            PredictService.predict_batch(students)
+            latencies.append(time.perf_counter() - started)
+        total = sum(latencies)
+        batches[str(size)] = {
+            "calls": calls,
+            "rows_per_sec": round(size * calls / total, 1),
+            **latency_summary(latencies),
+        }
+
+    calls = options["iterations"] or 10_000
+    records = [dict(zip(FEATURES, row)) for row in X[:calls].tolist()]
+    for record in records:
+        record["extracurricularActivities"] = int(record["extracurricularActivities"])
+
+    # uncached: mỗi lần gọi là một học sinh khác (cache miss + set);
+    # cached: lặp lại 100 học sinh đã có trong cache
+    single = {}
+    for mode, distinct in (("uncached", len(records)), ("cached", min(100, len(records)))):
+        prediction_cache.clear()
+        if mode == "cached":
+            for record in records[:distinct]:
+                PredictService.predict_one(record)
+        latencies = []
+        for i in range(calls):
+            started = time.perf_counter()
+            PredictService.predict_one(records[i % distinct])
+            latencies.append(time.perf_counter() - started)
+        single[mode] = {
+            "calls": calls,
+            "ops_per_sec": round(calls / sum(latencies), 1),
+            **latency_summary(latencies),
+        }
+
+    return {"batch": batches, "predict_one": single}
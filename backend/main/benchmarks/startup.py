@@ -0,0 +1,90 @@
+"""
+Worker cold start: a fresh interpreter sets Django up the way a gunicorn
+worker does (WSGI app + URLconf) under `python -X importtime`, so the cost
+can be broken down per package and compared between settings profiles.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+
+WORKER_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+from django.conf import settings
+json.dump({"setup_ms": (time.perf_counter() - started) * 1000,
+           "installed_apps": len(settings.INSTALLED_APPS),
+           "modules": len(sys.modules)}, sys.stdout)
+"""
+
+# Module của project được tách tới cấp 2 (main.views, main.services, ...)
+PROJECT_PACKAGES = ("main", "Predict_Learning_Web")
+
+
+def module_group(name):
+    parts = name.split(".")
+    if parts[0] in PROJECT_PACKAGES:
+        return ".".join(parts[:2])
+    if parts[0] == "django" and len(parts) > 2 and parts[1] == "contrib":
+        return ".".join(parts[:3])
+    return parts[0]
+
+
+def parse_importtime(stderr):
+    """Sum the self time (µs) of `-X importtime` lines per package group"""
+    groups = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|", 2)
+        group = module_group(name.strip())
+        groups[group] = groups.get(group, 0) + int(self_us)
+    return groups
+
+
+def run_worker(settings_module):
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": settings_module,
+        "MONGO_WARM_POOL": "false",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", WORKER_SCRIPT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{settings_module}: worker failed\n{proc.stderr[-2000:]}")
+    return {"wall_ms": wall_ms, **json.loads(proc.stdout)}, parse_importtime(proc.stderr)
+
+
+def profile_startup(settings_module, repeat=5, top=15):
+    """Median over `repeat` cold starts, with the per-package import breakdown of the median run"""
+    runs = sorted((run_worker(settings_module) for _ in range(repeat)), key=lambda run: run[0]["setup_ms"])
+    result, groups = runs[len(runs) // 2]
+    imports_ms = sum(groups.values()) / 1000
+    return {
+        "settings": settings_module,
+        "setup_ms": round(result["setup_ms"], 1),
+        "setup_ms_min": round(runs[0][0]["setup_ms"], 1),
+        "wall_ms": round(statistics.median(run[0]["wall_ms"] for run in runs), 1),
+        "imports_ms": round(imports_ms, 1),
+        "installed_apps": result["installed_apps"],
+        "modules": result["modules"],
+        "top_imports_ms": {
+            group: round(us / 1000, 1)
+            for group, us in sorted(groups.items(), key=lambda item: -item[1])[:top]
+        },
+    }
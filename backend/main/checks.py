@@ -0,0 +1,57 @@
+import logging
+import threading
+
+from django.core.checks import Error, Tags, Warning, register
+from mongoengine.connection import ConnectionFailure as MongoEngineConnectionError
+from pymongo.errors import PyMongoError
+
+from main.models import User
+
+
+logger = logging.getLogger(__name__)
+
+# Đăng ký chỉ dùng một lần insert và dựa vào các index unique này để chặn trùng
+UNIQUE_USER_FIELDS = ("username", "email")
+
+
+def missing_unique_indexes():
+    """User fields without their unique index (built by `manage.py ensure_indexes`)"""
+    unique = {
+        tuple(field for field, _ in info["key"])
+        for info in User._get_collection().index_information().values() if info.get("unique")
+    }
+    return [field for field in UNIQUE_USER_FIELDS if (field,) not in unique]
+
+
+@register(Tags.database)
+def check_unique_indexes(app_configs, databases=None, **kwargs):
+    """`manage.py check --database default`"""
+    if not databases:
+        return []
+    try:
+        missing = missing_unique_indexes()
+    except (PyMongoError, MongoEngineConnectionError) as e:
+        return [Warning(f"Cannot verify the unique indexes on users: {e}", id="main.W001")]
+    if not missing:
+        return []
+    return [Error(
+        f"users has no unique index on {', '.join(missing)}: duplicate registrations are accepted",
+        hint="Run `python manage.py ensure_indexes`.",
+        id="main.E001",
+    )]
+
+
+def warn_missing_indexes():
+    try:
+        missing = missing_unique_indexes()
+    except (PyMongoError, MongoEngineConnectionError) as e:
+        logger.warning("cannot verify the unique indexes on users: %s", e)
+        return
+    if missing:
+        logger.error("users has no unique index on %s: duplicate registrations are accepted, "
+                     "run `manage.py ensure_indexes`", ", ".join(missing))
+
+
+def warn_missing_indexes_in_background():
+    # Server vẫn khởi động, chỉ ghi log lỗi (không chặn worker vì một lần truy vấn Atlas)
+    threading.Thread(target=warn_missing_indexes, name="index-check", daemon=True).start()
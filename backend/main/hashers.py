@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class ConfigurableArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with the cost taken from settings (ARGON2_TIME_COST,
+    ARGON2_MEMORY_COST in KiB, ARGON2_PARALLELISM). Hashes made with other
+    parameters report must_update() and are rehashed on the next login.
+    """
+    time_cost = settings.ARGON2_TIME_COST
+    memory_cost = settings.ARGON2_MEMORY_COST
+    parallelism = settings.ARGON2_PARALLELISM
@@ -0,0 +1,161 @@
+"""
+Logging pieces wired up by settings.LOGGING.
+
+Request threads only run the filters (sampling, then redaction) and put the
+record on a bounded queue; a background listener thread formats it as one
+JSON line and writes it out. When the queue is full the record is dropped
+and counted instead of blocking the request.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from main.metrics import registry
+
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped_total", "Log records dropped because the logging queue was full")
+
+REDACTED = "[REDACTED]"
+REDACT_FIELDS = frozenset({
+    "password", "password2", "password_hash", "new_password", "old_password",
+    "access", "refresh", "token", "authorization", "secret",
+})
+
+# Thuộc tính có sẵn của LogRecord, phần còn lại là `extra`
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in REDACT_FIELDS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(item) for item in value)
+    return value
+
+
+def record_extras(record):
+    return {key: value for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES}
+
+
+class RedactingFilter(logging.Filter):
+    """Masks credential fields in the record's args and `extra` dicts"""
+
+    def filter(self, record):
+        if isinstance(record.args, (dict, tuple)) and record.args:
+            record.args = redact(record.args)
+        for key, value in record_extras(record).items():
+            if key.lower() in REDACT_FIELDS:
+                setattr(record, key, REDACTED)
+            elif isinstance(value, (dict, list, tuple)):
+                setattr(record, key, redact(value))
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the records at or below max_level, per logger:
+    rates maps a logger name (or a parent, e.g. "main.services") to the
+    fraction kept. Warnings and errors are never sampled.
+    """
+
+    def __init__(self, rates=None, max_level=logging.DEBUG):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.max_level = logging._checkLevel(max_level)
+        self._resolved = {}
+
+    def rate_for(self, name):
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = float(self.rates[prefix])
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extra fields and the traceback"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        entry.update(record_extras(record))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    QueueHandler feeding a QueueListener thread that writes to `stream`.
+    The formatter set by dictConfig is used by the writer, not the caller.
+    """
+
+    def __init__(self, stream=None, maxsize=10_000):
+        self.maxsize = maxsize
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        super().__init__(queue.Queue(maxsize))
+        self.listener = None
+        self._start()
+        atexit.register(self._stop)
+        if hasattr(os, "register_at_fork"):
+            # Thread ghi log không sống sót qua fork, worker con tự mở lại
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def _stop(self):
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Chỉ ghép message ở đây (args có thể bị sửa sau khi trả về); format JSON ở listener
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.model_registry import BASELINE_VERSION, model_registry
+
+
+class Command(BaseCommand):
+    help = "Switch the grade model served by all workers (or list available versions)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("version", nargs="?", help=f"model version, or '{BASELINE_VERSION}'")
+        parser.add_argument("--list", action="store_true", help="list available versions")
+
+    def handle(self, *args, **options):
+        if options["list"] or not options["version"]:
+            active = model_registry.active_version() or BASELINE_VERSION
+            for version in [BASELINE_VERSION, *model_registry.versions()]:
+                marker = "*" if version == active else " "
+                self.stdout.write(f"{marker} {version}")
+            return
+
+        try:
+            model_registry.activate(options["version"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Activated model {options['version']}; workers reload within "
+            f"{model_registry.reload_interval:g}s"
+        ))
@@ -0,0 +1,142 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from pymongo.errors import PyMongoError
+
+from main.benchmarks.compare import compare
+from main.services.backtest_services import (
+    backtest_models,
+    backtest_predictions,
+    iter_outcome_chunks,
+)
+from main.services.model_registry import BASELINE_VERSION, model_registry
+from main.services.training_services import (
+    DEFAULT_CHUNK_SIZE,
+    TARGET_COLUMN,
+    generate_synthetic_students,
+    iter_csv_chunks,
+    iter_mongo_chunks,
+    iter_parquet_chunks,
+    positive_int,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Score model versions against actual grades: MAE, RMSE, R², calibration and "
+        "scoring throughput per version, with --compare to gate on regressions"
+    )
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument("--csv", help="held-out CSV file with a header row")
+        source.add_argument("--parquet", help="held-out Parquet file (requires pyarrow)")
+        source.add_argument("--mongo-collection", help="held-out MongoDB collection name")
+        source.add_argument("--synthetic", type=int, metavar="ROWS", help="generate ROWS fake students")
+        source.add_argument("--predictions", metavar="OUTCOMES_CSV",
+                            help="CSV of stored prediction ids and actual grades: evaluates what was served")
+
+        parser.add_argument("--models", help="comma-separated model versions (default: all saved ones and baseline)")
+        parser.add_argument("--target", default=TARGET_COLUMN, help="actual grade column (default: %(default)s)")
+        parser.add_argument("--chunk-size", type=positive_int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="scoring processes (default: %(default)s, 1 scores inline)")
+        parser.add_argument("--seed", type=int, default=1, help="seed for --synthetic")
+        parser.add_argument("--output", help="write the results as JSON to this file")
+        parser.add_argument("--compare", metavar="BASELINE", help="compare with a previous --output file")
+        parser.add_argument("--tolerance", type=float, default=10.0,
+                            help="percent a metric may get worse before it counts as a regression")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        target = options["target"]
+        started = time.perf_counter()
+        try:
+            if options["predictions"]:
+                source = f"predictions:{options['predictions']}"
+                totals, skipped = backtest_predictions(iter_outcome_chunks(options["predictions"], chunk_size, target))
+                skipped_label = "without a stored prediction"
+            else:
+                if options["csv"]:
+                    source = f"csv:{options['csv']}"
+                    chunks = iter_csv_chunks(options["csv"], chunk_size, target)
+                elif options["parquet"]:
+                    source = f"parquet:{options['parquet']}"
+                    chunks = iter_parquet_chunks(options["parquet"], chunk_size, target)
+                elif options["mongo_collection"]:
+                    source = f"mongo:{options['mongo_collection']}"
+                    chunks = iter_mongo_chunks(options["mongo_collection"], chunk_size, target)
+                else:
+                    source = f"synthetic:{options['synthetic']}:seed={options['seed']}"
+                    chunks = generate_synthetic_students(options["synthetic"], options["seed"], chunk_size)
+                totals, skipped = backtest_models(chunks, self.versions(options["models"]), options["workers"])
+                skipped_label = "dropped"
+        except (OSError, ValueError, ImportError, PyMongoError) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        results = {version: stats.result() for version, stats in totals.items()}
+        report = {
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "source": source,
+                "target": target,
+                "workers": 1 if options["predictions"] else options["workers"],
+                "skipped_rows": skipped,
+                "elapsed_seconds": round(elapsed, 3),
+            },
+            "results": results,
+        }
+
+        rows = max((result["rows"] for result in results.values()), default=0)
+        self.stdout.write(f"Backtested {rows:,} rows ({skipped:,} {skipped_label}) in {elapsed:.2f}s")
+        self.stdout.write(f"  {'model':24} {'rows':>10} {'mae':>8} {'rmse':>8} {'r2':>8} {'bias':>8} {'rows/s':>14}")
+        for version, result in sorted(results.items()):
+            if not result["rows"]:
+                self.stdout.write(f"  {version:24} {0:>10}")
+                continue
+            throughput = f"{result['scoring_rows_per_sec']:,.0f}" if "scoring_rows_per_sec" in result else "-"
+            self.stdout.write(
+                f"  {version:24} {result['rows']:>10,} {result['mae']:>8.3f} {result['rmse']:>8.3f} "
+                f"{result['r2']:>8.4f} {result['bias']:>+8.3f} {throughput:>14}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stderr.write(f"Results written to {options['output']}")
+
+        if options["compare"]:
+            self.compare(report, options["compare"], options["tolerance"])
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Backtested {len(results)} model version(s)"))
+
+    def versions(self, models):
+        if models:
+            versions = [version.strip() for version in models.split(",") if version.strip()]
+        else:
+            versions = model_registry.versions() + [BASELINE_VERSION]
+        available = set(model_registry.versions()) | {BASELINE_VERSION}
+        unknown = [version for version in versions if version not in available]
+        if unknown:
+            raise CommandError(f"Unknown model version {unknown[0]!r}, choose from {sorted(available)}")
+        return list(dict.fromkeys(versions))
+
+    def compare(self, report, path, tolerance):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read baseline {path}: {e}")
+
+        rows = compare(baseline, report, tolerance)
+        regressions = [row for row in rows if row[4]]
+        for metric, before, after, change, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            self.stderr.write(f"{metric:55} {before:12.3f} -> {after:12.3f} {change:+7.1f}% {flag}")
+        if regressions:
+            raise CommandError(f"{len(regressions)} metric(s) regressed by more than {tolerance:g}% vs {path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions beyond {tolerance:g}% ({len(rows)} metrics compared)"))
@@ -0,0 +1,92 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.benchmarks import load_benchmarks
+from main.benchmarks.compare import compare
+
+
+def comma_separated(cast):
+    def parse(value):
+        return tuple(cast(item) for item in value.split(",") if item.strip())
+    return parse
+
+
+class Command(BaseCommand):
+    help = "Run benchmarks against mongomock or a local mongod (never the configured database)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", metavar="name", help="benchmarks to run (omit to list them)")
+        parser.add_argument("--rows", type=int, default=1_000, help="size of the seeded dataset")
+        parser.add_argument("--iterations", type=int, help="operations to time (default: per benchmark)")
+        parser.add_argument("--concurrency", type=int, default=8, help="parallel clients, where relevant")
+        parser.add_argument("--mongo-uri", help="local mongod, e.g. mongodb://localhost:27017 (default: mongomock)")
+        parser.add_argument("--batch-sizes", type=comma_separated(int),
+                            help="predict_engine batch sizes, e.g. 1,100,10000")
+        parser.add_argument("--url", help="http_load: base URL of a running server (default: in-process)")
+        parser.add_argument("--endpoints", type=comma_separated(str),
+                            help="http_load: subset of register,login,predict,predict_batch")
+        parser.add_argument("--output", help="write the results as JSON to this file")
+        parser.add_argument("--compare", metavar="BASELINE", help="compare with a previous --output file")
+        parser.add_argument("--tolerance", type=float, default=10.0,
+                            help="percent a metric may get worse before it counts as a regression")
+
+    def handle(self, *args, **options):
+        benchmarks = load_benchmarks()
+        if not options["names"]:
+            for name, func in sorted(benchmarks.items()):
+                self.stdout.write(f"{name:20} {func.__doc__ or ''}")
+            return
+        unknown = [name for name in options["names"] if name not in benchmarks]
+        if unknown:
+            raise CommandError(f"Unknown benchmark {unknown[0]!r}, choose from {sorted(benchmarks)}")
+
+        report = {"meta": self.meta(options), "results": {}}
+        for name in options["names"]:
+            report["results"][name] = benchmarks[name](options)
+        self.stdout.write(json.dumps(report, indent=2))
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stderr.write(f"Results written to {options['output']}")
+
+        if options["compare"]:
+            self.compare(report, options["compare"], options["tolerance"])
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "database": options["mongo_uri"] or "mongomock",
+            "options": {key: options[key] for key in ("rows", "iterations", "concurrency")},
+        }
+
+    def compare(self, report, path, tolerance):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read baseline {path}: {e}")
+
+        rows = compare(baseline, report, tolerance)
+        regressions = [row for row in rows if row[4]]
+        for metric, before, after, change, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            self.stderr.write(f"{metric:55} {before:12.3f} -> {after:12.3f} {change:+7.1f}% {flag}")
+        if regressions:
+            raise CommandError(f"{len(regressions)} metric(s) regressed by more than {tolerance:g}% vs {path}")
+        self.stderr.write(f"No regressions beyond {tolerance:g}% ({len(rows)} metrics compared)")
@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.benchmarks.startup import profile_startup
+
+
+DEFAULT_PROFILES = ("Predict_Learning_Web.settings", "Predict_Learning_Web.settings_api")
+
+
+class Command(BaseCommand):
+    help = "Measure worker cold start (Django setup + URLconf) and import time per package"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile", action="append", dest="profiles",
+            help=f"settings module to measure, repeatable (default: {', '.join(DEFAULT_PROFILES)})",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="cold starts per profile (median is reported)")
+        parser.add_argument("--top", type=int, default=15, help="packages to list per profile")
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        results = []
+        for profile in options["profiles"] or DEFAULT_PROFILES:
+            try:
+                results.append(profile_startup(profile, options["repeat"], options["top"]))
+            except RuntimeError as e:
+                raise CommandError(str(e))
+
+        report = {"benchmark": "startup", "profiles": results}
+        if len(results) > 1:
+            baseline = results[0]["setup_ms"]
+            report["speedup"] = {
+                result["settings"]: round(baseline / result["setup_ms"], 2) for result in results[1:]
+            }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,109 @@
+from django.core.management.base import BaseCommand, CommandError
+from pymongo.errors import OperationFailure
+
+from main.models import (
+    Prediction, PredictionDailyRollup, PredictionJob, PredictionJobChunk, RevokedToken, ThrottleBucket, User,
+)
+
+
+DOCUMENTS = (
+    User, Prediction, PredictionDailyRollup, PredictionJob, PredictionJobChunk, RevokedToken, ThrottleBucket,
+)
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def index_options(spec):
+    # expireAfterSeconds=0 là giá trị hợp lệ, chỉ bỏ None/False
+    return {
+        option: spec[option] for option in INDEX_OPTIONS
+        if spec.get(option) is not None and spec.get(option) is not False
+    }
+
+
+def index_name(keys):
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the indexes declared on the MongoDB documents. Unique indexes are "
+        "only built after checking the existing data has no duplicates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="report what would be done")
+        parser.add_argument(
+            "--drop-conflicting", action="store_true",
+            help="drop an existing index on the same keys whose options differ, then rebuild it"
+        )
+
+    def handle(self, *args, **options):
+        problems = []
+        if not options["dry_run"]:
+            self.unset_blank_emails()
+
+        for document in DOCUMENTS:
+            collection = document._get_collection()
+            existing = collection.index_information()
+            for spec in document._meta["index_specs"]:
+                problem = self.ensure_index(collection, existing, spec, options)
+                if problem:
+                    problems.append(problem)
+
+        if problems:
+            raise CommandError("Some indexes were not built:\n  " + "\n  ".join(problems))
+        self.stdout.write(self.style.SUCCESS("All indexes are in place"))
+
+    def unset_blank_emails(self):
+        # Email rỗng "" vẫn bị index sparse tính là giá trị, nên bỏ hẳn field
+        result = User._get_collection().update_many({"email": {"$in": ["", None]}}, {"$unset": {"email": ""}})
+        if result.modified_count:
+            self.stdout.write(f"users: unset {result.modified_count} blank emails")
+
+    def ensure_index(self, collection, existing, spec, options):
+        keys = [tuple(key) for key in spec["fields"]]
+        wanted = index_options(spec)
+        name = spec.get("name") or index_name(keys)
+        label = f"{collection.name}.{name}"
+
+        for current_name, info in existing.items():
+            if [tuple(key) for key in info["key"]] != keys:
+                continue
+            current = index_options(info)
+            if current == wanted:
+                self.stdout.write(f"{label}: ok")
+                return None
+            if not options["drop_conflicting"]:
+                return f"{label}: index {current_name} exists with {current}, expected {wanted} (use --drop-conflicting)"
+            self.stdout.write(f"{label}: dropping {current_name} {current}")
+            if not options["dry_run"]:
+                collection.drop_index(current_name)
+
+        if wanted.get("unique"):
+            duplicates = self.find_duplicates(collection, keys, wanted.get("sparse", False))
+            if duplicates:
+                sample = ", ".join(str(d["_id"]) for d in duplicates)
+                return f"{label}: duplicate values must be fixed first, e.g. {sample}"
+
+        if options["dry_run"]:
+            self.stdout.write(f"{label}: would create {wanted}")
+            return None
+        try:
+            # MongoDB >= 4.2 builds indexes without blocking reads/writes for the whole build
+            collection.create_index(keys, name=name, background=True, **wanted)
+        except OperationFailure as e:
+            return f"{label}: {e}"
+        self.stdout.write(self.style.SUCCESS(f"{label}: created"))
+        return None
+
+    def find_duplicates(self, collection, keys, sparse, limit=5):
+        fields = [field for field, _ in keys]
+        pipeline = []
+        if sparse:
+            pipeline.append({"$match": {field: {"$exists": True} for field in fields}})
+        pipeline += [
+            {"$group": {"_id": {field: f"${field}" for field in fields}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$limit": limit},
+        ]
+        return list(collection.aggregate(pipeline, allowDiskUse=True))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from main.services.training_services import (
+    DEFAULT_CHUNK_SIZE,
+    generate_synthetic_students,
+    positive_int,
+    write_csv,
+)
+
+
+class Command(BaseCommand):
+    help = "Write a synthetic student dataset to CSV for offline training and benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="CSV file to write")
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--chunk-size", type=positive_int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunks = generate_synthetic_students(options["rows"], options["seed"], options["chunk_size"])
+        rows = write_csv(options["output"], chunks)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows:,} students to {options['output']}"))
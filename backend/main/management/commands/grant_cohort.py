@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from pymongo import ReturnDocument
+
+from main.models import User
+
+
+class Command(BaseCommand):
+    help = "Allow a user to see the analytics and exports of a cohort (or of every cohort with --staff)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("cohorts", nargs="*", help="cohort names, as sent with /predict/")
+        parser.add_argument("--staff", action="store_true", help="access to every cohort")
+        parser.add_argument("--revoke", action="store_true", help="take the cohorts (and --staff) away instead")
+
+    def handle(self, *args, **options):
+        if not options["cohorts"] and not options["staff"]:
+            raise CommandError("Give at least one cohort or --staff")
+
+        update = {}
+        if options["cohorts"]:
+            cohorts = {"$in": options["cohorts"]} if options["revoke"] else {"$each": options["cohorts"]}
+            update["$pull" if options["revoke"] else "$addToSet"] = {"cohorts": cohorts}
+        if options["staff"]:
+            update["$set"] = {"is_staff": not options["revoke"]}
+
+        user = User._get_collection().find_one_and_update(
+            {"username": options["username"]}, update,
+            projection={"cohorts": 1, "is_staff": 1}, return_document=ReturnDocument.AFTER,
+        )
+        if user is None:
+            raise CommandError(f"No user {options['username']!r}")
+        cohorts = ", ".join(user.get("cohorts") or []) or "none"
+        staff = " (staff: every cohort)" if user.get("is_staff") else ""
+        self.stdout.write(self.style.SUCCESS(f"{options['username']} can see cohorts: {cohorts}{staff}"))
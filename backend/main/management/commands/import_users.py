@@ -0,0 +1,59 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.import_services import DEFAULT_IMPORT_CHUNK_SIZE, UserImporter, iter_user_chunks
+from main.services.training_services import positive_int
+
+
+class Command(BaseCommand):
+    help = "Register users in bulk from a CSV (username,password[,email,first_name,last_name])"
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv", help="CSV file with a header row")
+        parser.add_argument("--chunk-size", type=positive_int, default=DEFAULT_IMPORT_CHUNK_SIZE,
+                            help="rows per lookup/insert round")
+        parser.add_argument("--workers", type=positive_int, default=os.cpu_count(),
+                            help="hashing processes (default: all cores)")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="validate and check duplicates only, hash and insert nothing")
+        parser.add_argument("--show-errors", type=int, default=20, metavar="N",
+                            help="print the first N rejected rows")
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options["csv"]):
+            raise CommandError(f"{options['csv']}: no such file")
+
+        started = time.perf_counter()
+        errors = []
+        try:
+            with UserImporter(options["workers"], options["dry_run"]) as importer:
+                for users, rejected in iter_user_chunks(options["csv"], options["chunk_size"]):
+                    errors += importer.import_chunk(users, rejected)[:max(options["show_errors"] - len(errors), 0)]
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{importer.stats['read']:>10,} rows read, {importer.stats['inserted']:,} inserted "
+                        f"({importer.stats['inserted'] / elapsed:,.0f} users/s)"
+                    )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        elapsed = time.perf_counter() - started
+        stats = importer.stats
+        for where, reason in errors:
+            self.stderr.write(f"  skipped {where}: {reason}")
+        self.stdout.write(
+            f"Read {stats['read']:,}: {stats['inserted']:,} inserted, {stats['existing']:,} already existed, "
+            f"{stats['duplicate_in_file']:,} duplicated in the file, {stats['invalid']:,} invalid, "
+            f"{stats['rejected_by_db']:,} rejected by the database"
+        )
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Dry run in {elapsed:.1f}s: {stats['new']:,} users would be imported"
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported in {elapsed:.1f}s: {stats['inserted'] / elapsed:,.0f} users/s "
+            f"with {importer.workers} hashing processes ({stats['hash_seconds']:.1f}s hashing)"
+        ))
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.analytics_services import AnalyticsService, start_of_day
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily prediction rollups (analytics endpoint) from the prediction "
+        "history, for every day before --until. Use it to backfill history recorded before "
+        "the rollups existed or after a failed rollup update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--until", help="YYYY-MM-DD, exclusive (default: today, UTC)")
+
+    def handle(self, *args, **options):
+        until = start_of_day(datetime.utcnow())
+        if options["until"]:
+            try:
+                until = min(until, datetime.strptime(options["until"], "%Y-%m-%d"))
+            except ValueError:
+                raise CommandError("--until must be a date like 2024-12-31")
+
+        started = datetime.utcnow()
+        written = AnalyticsService.rebuild_rollups(until)
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written:,} daily rollups before {until:%Y-%m-%d} in {elapsed:.1f}s"
+        ))
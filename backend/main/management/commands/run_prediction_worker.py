@@ -0,0 +1,71 @@
+import logging
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pymongo.errors import PyMongoError
+
+from main.services.job_services import JobService
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Score batch prediction jobs (POST /jobs/) chunk by chunk. Run as many of these "
+        "processes as needed, on any host that reaches the database: each chunk is claimed "
+        "by exactly one of them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="seconds to wait when there is nothing to do")
+        parser.add_argument("--exit-when-idle", action="store_true",
+                            help="stop once no chunk is left instead of polling")
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+        # Dừng sau khi xong chunk đang tính (docker stop gửi SIGTERM)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.stdout.write(f"Prediction worker {worker} started")
+
+        chunks = rows = 0
+        while not self.stopping:
+            try:
+                chunk = JobService.claim(worker)
+            except PyMongoError as e:
+                logger.error("worker %s: cannot claim a chunk: %s", worker, e)
+                time.sleep(options["poll_interval"])
+                continue
+            if chunk is None:
+                try:
+                    JobService.reconcile()
+                except PyMongoError as e:
+                    logger.error("worker %s: cannot reconcile jobs: %s", worker, e)
+                if options["exit_when_idle"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            if chunk["attempts"] > settings.PREDICTION_JOB_MAX_ATTEMPTS:
+                # Worker trước đó chết hoặc quá hạn lease nhiều lần với chunk này
+                JobService.release(chunk, worker, "lease expired too many times")
+                continue
+            try:
+                if JobService.process(chunk, worker):
+                    chunks += 1
+                    rows += len(chunk["columns"][0]) if chunk["columns"] else 0
+            except Exception as e:
+                logger.exception("worker %s: job %s chunk %d failed", worker, chunk["job_id"], chunk["index"])
+                JobService.release(chunk, worker, str(e) or type(e).__name__)
+
+        self.stdout.write(self.style.SUCCESS(f"Prediction worker {worker} stopped after {chunks} chunks, {rows} rows"))
+
+    def stop(self, signum, frame):
+        self.stopping = True
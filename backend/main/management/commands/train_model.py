@@ -0,0 +1,94 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.model_registry import model_registry
+from main.services.predict_services import FEATURES
+from main.services.training_services import (
+    DEFAULT_CHUNK_SIZE,
+    TARGET_COLUMN,
+    NormalEquationAccumulator,
+    clean_chunk,
+    generate_synthetic_students,
+    iter_csv_chunks,
+    iter_mongo_chunks,
+    iter_parquet_chunks,
+    positive_int,
+)
+
+
+class Command(BaseCommand):
+    help = "Fit the linear-regression grade model on a streamed dataset and save it as a new model version"
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument("--csv", help="CSV file with a header row")
+        source.add_argument("--parquet", help="Parquet file (requires pyarrow)")
+        source.add_argument("--mongo-collection", help="MongoDB collection name")
+        source.add_argument("--synthetic", type=int, metavar="ROWS", help="generate ROWS fake students")
+
+        parser.add_argument("--target", default=TARGET_COLUMN, help="target column (default: %(default)s)")
+        parser.add_argument("--chunk-size", type=positive_int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--ridge", type=float, default=0.0, help="L2 regularisation strength")
+        parser.add_argument("--seed", type=int, default=0, help="seed for --synthetic")
+        parser.add_argument("--model-version", help="model version name (default: lr-<timestamp>)")
+        parser.add_argument("--activate", action="store_true", help="serve the new version right away")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        target = options["target"]
+        if options["csv"]:
+            source = f"csv:{options['csv']}"
+            chunks = iter_csv_chunks(options["csv"], chunk_size, target)
+        elif options["parquet"]:
+            source = f"parquet:{options['parquet']}"
+            chunks = iter_parquet_chunks(options["parquet"], chunk_size, target)
+        elif options["mongo_collection"]:
+            source = f"mongo:{options['mongo_collection']}"
+            chunks = iter_mongo_chunks(options["mongo_collection"], chunk_size, target)
+        else:
+            source = f"synthetic:{options['synthetic']}:seed={options['seed']}"
+            chunks = generate_synthetic_students(options["synthetic"], options["seed"], chunk_size)
+
+        accumulator = NormalEquationAccumulator()
+        dropped = 0
+        started = time.perf_counter()
+        try:
+            for X, y in chunks:
+                X, y, skipped = clean_chunk(X, y)
+                dropped += skipped
+                accumulator.partial_fit(X, y)
+            intercept, weights = accumulator.solve(options["ridge"])
+        except (OSError, ValueError, ImportError) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        metrics = accumulator.metrics(intercept, weights)
+        version = options["model_version"] or datetime.now(timezone.utc).strftime("lr-%Y%m%d%H%M%S")
+        meta = {
+            "features": list(FEATURES),
+            "target": target,
+            "source": source,
+            "ridge": options["ridge"],
+            "rows": accumulator.n_rows,
+            "dropped_rows": dropped,
+            "training_metrics": metrics,
+        }
+        try:
+            path = model_registry.save(version, weights, intercept, meta)
+            if options["activate"]:
+                model_registry.activate(version)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"Trained on {accumulator.n_rows:,} rows ({dropped:,} dropped) in {elapsed:.2f}s "
+            f"({accumulator.n_rows / max(elapsed, 1e-9):,.0f} rows/s)"
+        )
+        self.stdout.write(f"  intercept: {intercept:.4f}")
+        for name, weight in zip(FEATURES, weights):
+            self.stdout.write(f"  {name}: {weight:.4f}")
+        self.stdout.write(f"  rmse: {metrics['rmse']:.4f}  r2: {metrics['r2']:.4f}")
+        status = "active" if options["activate"] else "run 'manage.py activate_model' to serve it"
+        self.stdout.write(self.style.SUCCESS(f"Saved model {version} to {path} ({status})"))
@@ -0,0 +1,269 @@
+"""
+Small in-process metrics registry, exposed in the Prometheus text format on /metrics.
+
+Every thread writes to its own shard (a plain dict), so recording needs no
+lock; a scrape sums the shards of all threads. Values are per worker
+process: each gunicorn worker reports its own series.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from pymongo import monitoring
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PREDICT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.reset()
+
+    def reset(self):
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def snapshot(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        totals = {}
+        for shard in shards:
+            for labels, value in list(shard.items()):
+                self._merge(totals, labels, value)
+        return totals
+
+    def format_labels(self, labels, extra=()):
+        pairs = [*zip(self.labelnames, labels), *extra]
+        if not pairs:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self.snapshot().items()):
+            lines.extend(self._lines(labels, value))
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        shard = self.shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, totals, labels, value):
+        totals[labels] = totals.get(labels, 0) + value
+
+    def _lines(self, labels, value):
+        return [f"{self.name}{self.format_labels(labels)} {value:g}"]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        shard = self.shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # [đếm theo bucket..., +Inf, sum]
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def _merge(self, totals, labels, value):
+        total = totals.setdefault(labels, [0] * len(value))
+        for i, item in enumerate(value):
+            total[i] += item
+
+    def _lines(self, labels, counts):
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), counts):
+            cumulative += count
+            le = bound if bound == "+Inf" else f"{bound:g}"
+            lines.append(f"{self.name}_bucket{self.format_labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{self.format_labels(labels)} {counts[-1]:g}")
+        lines.append(f"{self.name}_count{self.format_labels(labels)} {cumulative}")
+        return lines
+
+
+class GaugeCollector:
+    """Gauges read from a callback at scrape time, e.g. the stats() of a service"""
+
+    kind = "gauge"
+
+    def __init__(self, prefix, collect, documentation):
+        self.prefix = prefix
+        self.collect = collect
+        self.documentation = documentation
+
+    def expose(self):
+        lines = []
+        for key, value in self.collect().items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            lines += [f"# HELP {name} {self.documentation} ({key})", f"# TYPE {name} gauge", f"{name} {value:g}"]
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+        if hasattr(os, "register_at_fork"):
+            # Worker con không mang theo số liệu của process cha
+            os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        for metric in self._metrics:
+            if isinstance(metric, Metric):
+                metric.reset()
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def gauges(self, prefix, collect, documentation):
+        return self.register(GaugeCollector(prefix, collect, documentation))
+
+    def expose(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Request latency by view", ("view", "method"))
+REQUESTS = registry.counter(
+    "http_requests_total", "Requests by view and status code", ("view", "method", "status"))
+REQUEST_MONGO_COMMANDS = registry.histogram(
+    "http_request_mongo_commands", "MongoDB commands issued per request", ("view",), COUNT_BUCKETS)
+REQUEST_MONGO_SECONDS = registry.histogram(
+    "http_request_mongo_seconds", "Time spent in MongoDB per request", ("view",))
+MONGO_COMMAND_SECONDS = registry.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ("command",))
+MONGO_COMMAND_FAILURES = registry.counter(
+    "mongo_command_failures_total", "Failed MongoDB commands", ("command",))
+PASSWORD_HASH_SECONDS = registry.histogram(
+    "password_hash_duration_seconds", "Password hash/verify time on the hashing pool", ("operation",), HASH_BUCKETS)
+PREDICT_SECONDS = registry.histogram(
+    "prediction_duration_seconds", "Prediction compute time (validation + scoring)", ("kind",), PREDICT_BUCKETS)
+PREDICTED_ROWS = registry.counter(
+    "predicted_rows_total", "Students scored", ("kind",))
+
+
+class RequestStats(threading.local):
+    """MongoDB work done by the request running on this thread"""
+    commands = 0
+    seconds = 0.0
+
+
+request_stats = RequestStats()
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    pymongo calls these on the thread that ran the command, so the per-request
+    numbers are exact for sync views. Motor runs commands on its own thread
+    pool: those only show up in the per-command metrics.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(seconds, event.command_name)
+        request_stats.commands += 1
+        request_stats.seconds += seconds
+
+    def failed(self, event):
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(seconds, event.command_name)
+        MONGO_COMMAND_FAILURES.inc(event.command_name)
+        request_stats.commands += 1
+        request_stats.seconds += seconds
+
+
+command_listener = CommandMetricsListener()
+
+
+class timed:
+    """Context manager observing the elapsed time into a histogram"""
+
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, *labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+# Số liệu của các service, đọc lại mỗi lần scrape
+def _prediction_buffer_stats():
+    from main.services.history_services import prediction_buffer
+    return prediction_buffer.stats()
+
+
+def _prediction_cache_stats():
+    from main.services.predict_services import prediction_cache
+    return prediction_cache.stats()
+
+
+def _sweep_cache_stats():
+    from main.services.predict_services import sweep_cache
+    return sweep_cache.stats()
+
+
+def _mongo_pool_stats():
+    from main.services.mongo_connection import mongo_connection
+    return mongo_connection.stats()
+
+
+registry.gauges("prediction_buffer", _prediction_buffer_stats, "Prediction history write-behind buffer")
+registry.gauges("prediction_cache", _prediction_cache_stats, "Single prediction cache")
+registry.gauges("sweep_cache", _sweep_cache_stats, "What-if sweep grid cache")
+registry.gauges("mongo", _mongo_pool_stats, "MongoDB connection pool of this worker")
@@ -0,0 +1,49 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from main.metrics import (
+    REQUEST_MONGO_COMMANDS, REQUEST_MONGO_SECONDS, REQUEST_SECONDS, REQUESTS, request_stats,
+)
+
+
+class MetricsMiddleware:
+    """
+    Records latency and status per view, plus the MongoDB commands each
+    request issued (sync mode only, see CommandMetricsListener). Keep it
+    first in MIDDLEWARE so the time spent in other middleware is included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request_stats.commands = 0
+        request_stats.seconds = 0.0
+        started = time.perf_counter()
+        response = self.get_response(request)
+        view = self.record(request, response, time.perf_counter() - started)
+        REQUEST_MONGO_COMMANDS.observe(request_stats.commands, view)
+        REQUEST_MONGO_SECONDS.observe(request_stats.seconds, view)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, elapsed):
+        # Dùng tên route thay vì path để số series không tăng theo URL
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        REQUEST_SECONDS.observe(elapsed, view, request.method)
+        REQUESTS.inc(view, request.method, response.status_code)
+        return view
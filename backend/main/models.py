@@ -6,15 +6,23 @@ import hashlib
 class User(Document):
     """Simple User model for MongoDB connection test"""
     username = fields.StringField(required=True, unique=True, max_length=150)
-    email = fields.EmailField(required=False, unique=False)  # Sửa required=False
+    email = fields.EmailField(required=False, unique=True, sparse=True)  # sparse: user không có email không bị trùng
     password_hash = fields.StringField(required=True, max_length=255)
     first_name = fields.StringField(max_length=30)
     last_name = fields.StringField(max_length=30)
     date_joined = fields.DateTimeField(default=datetime.utcnow)
+    # Tăng sau mỗi lần ghi lịch sử dự đoán của user, dùng làm ETag cho GET /predictions/
+    history_version = fields.IntField(default=0)
+    # Quyền xem thống kê/export theo cohort (?cohort=): staff xem mọi cohort,
+    # user khác chỉ các cohort được cấp (`manage.py grant_cohort`)
+    is_staff = fields.BooleanField(default=False)
+    cohorts = fields.ListField(fields.StringField(max_length=50))
     
     meta = {
-        'collection': 'users'
-        # Bỏ indexes để tránh conflict
+        'collection': 'users',
+        # Index (username, email) được tạo bằng `manage.py ensure_indexes`,
+        # không tạo ngầm lúc truy vấn để tránh conflict với collection cũ
+        'auto_create_index': False,
     }
     
     def set_password(self, raw_password):
@@ -26,4 +34,144 @@ class User(Document):
         return check_password(raw_password, self.password_hash)
     
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.username
+
+class Prediction(Document):
+    """One grade prediction made by a user, newest first per user"""
+    user_id = fields.ObjectIdField(required=True)
+    study_hour_per_week = fields.FloatField(required=True)
+    previous_grade = fields.FloatField(required=True)
+    attendance_rate = fields.FloatField(required=True)
+    extracurricular_activities = fields.IntField(required=True)
+    final_grade = fields.FloatField(required=True)
+    model_version = fields.StringField(max_length=100)
+    cohort = fields.StringField(max_length=50)  # lớp/khóa do client gửi kèm, không bắt buộc
+    created_at = fields.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'predictions',
+        'auto_create_index': False,
+        'indexes': [
+            # Phục vụ phân trang keyset: user_id bằng nhau, (created_at, _id) giảm dần
+            {'fields': ['user_id', '-created_at', '-id'], 'name': 'user_created_at'},
+            # Thống kê theo cohort trong một khoảng thời gian; phần lớn dự đoán không có cohort
+            {'fields': ['cohort', '-created_at'], 'name': 'cohort_created_at', 'sparse': True},
+        ]
+    }
+
+
+class PredictionDailyRollup(Document):
+    """Totals of one day of predictions for one user or one cohort, updated on every history flush"""
+    scope = fields.StringField(required=True, choices=('user', 'cohort'))
+    key = fields.StringField(required=True)  # user_id dạng chuỗi hoặc tên cohort
+    day = fields.DateTimeField(required=True)  # 00:00 UTC
+    count = fields.IntField(default=0)
+    grade_sum = fields.FloatField(default=0.0)
+    grade_sq_sum = fields.FloatField(default=0.0)
+    grade_min = fields.FloatField()
+    grade_max = fields.FloatField()
+    feature_sums = fields.DictField()  # tên đặc trưng -> tổng
+    grade_buckets = fields.DictField()  # cận dưới của khoảng điểm ("0", "10", ...) -> số dự đoán
+    updated_at = fields.DateTimeField()
+
+    meta = {
+        'collection': 'prediction_daily_rollups',
+        'auto_create_index': False,
+        'indexes': [
+            {'fields': ['scope', 'key', 'day'], 'unique': True, 'name': 'scope_key_day'},
+        ]
+    }
+
+
+class RevokedToken(Document):
+    """jti of a refresh token that was used or revoked; MongoDB drops it once the token has expired"""
+    id = fields.StringField(primary_key=True)
+    user_id = fields.ObjectIdField()
+    revoked_at = fields.DateTimeField(default=datetime.utcnow)
+    expires_at = fields.DateTimeField(required=True)
+
+    meta = {
+        'collection': 'revoked_tokens',
+        'auto_create_index': False,
+        'indexes': [
+            # TTL index: tự xóa khi token hết hạn, danh sách luôn nhỏ
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0, 'name': 'expires_at_ttl'},
+            # Các worker đồng bộ theo revoked_at
+            {'fields': ['revoked_at'], 'name': 'revoked_at'},
+        ]
+    }
+
+
+class ThrottleBucket(Document):
+    """Token bucket of main.throttling.MongoBucketStore, keyed "<scope>:<ip or username>\""""
+    id = fields.StringField(primary_key=True)
+    tokens = fields.FloatField()
+    allowed = fields.BooleanField()
+    updated_at = fields.DateTimeField()
+    expires_at = fields.DateTimeField()
+
+    meta = {
+        'collection': 'throttle_buckets',
+        'auto_create_index': False,
+        'indexes': [
+            # Bucket đã đầy lại thì không cần giữ
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0, 'name': 'expires_at_ttl'},
+        ]
+    }
+
+
+class PredictionJob(Document):
+    """Batch prediction of an uploaded CSV, scored chunk by chunk by `manage.py run_prediction_worker`"""
+    user_id = fields.ObjectIdField(required=True)
+    filename = fields.StringField(max_length=255)
+    status = fields.StringField(required=True, choices=('uploading', 'queued', 'running', 'done', 'failed'))
+    total_rows = fields.IntField(default=0)
+    total_chunks = fields.IntField(default=0)
+    done_chunks = fields.IntField(default=0)
+    processed_rows = fields.IntField(default=0)
+    invalid_rows = fields.IntField(default=0)
+    scoring_seconds = fields.FloatField(default=0.0)  # tổng thời gian tính của các worker
+    model_versions = fields.ListField(fields.StringField())
+    counted_chunks = fields.ListField(fields.IntField())  # index các chunk đã cộng vào tiến độ
+    error = fields.StringField()
+    created_at = fields.DateTimeField(default=datetime.utcnow)
+    started_at = fields.DateTimeField()
+    updated_at = fields.DateTimeField()
+    finished_at = fields.DateTimeField()
+
+    meta = {
+        'collection': 'prediction_jobs',
+        'auto_create_index': False,
+        'indexes': [
+            {'fields': ['user_id', '-created_at'], 'name': 'user_created_at'},
+        ]
+    }
+
+
+class PredictionJobChunk(Document):
+    """
+    Up to PREDICTION_JOB_CHUNK_SIZE input rows of a job, stored column-wise,
+    and their grades once scored. A worker owns a chunk until lease_until;
+    a chunk whose worker died becomes claimable again after that.
+    """
+    job_id = fields.ObjectIdField(required=True)
+    index = fields.IntField(required=True)
+    status = fields.StringField(required=True, choices=('new', 'pending', 'claimed', 'done', 'failed'))
+    columns = fields.ListField(fields.ListField(fields.FloatField()))  # một list cho mỗi đặc trưng, NaN = ô lỗi
+    grades = fields.ListField(fields.FloatField(null=True))
+    invalid_rows = fields.IntField(default=0)
+    model_version = fields.StringField()
+    worker = fields.StringField()
+    attempts = fields.IntField(default=0)
+    lease_until = fields.DateTimeField()  # chunk pending: thời điểm tạo job, để job cũ được làm trước
+    error = fields.StringField()
+
+    meta = {
+        'collection': 'prediction_job_chunks',
+        'auto_create_index': False,
+        'indexes': [
+            {'fields': ['job_id', 'index'], 'unique': True, 'name': 'job_index'},
+            # Lệnh claim: status pending/claimed và lease_until đã qua, cũ nhất trước
+            {'fields': ['status', 'lease_until'], 'name': 'claimable'},
+        ]
+    }
@@ -0,0 +1,82 @@
+"""
+Lazy stand-ins for drf_yasg's `openapi` module and `swagger_auto_schema`.
+
+Importing drf_yasg costs ~150 ms per process (its __init__ pulls in
+pkg_resources), and serving workers never render the schema. Views record
+their annotations here; apply_schemas() replays them through the real
+drf_yasg decorator when the swagger view is first built.
+"""
+
+TYPE_OBJECT = "object"
+TYPE_STRING = "string"
+TYPE_NUMBER = "number"
+TYPE_INTEGER = "integer"
+TYPE_BOOLEAN = "boolean"
+TYPE_ARRAY = "array"
+TYPE_FILE = "file"
+
+FORMAT_DATE = "date"
+FORMAT_DATETIME = "date-time"
+FORMAT_EMAIL = "email"
+FORMAT_BINARY = "binary"
+
+IN_BODY = "body"
+IN_PATH = "path"
+IN_QUERY = "query"
+IN_FORM = "formData"
+IN_HEADER = "header"
+
+_pending = []
+
+
+class Deferred:
+    """A drf_yasg.openapi.<name>(*args, **kwargs) call, made on demand"""
+
+    def __init__(self, name, args, kwargs):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+    def build(self, module):
+        return getattr(module, self.name)(*build(self.args, module), **build(self.kwargs, module))
+
+
+def build(value, module):
+    if isinstance(value, Deferred):
+        return value.build(module)
+    if isinstance(value, dict):
+        return {key: build(item, module) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(build(item, module) for item in value)
+    return value
+
+
+def _deferred(name):
+    def factory(*args, **kwargs):
+        return Deferred(name, args, kwargs)
+    factory.__name__ = name
+    return factory
+
+
+Schema = _deferred("Schema")
+Response = _deferred("Response")
+Parameter = _deferred("Parameter")
+Items = _deferred("Items")
+
+
+def swagger_auto_schema(**overrides):
+    """Same arguments as drf_yasg.utils.swagger_auto_schema, applied later"""
+    def decorator(view_method):
+        _pending.append((view_method, overrides))
+        return view_method
+    return decorator
+
+
+def apply_schemas():
+    """Attach every recorded annotation with the real decorator (runs each one once)"""
+    from drf_yasg import openapi
+    from drf_yasg.utils import swagger_auto_schema as yasg_swagger_auto_schema
+
+    while _pending:
+        view_method, overrides = _pending.pop()
+        yasg_swagger_auto_schema(**build(overrides, openapi))(view_method)
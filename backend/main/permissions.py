@@ -0,0 +1,26 @@
+from bson import ObjectId
+from rest_framework.permissions import BasePermission
+
+from main.models import User
+
+
+COHORT_DENIED = "You do not have access to this cohort."
+
+
+def can_view_cohort(user_id, cohort):
+    """
+    Staff see every cohort, other users only those granted to them. The
+    cohort sent with /predict/ is free text, so it never grants access.
+    """
+    return User._get_collection().find_one(
+        {"_id": ObjectId(user_id), "$or": [{"is_staff": True}, {"cohorts": cohort}]}, {"_id": 1}
+    ) is not None
+
+
+class CanViewCohort(BasePermission):
+    """Guards views that take ?cohort=; requests without it are left to the other permissions"""
+    message = COHORT_DENIED
+
+    def has_permission(self, request, view):
+        cohort = request.query_params.get("cohort", "").strip()
+        return not cohort or can_view_cohort(request.user.id, cohort)
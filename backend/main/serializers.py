@@ -1,7 +1,54 @@
 from rest_framework import serializers
 
+from main.services.predict_services import FEATURES
+
 
 class RegisterSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=50)
     password = serializers.CharField(write_only=True)
     email = serializers.EmailField(required=False, allow_blank=True)
+
+
+class LoginSerializer(serializers.Serializer):
+    # CharField chỉ nhận chuỗi: {"$regex": ...} không bao giờ tới được truy vấn Mongo
+    username = serializers.CharField(max_length=50)
+    password = serializers.CharField(write_only=True)
+
+
+class PredictSerializer(serializers.Serializer):
+    studyHourPerWeek = serializers.FloatField(min_value=0, max_value=168)
+    previousGrade = serializers.FloatField(min_value=0, max_value=100)
+    attendanceRate = serializers.FloatField(min_value=0, max_value=100)
+    extracurricularActivities = serializers.IntegerField(min_value=0)
+    seed = serializers.IntegerField(required=False, min_value=0)
+    cohort = serializers.CharField(required=False, max_length=50)  # lớp/khóa, dùng cho thống kê
+
+
+class SweepAxisSerializer(serializers.Serializer):
+    """One swept feature: explicit `values`, or start..stop (inclusive) by step"""
+    feature = serializers.ChoiceField(choices=FEATURES)
+    values = serializers.ListField(child=serializers.FloatField(), required=False, allow_empty=False)
+    start = serializers.FloatField(required=False)
+    stop = serializers.FloatField(required=False)
+    step = serializers.FloatField(required=False)
+
+    def validate(self, attrs):
+        has_range = any(name in attrs for name in ("start", "stop", "step"))
+        if ("values" in attrs) == has_range:
+            raise serializers.ValidationError("Give either values or start, stop and step.")
+        if has_range:
+            if not all(name in attrs for name in ("start", "stop", "step")):
+                raise serializers.ValidationError("start, stop and step are all required.")
+            if attrs["step"] <= 0 or attrs["stop"] < attrs["start"]:
+                raise serializers.ValidationError("Expected start <= stop and step > 0.")
+        return attrs
+
+
+class SweepSerializer(serializers.Serializer):
+    inputs = PredictSerializer()
+    sweep = serializers.ListField(child=SweepAxisSerializer(), min_length=1, max_length=2)
+
+    def validate_sweep(self, value):
+        if len({axis["feature"] for axis in value}) != len(value):
+            raise serializers.ValidationError("Each feature can be swept only once.")
+        return value
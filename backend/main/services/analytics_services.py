@@ -0,0 +1,294 @@
+import logging
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from main.models import Prediction, PredictionDailyRollup
+
+
+logger = logging.getLogger(__name__)
+
+# Trường trong MongoDB -> tên đặc trưng trong API (giống serialize_prediction)
+FEATURE_FIELDS = {
+    "study_hour_per_week": "studyHourPerWeek",
+    "previous_grade": "previousGrade",
+    "attendance_rate": "attendanceRate",
+    "extracurricular_activities": "extracurricularActivities",
+}
+# Khoảng điểm 10 điểm một, khoảng cuối gồm cả 100
+BUCKET_WIDTH = 10
+BUCKETS = list(range(0, 100, BUCKET_WIDTH))
+MAX_DAYS = 366
+
+
+def start_of_day(moment):
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_of(grade):
+    return BUCKETS[max(0, min(int(grade // BUCKET_WIDTH), len(BUCKETS) - 1))]
+
+
+def rollup_keys(doc):
+    """(scope, key) pairs a prediction counts towards"""
+    keys = [("user", str(doc["user_id"]))]
+    if doc.get("cohort"):
+        keys.append(("cohort", doc["cohort"]))
+    return keys
+
+
+def rollup_updates(docs):
+    """
+    One $inc upsert per (scope, key, day) touched by docs, with the docs
+    pre-summed in Python so a flush of 500 predictions by a few users costs a
+    handful of updates rather than 500.
+    """
+    groups = {}
+    for doc in docs:
+        day = start_of_day(doc["created_at"])
+        grade = doc["final_grade"]
+        for scope, key in rollup_keys(doc):
+            group = groups.get((scope, key, day))
+            if group is None:
+                group = groups[(scope, key, day)] = {"inc": defaultdict(float), "min": grade, "max": grade}
+            inc = group["inc"]
+            inc["count"] += 1
+            inc["grade_sum"] += grade
+            inc["grade_sq_sum"] += grade * grade
+            for field in FEATURE_FIELDS:
+                inc[f"feature_sums.{field}"] += doc[field]
+            inc[f"grade_buckets.{bucket_of(grade)}"] += 1
+            group["min"] = min(group["min"], grade)
+            group["max"] = max(group["max"], grade)
+
+    now = datetime.utcnow()
+    return [
+        UpdateOne(
+            {"scope": scope, "key": key, "day": day},
+            {
+                "$inc": {name: int(value) if name == "count" or name.startswith("grade_buckets.") else value
+                         for name, value in group["inc"].items()},
+                "$min": {"grade_min": group["min"]},
+                "$max": {"grade_max": group["max"]},
+                "$set": {"updated_at": now},
+            },
+            upsert=True,
+        )
+        for (scope, key, day), group in groups.items()
+    ]
+
+
+def apply_rollups(docs):
+    """Flush hook of the prediction buffer: fold the inserted predictions into the daily rollups"""
+    updates = rollup_updates(docs)
+    if not updates:
+        return
+    try:
+        PredictionDailyRollup._get_collection().bulk_write(updates, ordered=False)
+    except (BulkWriteError, PyMongoError) as e:
+        # Lệch số liệu thì sửa được bằng `manage.py rebuild_rollups`
+        logger.error("rollups: %d updates for %d predictions failed: %s", len(updates), len(docs), e)
+
+
+def bucket_sums(prefix):
+    return {f"bucket_{lower}": {"$sum": {"$ifNull": [f"${prefix}.{lower}", 0]}} for lower in BUCKETS}
+
+
+def raw_bucket_counts():
+    """$group accumulators counting predictions per grade bucket"""
+    counts = {}
+    for lower in BUCKETS:
+        condition = {"$gte": ["$final_grade", lower]}
+        if lower != BUCKETS[-1]:
+            condition = {"$and": [condition, {"$lt": ["$final_grade", lower + BUCKET_WIDTH]}]}
+        counts[str(lower)] = {"$sum": {"$cond": [condition, 1, 0]}}
+    return counts
+
+
+class AnalyticsService:
+
+    @staticmethod
+    def window(days, now=None):
+        """[since, until) covering the last `days` days including today, in whole UTC days"""
+        until = start_of_day(now or datetime.utcnow()) + timedelta(days=1)
+        return until - timedelta(days=days), until
+
+    @staticmethod
+    def from_rollups(scope, key, days):
+        """
+        Reads at most `days` rollup documents through the (scope, key, day)
+        index and sums them in one $facet, whatever the number of predictions.
+        """
+        since, until = AnalyticsService.window(days)
+        totals = {
+            "_id": None,
+            "count": {"$sum": "$count"},
+            "grade_sum": {"$sum": "$grade_sum"},
+            "grade_sq_sum": {"$sum": "$grade_sq_sum"},
+            "grade_min": {"$min": "$grade_min"},
+            "grade_max": {"$max": "$grade_max"},
+            **{field: {"$sum": f"$feature_sums.{field}"} for field in FEATURE_FIELDS},
+            **bucket_sums("grade_buckets"),
+        }
+        pipeline = [
+            {"$match": {"scope": scope, "key": key, "day": {"$gte": since, "$lt": until}}},
+            {"$facet": {
+                "timeline": [
+                    {"$sort": {"day": 1}},
+                    {"$project": {"_id": 0, "day": 1, "count": 1, "grade_sum": 1}},
+                ],
+                "totals": [{"$group": totals}],
+            }},
+        ]
+        result = next(PredictionDailyRollup._get_collection().aggregate(pipeline))
+        timeline = [
+            {"day": row["day"].date().isoformat(), "count": row["count"],
+             "meanGrade": round(row["grade_sum"] / row["count"], 2) if row["count"] else None}
+            for row in result["timeline"]
+        ]
+        total = result["totals"][0] if result["totals"] else {"count": 0}
+        buckets = {lower: total.get(f"bucket_{lower}", 0) for lower in BUCKETS}
+        return AnalyticsService.summary(scope, key, days, "rollup", total, buckets, timeline)
+
+    @staticmethod
+    def from_predictions(scope, key, days):
+        """
+        Same summary computed straight from the prediction documents with
+        $group/$bucket, over the user_created_at / cohort_created_at index.
+        Exact to the last flushed prediction but scans the whole window.
+        """
+        since, until = AnalyticsService.window(days)
+        match = {"user_id": ObjectId(key)} if scope == "user" else {"cohort": key}
+        match["created_at"] = {"$gte": since, "$lt": until}
+        pipeline = [
+            {"$match": match},
+            {"$facet": {
+                "timeline": [
+                    {"$group": {
+                        "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                        "count": {"$sum": 1},
+                        "grade_sum": {"$sum": "$final_grade"},
+                    }},
+                    {"$sort": {"_id": 1}},
+                ],
+                "distribution": [
+                    {"$bucket": {
+                        "groupBy": "$final_grade",
+                        "boundaries": BUCKETS + [math.inf],
+                        "default": -1,  # điểm âm (không xảy ra vì đã clip)
+                        "output": {"count": {"$sum": 1}},
+                    }},
+                ],
+                "totals": [
+                    {"$group": {
+                        "_id": None,
+                        "count": {"$sum": 1},
+                        "grade_sum": {"$sum": "$final_grade"},
+                        "grade_sq_sum": {"$sum": {"$multiply": ["$final_grade", "$final_grade"]}},
+                        "grade_min": {"$min": "$final_grade"},
+                        "grade_max": {"$max": "$final_grade"},
+                        **{field: {"$sum": f"${field}"} for field in FEATURE_FIELDS},
+                    }},
+                ],
+            }},
+        ]
+        result = next(Prediction._get_collection().aggregate(pipeline, allowDiskUse=True))
+        timeline = [
+            {"day": row["_id"], "count": row["count"], "meanGrade": round(row["grade_sum"] / row["count"], 2)}
+            for row in result["timeline"]
+        ]
+        total = result["totals"][0] if result["totals"] else {"count": 0}
+        buckets = dict.fromkeys(BUCKETS, 0)
+        for row in result["distribution"]:
+            # Điểm 100 nằm trong [90, inf) nên gộp vào khoảng cuối
+            buckets[bucket_of(row["_id"])] += row["count"]
+        return AnalyticsService.summary(scope, key, days, "predictions", total, buckets, timeline)
+
+    @staticmethod
+    def summary(scope, key, days, source, total, buckets, timeline):
+        count = total["count"]
+        grade = None
+        features = None
+        if count:
+            mean = total["grade_sum"] / count
+            variance = max(total["grade_sq_sum"] / count - mean * mean, 0.0)
+            grade = {
+                "mean": round(mean, 2),
+                "std": round(math.sqrt(variance), 2),
+                "min": total["grade_min"],
+                "max": total["grade_max"],
+            }
+            features = {name: round(total[field] / count, 2) for field, name in FEATURE_FIELDS.items()}
+        return {
+            "scope": scope,
+            "key": key,
+            "days": days,
+            "source": source,
+            "count": count,
+            "grade": grade,
+            "featureMeans": features,
+            "distribution": [
+                {"from": lower, "to": lower + BUCKET_WIDTH, "count": buckets[lower]} for lower in BUCKETS
+            ],
+            "timeline": timeline,
+        }
+
+    @staticmethod
+    def rebuild_rollups(until=None):
+        """
+        Recompute every rollup of the days before `until` (default: today
+        00:00 UTC) from the predictions. Today is left to the flush hook, whose
+        $inc updates would otherwise race with the replacement.
+        """
+        until = until or start_of_day(datetime.utcnow())
+        day = {"$dateFromParts": {
+            "year": {"$year": "$created_at"}, "month": {"$month": "$created_at"}, "day": {"$dayOfMonth": "$created_at"},
+        }}
+        accumulators = {
+            "count": {"$sum": 1},
+            "grade_sum": {"$sum": "$final_grade"},
+            "grade_sq_sum": {"$sum": {"$multiply": ["$final_grade", "$final_grade"]}},
+            "grade_min": {"$min": "$final_grade"},
+            "grade_max": {"$max": "$final_grade"},
+            **{field: {"$sum": f"${field}"} for field in FEATURE_FIELDS},
+            **{f"bucket_{lower}": counter for lower, counter in raw_bucket_counts().items()},
+        }
+        groupings = (
+            ("user", {}, "$user_id"),
+            ("cohort", {"cohort": {"$exists": True, "$ne": None}}, "$cohort"),
+        )
+        now = datetime.utcnow()
+        written = 0
+        for scope, match, key in groupings:
+            rows = Prediction._get_collection().aggregate([
+                {"$match": {**match, "created_at": {"$lt": until}}},
+                {"$group": {"_id": {"key": key, "day": day}, **accumulators}},
+            ], allowDiskUse=True)
+            batch = []
+            for row in rows:
+                doc = {
+                    "scope": scope,
+                    "key": str(row["_id"]["key"]),
+                    "day": row["_id"]["day"],
+                    "count": row["count"],
+                    "grade_sum": row["grade_sum"],
+                    "grade_sq_sum": row["grade_sq_sum"],
+                    "grade_min": row["grade_min"],
+                    "grade_max": row["grade_max"],
+                    "feature_sums": {field: row[field] for field in FEATURE_FIELDS},
+                    "grade_buckets": {str(lower): row[f"bucket_{lower}"] for lower in BUCKETS if row[f"bucket_{lower}"]},
+                    "updated_at": now,
+                }
+                batch.append(ReplaceOne({"scope": scope, "key": doc["key"], "day": doc["day"]}, doc, upsert=True))
+                if len(batch) == 1000:
+                    PredictionDailyRollup._get_collection().bulk_write(batch, ordered=False)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                PredictionDailyRollup._get_collection().bulk_write(batch, ordered=False)
+                written += len(batch)
+        return written
@@ -0,0 +1,28 @@
+import asyncio
+import weakref
+
+from django.conf import settings
+
+from main.services.mongo_connection import mongo_connection
+
+
+# Một client cho mỗi event loop: motor gắn client vào loop ở lần dùng đầu tiên
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """Motor client for the running event loop (one per uvicorn worker in ASGI mode)"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncIOMotorClient(
+            settings.MONGODB_URI, io_loop=loop, **mongo_connection.client_options()
+        )
+        _clients[loop] = client
+    return client
+
+
+def get_async_db():
+    return get_async_client()[settings.MONGO_DATABASE_NAME]
@@ -1,102 +1,162 @@
-from django.contrib.auth.hashers import make_password, check_password
-from rest_framework.exceptions import ValidationError
-from main.models import User
-import time
+from bson import ObjectId
+from django.contrib.auth.hashers import make_password
+from mongoengine.errors import NotUniqueError
+from pymongo.errors import DuplicateKeyError
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 import jwt
-from django.conf import settings
+from main.models import User
+from main.services.async_mongo import get_async_db
+from main.services.hashing_services import HashingService
+from main.services.revocation_services import revocation_store
+from main.services.token_services import REFRESH, TokenService
+import logging
+import re
+from collections import namedtuple
+
+
+# Chỉ những field cần cho đăng nhập, không hydrate cả User Document
+LoginUser = namedtuple("LoginUser", ["id", "username", "email", "password_hash"])
+LOGIN_PROJECTION = {"username": 1, "email": 1, "password_hash": 1}
+
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
 
     @staticmethod
     def register_user(validated_data):
+        """
+        Single insert that relies on the unique indexes on username/email
+        (built by `manage.py ensure_indexes`) instead of a lookup beforehand.
+        """
+        user = User(
+            username=validated_data["username"],
+            email=validated_data.get("email") or None,
+            password_hash=HashingService.make_password(validated_data["password"])
+        )
+        try:
+            user.save(force_insert=True)
+        except NotUniqueError as e:
+            AuthService.raise_duplicate(e.__context__ or e)
+        return user
 
-        username = validated_data["username"]
-        email = validated_data["email"]
-        password = validated_data["password"]
-
-        if User.objects(username=username).first():
-            raise ValueError("Username already exists")
+    @staticmethod
+    def get_login_user(username):
+        """Projected lookup on the unique username index, returns a LoginUser or None"""
+        if not isinstance(username, str):
+            return None  # không để dict như {"$regex": ...} thành toán tử truy vấn
+        # find_one thẳng trên collection: không dựng QuerySet, không hydrate Document
+        doc = User._get_collection().find_one({"username": username}, LOGIN_PROJECTION)
+        if doc is None:
+            return None
+        return LoginUser(str(doc["_id"]), doc["username"], doc.get("email"), doc["password_hash"])
 
-        user = User.objects.create(
-            username=username,
-            email=email,
-            password_hash=make_password(password)
+    @staticmethod
+    async def aregister_user(validated_data):
+        user = User(
+            username=validated_data["username"],
+            email=validated_data.get("email") or None,
+            password_hash=await HashingService.amake_password(validated_data["password"])
         )
-        return user
+        user.validate()
+        doc = user.to_mongo().to_dict()
         try:
-            username = validated_data["Username"]
-            email = validated_data.get("Email", "")
-            password = validated_data["Password"]
-
-            print(f"DEBUG: Attempting to register user: {username}, {email}")
-
-            # Kiểm tra username đã tồn tại (MongoEngine syntax)
-            if User.objects(username=username).first():
-                raise ValidationError({"Username": "Username already exists."})
-
-            # Kiểm tra email đã tồn tại (nếu có)
-            if email and User.objects(email=email).first():
-                raise ValidationError({"Email": "Email already exists."})
-
-            # Tạo user mới
-            user = User(
-                username=username,
-                email=email,
-                first_name="",
-                last_name=""
+            result = await get_async_db()[User._meta["collection"]].insert_one(doc)
+        except DuplicateKeyError as e:
+            AuthService.raise_duplicate(e)
+        user.id = result.inserted_id
+        return user
+
+    @staticmethod
+    def raise_duplicate(error):
+        details = getattr(error, "details", None) or {}
+        if "email" in details.get("keyPattern", {}) or re.search(r"index: email", str(error)):
+            raise ValidationError({"email": ["Email already exists."]})
+        raise ValidationError({"username": ["Username already exists."]})
+
+    @staticmethod
+    def rehash_setter(user):
+        """Called by check_password when the stored hash uses outdated parameters"""
+        def setter(raw_password):
+            User._get_collection().update_one(
+                {"_id": ObjectId(user.id)},
+                {"$set": {"password_hash": make_password(raw_password)}}
             )
-            user.set_password(password)
-            user.save()
-            
-            print(f"DEBUG: User created successfully: {user.id}")
-            return user
+        return setter
 
-        except ValidationError:
-            raise
-        except Exception as e:
-            print(f"DEBUG: Error creating user: {str(e)}")
-            raise ValidationError({"error": f"Failed to create user: {str(e)}"})
+    @staticmethod
+    def build_tokens(user):
+        return {
+            **TokenService.issue_pair(user.id, user.username),
+            "user": {
+                "id": user.id,
+                "username": user.username,
+                "email": user.email,
+            }
+        }
+
+    @staticmethod
+    def refresh_tokens(refresh_token):
+        """
+        Rotate a refresh token: the old jti is revoked and a new pair issued.
+        No user lookup and no password hashing, only one insert into the
+        revocation list (which also catches a token being replayed).
+        """
+        try:
+            payload = TokenService.decode(refresh_token, REFRESH)
+        except jwt.ExpiredSignatureError:
+            raise AuthenticationFailed("Refresh token has expired")
+        except jwt.InvalidTokenError:
+            raise AuthenticationFailed("Invalid refresh token")
+
+        jti = payload.get("jti")
+        if not jti or revocation_store.is_revoked(jti):
+            raise AuthenticationFailed("Refresh token has been revoked")
+        if not revocation_store.revoke(jti, payload["user_id"], payload["exp"]):
+            raise AuthenticationFailed("Refresh token has been revoked")
+
+        return TokenService.issue_pair(payload["user_id"], payload.get("username"))
 
     @staticmethod
     def login_user(username, password):
         try:
-            print(f"DEBUG: Attempting to login user: {username}")
-            
-            # Tìm user với MongoEngine syntax
-            user = User.objects(username=username).first()
+            user = AuthService.get_login_user(username)
             if not user:
-                print(f"DEBUG: User not found: {username}")
+                logger.info("login failed", extra={"username": username, "reason": "unknown user"})
                 raise ValidationError({"detail": "Invalid username or password"})
 
-            if not user.check_password(password):
-                print(f"DEBUG: Password check failed for user: {username}")
+            if not HashingService.verify(password, user.password_hash, AuthService.rehash_setter(user)):
+                logger.info("login failed", extra={"username": username, "reason": "wrong password"})
                 raise ValidationError({"detail": "Invalid username or password"})
 
-            # Tạo JWT tokens
-            payload = {
-                'user_id': str(user.id),
-                'username': user.username,
-                'exp': time.time() + 3600  # 1 hour
-            }
-            
-            access_token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
-            refresh_token = jwt.encode({**payload, 'exp': time.time() + 86400}, settings.SECRET_KEY, algorithm='HS256')
-
-            print(f"DEBUG: Tokens generated successfully for user: {username}")
-
-            return {
-                "access": access_token,
-                "refresh": refresh_token,
-                "user": {
-                    "id": str(user.id),
-                    "username": user.username,
-                    "email": user.email,
-                }
-            }
+            logger.debug("login succeeded", extra={"username": username})
+            return AuthService.build_tokens(user)
 
         except ValidationError:
             raise
-        except Exception as e:
-            print(f"DEBUG: Login error: {str(e)}")
+        except Exception:
+            logger.exception("login error", extra={"username": username})
             raise ValidationError({"detail": "Login failed"})
+
+    @staticmethod
+    async def aget_login_user(username):
+        if not isinstance(username, str):
+            return None
+        doc = await get_async_db()[User._meta["collection"]].find_one({"username": username}, LOGIN_PROJECTION)
+        if doc is None:
+            return None
+        return LoginUser(str(doc["_id"]), doc["username"], doc.get("email"), doc["password_hash"])
+
+    @staticmethod
+    async def alogin_user(username, password):
+        """login_user for async views: the lookup goes through motor, the hash through the hashing pool"""
+        user = await AuthService.aget_login_user(username)
+        if not user:
+            logger.info("login failed", extra={"username": username, "reason": "unknown user"})
+            raise ValidationError({"detail": "Invalid username or password"})
+
+        if not await HashingService.averify(password, user.password_hash, AuthService.rehash_setter(user)):
+            logger.info("login failed", extra={"username": username, "reason": "wrong password"})
+            raise ValidationError({"detail": "Invalid username or password"})
+
+        return AuthService.build_tokens(user)
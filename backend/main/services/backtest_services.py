@@ -0,0 +1,192 @@
+import csv
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from main.models import Prediction
+from main.services.analytics_services import BUCKET_WIDTH, BUCKETS
+from main.services.model_registry import BASELINE_MODEL, BASELINE_VERSION, model_registry
+from main.services.predict_services import PredictService
+from main.services.process_pool import init_worker
+from main.services.training_services import clean_chunk
+
+
+_models = {}
+
+
+def load_model(version):
+    """Model of a version, loaded once per process"""
+    if version not in _models:
+        _models[version] = BASELINE_MODEL if version == BASELINE_VERSION else model_registry.load(version)
+    return _models[version]
+
+
+class BacktestStats:
+    """
+    Error sums of one model over any number of rows. Shards are scored
+    independently and merged, so only these sums cross process boundaries.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.error_sum = 0.0
+        self.abs_error_sum = 0.0
+        self.sq_error_sum = 0.0
+        self.actual_sum = 0.0
+        self.actual_sq_sum = 0.0
+        self.scoring_seconds = 0.0
+        self.bucket_count = np.zeros(len(BUCKETS))
+        self.bucket_predicted = np.zeros(len(BUCKETS))
+        self.bucket_actual = np.zeros(len(BUCKETS))
+
+    def update(self, predicted, actual, seconds=0.0):
+        error = predicted - actual
+        self.n_rows += len(actual)
+        self.error_sum += float(error.sum())
+        self.abs_error_sum += float(np.abs(error).sum())
+        self.sq_error_sum += float(error @ error)
+        self.actual_sum += float(actual.sum())
+        self.actual_sq_sum += float(actual @ actual)
+        self.scoring_seconds += seconds
+        # Hiệu chỉnh: theo khoảng điểm dự đoán, trung bình dự đoán so với trung bình thực tế
+        bucket = np.clip((predicted // BUCKET_WIDTH).astype(np.int64), 0, len(BUCKETS) - 1)
+        self.bucket_count += np.bincount(bucket, minlength=len(BUCKETS))
+        self.bucket_predicted += np.bincount(bucket, weights=predicted, minlength=len(BUCKETS))
+        self.bucket_actual += np.bincount(bucket, weights=actual, minlength=len(BUCKETS))
+
+    def merge(self, other):
+        for name in ("n_rows", "error_sum", "abs_error_sum", "sq_error_sum", "actual_sum", "actual_sq_sum",
+                     "scoring_seconds", "bucket_count", "bucket_predicted", "bucket_actual"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def result(self):
+        n = self.n_rows
+        if not n:
+            return {"rows": 0}
+        sst = self.actual_sq_sum - self.actual_sum ** 2 / n
+        result = {
+            "rows": n,
+            "mae": round(self.abs_error_sum / n, 4),
+            "rmse": round(float(np.sqrt(self.sq_error_sum / n)), 4),
+            "r2": round(1 - self.sq_error_sum / sst, 4) if sst > 0 else 0.0,
+            "bias": round(self.error_sum / n, 4),
+        }
+        if self.scoring_seconds:
+            result["scoring_rows_per_sec"] = round(n / self.scoring_seconds, 1)
+        result["calibration"] = [
+            {
+                "from": lower,
+                "to": lower + BUCKET_WIDTH,
+                "count": int(count),
+                "meanPredicted": round(float(predicted / count), 2),
+                "meanActual": round(float(actual / count), 2),
+            }
+            for lower, count, predicted, actual in zip(
+                BUCKETS, self.bucket_count, self.bucket_predicted, self.bucket_actual
+            )
+            if count
+        ]
+        return result
+
+
+def score_shard(versions, X, y):
+    """Runs in a pool process: every model on one shard, returns {version: BacktestStats}"""
+    stats = {}
+    for version in versions:
+        model = load_model(version)
+        started = time.perf_counter()
+        predicted = PredictService.predict(X, model=model)
+        seconds = time.perf_counter() - started
+        stats[version] = BacktestStats()
+        stats[version].update(predicted, y, seconds)
+    return stats
+
+
+def backtest_models(chunks, versions, workers=1):
+    """
+    Score (X, y) chunks with every model version, returns ({version: stats},
+    dropped rows). With workers > 1 the chunks are scored in a process pool,
+    at most 2 * workers in flight so memory stays bounded.
+    """
+    totals = {version: BacktestStats() for version in versions}
+    dropped = 0
+
+    def collect(stats):
+        for version, shard in stats.items():
+            totals[version].merge(shard)
+
+    if workers <= 1:
+        for X, y in chunks:
+            X, y, skipped = clean_chunk(X, y)
+            dropped += skipped
+            collect(score_shard(versions, X, y))
+        return totals, dropped
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        pending = set()
+        for X, y in chunks:
+            X, y, skipped = clean_chunk(X, y)
+            dropped += skipped
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future.result())
+            pending.add(pool.submit(score_shard, versions, X, y))
+        for future in pending:
+            collect(future.result())
+    return totals, dropped
+
+
+def iter_outcome_chunks(path, chunk_size, target):
+    """Stream (prediction ids, actual grades) from a CSV with an `id` column (as in the exports)"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = {"id", target} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+        ids, actual = [], []
+        for row in reader:
+            try:
+                prediction_id, grade = ObjectId(row["id"]), float(row[target])
+            except (InvalidId, TypeError, ValueError):
+                continue
+            if not np.isfinite(grade):  # float() nhận cả "nan", "inf": một dòng như vậy làm hỏng mọi tổng
+                continue
+            ids.append(prediction_id)
+            actual.append(grade)
+            if len(ids) == chunk_size:
+                yield ids, np.array(actual)
+                ids, actual = [], []
+        if ids:
+            yield ids, np.array(actual)
+
+
+def backtest_predictions(chunks):
+    """
+    Join stored predictions with actual grades (one `$in` query per chunk),
+    returns ({model_version that served them: stats}, rows without a match)
+    """
+    totals = {}
+    unmatched = 0
+    for ids, actual in chunks:
+        served = {
+            doc["_id"]: doc for doc in Prediction._get_collection().find(
+                {"_id": {"$in": ids}}, {"final_grade": 1, "model_version": 1}
+            )
+        }
+        by_version = {}
+        for prediction_id, grade in zip(ids, actual.tolist()):
+            doc = served.get(prediction_id)
+            if doc is None:
+                unmatched += 1
+                continue
+            pairs = by_version.setdefault(doc.get("model_version") or "unknown", ([], []))
+            pairs[0].append(doc["final_grade"])
+            pairs[1].append(grade)
+        for version, (predicted, grades) in by_version.items():
+            totals.setdefault(version, BacktestStats()).update(np.array(predicted), np.array(grades))
+    return totals, unmatched
@@ -0,0 +1,210 @@
+"""
+Prediction history exports streamed straight from a MongoDB cursor.
+
+The cursor is read `batch_size` documents at a time (the same size as the
+server's getMore batches) and each batch is encoded and handed to the
+response before the next one is fetched, so memory stays flat whether the
+export holds a hundred rows or millions. CSV batches are plain text chunks;
+Parquet batches each become one row group, with the footer written last.
+"""
+
+import csv
+import io
+from datetime import timezone
+
+from bson import ObjectId
+from rest_framework.exceptions import ValidationError
+
+from main.models import Prediction
+from main.services.analytics_services import FEATURE_FIELDS, AnalyticsService
+from main.services.async_mongo import get_async_db
+
+
+EXPORT_BATCH_SIZE = 5_000
+EXPORT_SORT = [("created_at", 1), ("_id", 1)]
+COLUMNS = ["id", "timestamp", "userId", "cohort", "modelVersion", *FEATURE_FIELDS.values(), "finalGrade"]
+# Export theo cohort chứa dự đoán của nhiều user: không kèm userId
+COHORT_COLUMNS = [name for name in COLUMNS if name != "userId"]
+
+
+def export_row(doc, with_user=True):
+    return [
+        str(doc["_id"]),
+        doc["created_at"].replace(tzinfo=timezone.utc).isoformat(),
+        *([str(doc["user_id"])] if with_user else []),
+        doc.get("cohort") or "",
+        doc.get("model_version") or "",
+        *(doc[field] for field in FEATURE_FIELDS),
+        doc["final_grade"],
+    ]
+
+
+class CsvEncoder:
+    content_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def __init__(self, with_user=True):
+        self.with_user = with_user
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def _drain(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data.encode()
+
+    def begin(self):
+        self.writer.writerow(COLUMNS if self.with_user else COHORT_COLUMNS)
+        return self._drain()
+
+    def encode(self, docs):
+        self.writer.writerows(export_row(doc, self.with_user) for doc in docs)
+        return self._drain()
+
+    def close(self):
+        return b""
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file for ParquetWriter whose bytes are taken out after each row group"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ParquetEncoder:
+    content_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, with_user=True):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        self.pa = pa
+        self.with_user = with_user
+        self.schema = pa.schema([
+            ("id", pa.string()),
+            ("timestamp", pa.timestamp("ms", tz="UTC")),
+            *([("userId", pa.string())] if with_user else []),
+            ("cohort", pa.string()),
+            ("modelVersion", pa.string()),
+            *((name, pa.int64() if field == "extracurricular_activities" else pa.float64())
+              for field, name in FEATURE_FIELDS.items()),
+            ("finalGrade", pa.float64()),
+        ])
+        self.sink = ChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema, compression="snappy")
+
+    def begin(self):
+        return self.sink.drain()
+
+    def encode(self, docs):
+        columns = {
+            "id": [str(doc["_id"]) for doc in docs],
+            "timestamp": [doc["created_at"].replace(tzinfo=timezone.utc) for doc in docs],
+            **({"userId": [str(doc["user_id"]) for doc in docs]} if self.with_user else {}),
+            "cohort": [doc.get("cohort") for doc in docs],
+            "modelVersion": [doc.get("model_version") for doc in docs],
+            **{name: [doc[field] for doc in docs] for field, name in FEATURE_FIELDS.items()},
+            "finalGrade": [doc["final_grade"] for doc in docs],
+        }
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema), row_group_size=len(docs))
+        return self.sink.drain()
+
+    def close(self):
+        self.writer.close()
+        return self.sink.drain()
+
+
+ENCODERS = {"csv": CsvEncoder, "parquet": ParquetEncoder}
+
+
+class ExportService:
+
+    @staticmethod
+    def encoder(kind, scope="user"):
+        if kind not in ENCODERS:
+            raise ValidationError({"type": [f"Choose one of {', '.join(ENCODERS)}."]})
+        return ENCODERS[kind](with_user=scope == "user")
+
+    @staticmethod
+    def query(scope, key, days=None):
+        """Filter on the leading fields of user_created_at / cohort_created_at"""
+        query = {"user_id": ObjectId(key)} if scope == "user" else {"cohort": key}
+        if days:
+            since, until = AnalyticsService.window(days)
+            query["created_at"] = {"$gte": since, "$lt": until}
+        return query
+
+    @staticmethod
+    def cursor(scope, key, days=None, batch_size=EXPORT_BATCH_SIZE):
+        return Prediction._get_collection().find(
+            ExportService.query(scope, key, days), sort=EXPORT_SORT, batch_size=batch_size
+        )
+
+    @staticmethod
+    def acursor(scope, key, days=None, batch_size=EXPORT_BATCH_SIZE):
+        collection = get_async_db()[Prediction._meta["collection"]]
+        return collection.find(ExportService.query(scope, key, days), sort=EXPORT_SORT, batch_size=batch_size)
+
+    @staticmethod
+    def stream(cursor, encoder, batch_size=EXPORT_BATCH_SIZE):
+        """Encoded chunks of the cursor's documents; closing the generator closes the cursor"""
+        try:
+            yield encoder.begin()
+            batch = []
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) == batch_size:
+                    yield encoder.encode(batch)
+                    batch = []
+            if batch:
+                yield encoder.encode(batch)
+            yield encoder.close()
+        finally:
+            cursor.close()
+
+    @staticmethod
+    async def astream(cursor, encoder, batch_size=EXPORT_BATCH_SIZE):
+        # Django chỉ stream được iterator async dưới ASGI (iterator sync bị gom hết vào list)
+        try:
+            yield encoder.begin()
+            batch = []
+            async for doc in cursor:
+                batch.append(doc)
+                if len(batch) == batch_size:
+                    yield encoder.encode(batch)
+                    batch = []
+            if batch:
+                yield encoder.encode(batch)
+            yield encoder.close()
+        finally:
+            await cursor.close()
+
+    @staticmethod
+    def filename(scope, key, encoder):
+        safe = "".join(char if char.isalnum() or char in "-_" else "_" for char in key)
+        return f"predictions-{scope}-{safe}.{encoder.extension}"
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+from main.metrics import PASSWORD_HASH_SECONDS
+
+
+class HashingService:
+    """
+    Password hashing on a bounded, per-process thread pool. argon2-cffi
+    releases the GIL while hashing, so the pool caps how many cores a login
+    burst can take while the calling thread or event loop stays free.
+    """
+
+    _executor = None
+    _pid = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def executor(cls):
+        # Tạo lại pool sau khi gunicorn fork worker
+        if cls._executor is None or cls._pid != os.getpid():
+            with cls._lock:
+                if cls._executor is None or cls._pid != os.getpid():
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=settings.PASSWORD_HASH_WORKERS,
+                        thread_name_prefix="password-hash",
+                    )
+                    cls._pid = os.getpid()
+        return cls._executor
+
+    @classmethod
+    def _timed(cls, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started, func.__name__)
+
+    @classmethod
+    def make_password(cls, raw_password):
+        return cls.executor().submit(cls._timed, make_password, raw_password).result()
+
+    @classmethod
+    def verify(cls, raw_password, encoded, setter=None):
+        """check_password on the pool; setter(raw_password) is called when the hash must be upgraded"""
+        return cls.executor().submit(cls._timed, check_password, raw_password, encoded, setter).result()
+
+    @classmethod
+    async def amake_password(cls, raw_password):
+        return await asyncio.wrap_future(cls.executor().submit(cls._timed, make_password, raw_password))
+
+    @classmethod
+    async def averify(cls, raw_password, encoded, setter=None):
+        future = cls.executor().submit(cls._timed, check_password, raw_password, encoded, setter)
+        return await asyncio.wrap_future(future)
@@ -0,0 +1,157 @@
+import base64
+import logging
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from pymongo.errors import PyMongoError
+from rest_framework.exceptions import ValidationError
+
+from main.models import Prediction, User
+from main.services.analytics_services import apply_rollups
+from main.services.async_mongo import get_async_db
+from main.services.write_buffer import BulkWriteBuffer
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+PAGE_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def bump_history_versions(docs):
+    """Invalidate the history ETags of the users whose predictions were just inserted"""
+    user_ids = list({doc["user_id"] for doc in docs})
+    try:
+        User._get_collection().update_many({"_id": {"$in": user_ids}}, {"$inc": {"history_version": 1}})
+    except PyMongoError as e:
+        logger.error("history_version of %d users not bumped: %s", len(user_ids), e)
+
+
+def on_history_flush(docs):
+    # Tăng version sau khi insert (không phải trước): ETag cũ đi kèm dữ liệu mới
+    # chỉ làm client tải lại một lần, ngược lại client sẽ giữ mãi bản cũ
+    bump_history_versions(docs)
+    apply_rollups(docs)
+
+
+# Lịch sử được ghi theo lô thay vì một round-trip tới Atlas cho mỗi request;
+# sau mỗi lô, history_version của user và các bản tổng hợp theo ngày
+# (analytics_services) được cập nhật
+prediction_buffer = BulkWriteBuffer(
+    Prediction._get_collection,
+    max_size=settings.PREDICTION_BUFFER_SIZE,
+    max_delay=settings.PREDICTION_BUFFER_MAX_DELAY,
+    max_queue=settings.PREDICTION_BUFFER_MAX_QUEUE,
+    name="prediction-buffer",
+    on_flush=on_history_flush,
+)
+
+
+def encode_cursor(created_at, prediction_id):
+    """Opaque cursor pointing just after (created_at, _id) in newest-first order"""
+    millis = int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    raw = f"{millis}:{prediction_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        millis, prediction_id = raw.split(":")
+        created_at = datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc).replace(tzinfo=None)
+        return created_at, ObjectId(prediction_id)
+    except (ValueError, UnicodeDecodeError, InvalidId):
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+
+
+def serialize_prediction(doc):
+    """Raw pymongo document -> API representation (same shape as the FE history items)"""
+    return {
+        "id": str(doc["_id"]),
+        "timestamp": doc["created_at"].replace(tzinfo=timezone.utc).isoformat(),
+        "finalGrade": doc["final_grade"],
+        "modelVersion": doc.get("model_version"),
+        "cohort": doc.get("cohort"),
+        "inputs": {
+            "studyHourPerWeek": doc["study_hour_per_week"],
+            "previousGrade": doc["previous_grade"],
+            "attendanceRate": doc["attendance_rate"],
+            "extracurricularActivities": doc["extracurricular_activities"],
+        },
+    }
+
+
+class HistoryService:
+
+    @staticmethod
+    def record(user_id, inputs, final_grade, model_version, cohort=None):
+        """Queue a prediction for the next bulk insert, returns the document"""
+        prediction = Prediction(
+            id=ObjectId(),
+            user_id=ObjectId(user_id),
+            study_hour_per_week=inputs["studyHourPerWeek"],
+            previous_grade=inputs["previousGrade"],
+            attendance_rate=inputs["attendanceRate"],
+            extracurricular_activities=inputs["extracurricularActivities"],
+            final_grade=final_grade,
+            model_version=model_version,
+            cohort=cohort or None,
+            created_at=datetime.utcnow(),
+        )
+        doc = prediction.to_mongo().to_dict()
+        prediction_buffer.add(doc)
+        return doc
+
+    @staticmethod
+    def history_version(user_id):
+        """Write counter of a user's history: one primary-key read, no prediction query"""
+        doc = User._get_collection().find_one({"_id": ObjectId(user_id)}, {"history_version": 1})
+        return (doc or {}).get("history_version", 0)
+
+    @staticmethod
+    def page_query(user_id, cursor=None):
+        """
+        Keyset pagination over the (user_id, -created_at, -_id) index: each page
+        is an index range scan starting after the cursor, so the cost does not
+        grow with how deep the client has paged (unlike skip/limit).
+        """
+        query = {"user_id": ObjectId(user_id)}
+        if cursor:
+            created_at, prediction_id = decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": prediction_id}},
+            ]
+        return query
+
+    @staticmethod
+    def build_page(docs, limit):
+        """Returns (items, next_cursor) from up to limit + 1 documents"""
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            last = docs[-1]
+            next_cursor = encode_cursor(last["created_at"], last["_id"])
+        return [serialize_prediction(doc) for doc in docs], next_cursor
+
+    @staticmethod
+    def list_for_user(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        docs = list(
+            Prediction._get_collection()
+            .find(HistoryService.page_query(user_id, cursor), sort=PAGE_SORT)
+            .limit(limit + 1)
+        )
+        return HistoryService.build_page(docs, limit)
+
+    @staticmethod
+    async def alist_for_user(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        collection = get_async_db()[Prediction._meta["collection"]]
+        docs = await (
+            collection.find(HistoryService.page_query(user_id, cursor), sort=PAGE_SORT)
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
+        )
+        return HistoryService.build_page(docs, limit)
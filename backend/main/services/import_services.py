@@ -0,0 +1,159 @@
+import csv
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from pymongo.errors import BulkWriteError
+
+from main.models import User
+from main.services.process_pool import init_worker
+
+
+DEFAULT_IMPORT_CHUNK_SIZE = 1_000
+DUPLICATE_KEY = 11000
+MAX_LENGTHS = {"username": 150, "first_name": 30, "last_name": 30}
+
+
+def duplicate_field(error):
+    """Field whose unique index a duplicate-key write error hit, from keyPattern or errmsg"""
+    key_pattern = error.get("keyPattern") or {}
+    if key_pattern:
+        return next(iter(key_pattern))
+    match = re.search(r"index: (\w+?)_-?1\b", error.get("errmsg") or "")
+    return match.group(1) if match else None
+
+
+def hash_passwords(passwords):
+    """Runs in a pool process: one pickled round-trip per batch, not per password"""
+    from django.contrib.auth.hashers import make_password
+    return [make_password(password) for password in passwords]
+
+
+def clean_row(row):
+    """Normalised user fields from a CSV row, or raises ValueError with the reason"""
+    username = (row.get("username") or "").strip()
+    password = row.get("password") or ""
+    email = (row.get("email") or "").strip()
+    if not username:
+        raise ValueError("username is required")
+    if not password:
+        raise ValueError("password is required")
+    if email:
+        try:
+            validate_email(email)
+        except DjangoValidationError:
+            raise ValueError(f"invalid email {email!r}")
+
+    user = {"username": username, "password": password}
+    if email:
+        user["email"] = email
+    for name in ("first_name", "last_name"):
+        if (row.get(name) or "").strip():
+            user[name] = row[name].strip()
+    for name, limit in MAX_LENGTHS.items():
+        if len(user.get(name, "")) > limit:
+            raise ValueError(f"{name} longer than {limit} characters")
+    return user
+
+
+def iter_user_chunks(path, chunk_size=DEFAULT_IMPORT_CHUNK_SIZE):
+    """Stream (users, rejected) chunks from a CSV with a header; rejected is [(line, reason)]"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = {"username", "password"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+
+        users, rejected = [], []
+        for row in reader:
+            try:
+                users.append(clean_row(row))
+            except ValueError as e:
+                rejected.append((reader.line_num, str(e)))
+            if len(users) + len(rejected) == chunk_size:
+                yield users, rejected
+                users, rejected = [], []
+        if users or rejected:
+            yield users, rejected
+
+
+class UserImporter:
+    """
+    Bulk registration: per chunk one `$in` lookup for existing usernames,
+    password hashing spread over a process pool, one unordered insert_many.
+    The unique indexes still have the final word (a duplicate email, or a
+    username registered concurrently after the lookup).
+    """
+
+    def __init__(self, workers=None, dry_run=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self.seen = set()
+        self.stats = {
+            "read": 0, "invalid": 0, "duplicate_in_file": 0, "existing": 0, "new": 0,
+            "inserted": 0, "rejected_by_db": 0, "hash_seconds": 0.0,
+        }
+
+    def __enter__(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.pool.shutdown(cancel_futures=True)
+
+    def import_chunk(self, users, rejected):
+        """Returns the rejected rows of this chunk, [(line or username, reason)]"""
+        self.stats["read"] += len(users) + len(rejected)
+        self.stats["invalid"] += len(rejected)
+        errors = list(rejected)
+
+        fresh = []
+        for user in users:
+            if user["username"] in self.seen:
+                self.stats["duplicate_in_file"] += 1
+                errors.append((user["username"], "duplicate username in file"))
+            else:
+                self.seen.add(user["username"])
+                fresh.append(user)
+
+        existing = {
+            doc["username"] for doc in User._get_collection().find(
+                {"username": {"$in": [user["username"] for user in fresh]}}, {"username": 1, "_id": 0}
+            )
+        } if fresh else set()
+        self.stats["existing"] += len(existing)
+        errors += [(username, "username already exists") for username in existing]
+        fresh = [user for user in fresh if user["username"] not in existing]
+        self.stats["new"] += len(fresh)
+        if not fresh or self.dry_run:
+            return errors
+
+        started = time.perf_counter()
+        hashes = self.hash_all([user.pop("password") for user in fresh])
+        self.stats["hash_seconds"] += time.perf_counter() - started
+
+        now = datetime.utcnow()
+        docs = [{**user, "password_hash": password_hash, "date_joined": now} for user, password_hash in zip(fresh, hashes)]
+        try:
+            self.stats["inserted"] += len(User._get_collection().insert_many(docs, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            self.stats["inserted"] += e.details.get("nInserted", 0)
+            for error in e.details.get("writeErrors", []):
+                self.stats["rejected_by_db"] += 1
+                if error.get("code") == DUPLICATE_KEY:
+                    # Username cũng có thể trùng ở đây nếu được đăng ký đồng thời sau lần tra `$in`
+                    reason = f"{duplicate_field(error) or 'unique key'} already exists"
+                else:
+                    reason = error.get("errmsg")
+                errors.append((docs[error["index"]]["username"], reason))
+        return errors
+
+    def hash_all(self, passwords):
+        # Vài batch cho mỗi process để cân tải mà không tốn IPC cho từng mật khẩu
+        batch_size = max(1, -(-len(passwords) // (self.workers * 4)))
+        batches = [passwords[i:i + batch_size] for i in range(0, len(passwords), batch_size)]
+        return [password_hash for batch in self.pool.map(hash_passwords, batches) for password_hash in batch]
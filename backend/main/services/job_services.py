@@ -0,0 +1,335 @@
+"""
+Batch prediction jobs.
+
+POST /jobs/ parses the uploaded CSV into chunk documents and returns at
+once; `manage.py run_prediction_worker` processes (any number of them)
+claim one chunk at a time with an atomic find_one_and_update, score it in
+one vectorized pass and write all its grades in a single update. A claim is
+a lease: if a worker dies, its chunk is claimable again once the lease ends.
+Job progress is counted once per chunk index, so a worker that dies between
+finishing a chunk and counting it is caught up by the next idle worker.
+"""
+
+import codecs
+import csv
+import io
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from pymongo import ReturnDocument
+from rest_framework.exceptions import ValidationError
+
+from main.models import PredictionJob, PredictionJobChunk
+from main.services.async_mongo import get_async_db
+from main.services.model_registry import model_registry
+from main.services.predict_services import FEATURES, FEATURE_BOUNDS, PredictService
+
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH = 20  # chunk mỗi lần insert_many khi upload
+RESULT_COLUMNS = ["row", *FEATURES, "finalGrade"]
+
+
+def parse_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def format_value(value):
+    if value is None or math.isnan(value):
+        return ""
+    return int(value) if value.is_integer() else value
+
+
+def utc_iso(moment):
+    return moment.replace(tzinfo=timezone.utc).isoformat() if moment else None
+
+
+def serialize_job(doc):
+    now = datetime.utcnow()
+    started = doc.get("started_at")
+    elapsed = ((doc.get("finished_at") or now) - started).total_seconds() if started else 0.0
+    rows_per_sec = doc["processed_rows"] / elapsed if elapsed > 0 else None
+    remaining = doc["total_rows"] - doc["processed_rows"]
+    return {
+        "id": str(doc["_id"]),
+        "status": doc["status"],
+        "filename": doc.get("filename"),
+        "totalRows": doc["total_rows"],
+        "processedRows": doc["processed_rows"],
+        "invalidRows": doc["invalid_rows"],
+        "progress": round(doc["processed_rows"] / doc["total_rows"], 4) if doc["total_rows"] else 1.0,
+        "chunks": {"total": doc["total_chunks"], "done": doc["done_chunks"]},
+        "rowsPerSec": round(rows_per_sec, 1) if rows_per_sec else None,
+        "etaSeconds": round(remaining / rows_per_sec, 1) if rows_per_sec and doc["status"] == "running" else None,
+        "modelVersions": doc.get("model_versions", []),
+        "error": doc.get("error"),
+        "createdAt": utc_iso(doc["created_at"]),
+        "startedAt": utc_iso(started),
+        "finishedAt": utc_iso(doc.get("finished_at")),
+    }
+
+
+class JobService:
+
+    @staticmethod
+    def create(user_id, upload):
+        """Store the CSV as pending chunks, returns the queued job document"""
+        now = datetime.utcnow()
+        job = PredictionJob(
+            id=ObjectId(), user_id=ObjectId(user_id), filename=(upload.name or "")[:255],
+            status="uploading", created_at=now, updated_at=now,
+        ).to_mongo().to_dict()
+        PredictionJob._get_collection().insert_one(job)
+        try:
+            JobService.store_chunks(job, upload)
+        except Exception:
+            JobService.delete(job["_id"])
+            raise
+
+        # Chỉ mở cho worker khi đã ghi đủ mọi chunk
+        PredictionJobChunk._get_collection().update_many({"job_id": job["_id"]}, {"$set": {"status": "pending"}})
+        job.update(status="queued", updated_at=datetime.utcnow())
+        PredictionJob._get_collection().update_one({"_id": job["_id"]}, {"$set": {
+            "status": "queued", "total_rows": job["total_rows"], "total_chunks": job["total_chunks"],
+            "updated_at": job["updated_at"],
+        }})
+        return job
+
+    @staticmethod
+    def store_chunks(job, upload):
+        """Stream the upload into chunk documents, INSERT_BATCH chunks per insert_many"""
+        chunk_size = settings.PREDICTION_JOB_CHUNK_SIZE
+        max_rows = settings.PREDICTION_JOB_MAX_ROWS
+        collection = PredictionJobChunk._get_collection()
+
+        def flush(pending):
+            collection.insert_many(pending, ordered=False)
+            job["total_chunks"] += len(pending)
+            return []
+
+        try:
+            reader = csv.reader(codecs.iterdecode(upload, "utf-8-sig"))  # từng dòng, không đọc cả file
+            header = [name.strip() for name in next(reader, None) or []]
+            missing = [name for name in FEATURES if name not in header]
+            if missing:
+                raise ValidationError({"file": [f"Missing column(s): {', '.join(missing)}."]})
+            positions = [header.index(name) for name in FEATURES]
+
+            pending, rows = [], []
+            for row in reader:
+                if not row:
+                    continue
+                rows.append([parse_number(row[i]) if i < len(row) else math.nan for i in positions])
+                job["total_rows"] += 1
+                if job["total_rows"] > max_rows:
+                    raise ValidationError({"file": [f"A job must not exceed {max_rows} rows."]})
+                if len(rows) == chunk_size:
+                    pending.append(JobService.chunk_doc(job, job["total_chunks"] + len(pending), rows))
+                    rows = []
+                    if len(pending) == INSERT_BATCH:
+                        pending = flush(pending)
+            if rows:
+                pending.append(JobService.chunk_doc(job, job["total_chunks"] + len(pending), rows))
+            if pending:
+                flush(pending)
+        except UnicodeDecodeError:
+            raise ValidationError({"file": ["The file must be a UTF-8 CSV."]})
+        except csv.Error as e:
+            raise ValidationError({"file": [f"Invalid CSV: {e}"]})
+        if not job["total_rows"]:
+            raise ValidationError({"file": ["The file has no rows."]})
+
+    @staticmethod
+    def chunk_doc(job, index, rows):
+        return {
+            "_id": ObjectId(),
+            "job_id": job["_id"],
+            "index": index,
+            "status": "new",
+            "columns": np.asarray(rows, dtype=np.float64).T.tolist(),
+            "attempts": 0,
+            "lease_until": job["created_at"],
+        }
+
+    @staticmethod
+    def delete(job_id):
+        PredictionJobChunk._get_collection().delete_many({"job_id": job_id})
+        PredictionJob._get_collection().delete_one({"_id": job_id})
+
+    @staticmethod
+    def get_for_user(job_id, user_id):
+        try:
+            job_id = ObjectId(job_id)
+        except (InvalidId, TypeError):
+            return None
+        return PredictionJob._get_collection().find_one({"_id": job_id, "user_id": ObjectId(user_id)})
+
+    @staticmethod
+    def claim(worker):
+        """Atomically take the oldest claimable chunk, or None"""
+        now = datetime.utcnow()
+        return PredictionJobChunk._get_collection().find_one_and_update(
+            {"status": {"$in": ["pending", "claimed"]}, "lease_until": {"$lte": now}},
+            {
+                "$set": {
+                    "status": "claimed",
+                    "worker": worker,
+                    "lease_until": now + timedelta(seconds=settings.PREDICTION_JOB_LEASE_SECONDS),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("lease_until", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    def score(columns):
+        """(grades with None for invalid rows, invalid count, model version) of one chunk"""
+        X = np.asarray(columns, dtype=np.float64).T.reshape(-1, len(FEATURES))
+        lower = np.array([FEATURE_BOUNDS[name][0] for name in FEATURES])
+        upper = np.array([FEATURE_BOUNDS[name][1] for name in FEATURES])
+        valid = np.isfinite(X).all(axis=1) & (X >= lower).all(axis=1) & (X <= upper).all(axis=1)
+        valid &= X[:, 3] == np.floor(X[:, 3])
+
+        model = model_registry.get_model()
+        grades = np.full(len(X), np.nan)
+        grades[valid] = PredictService.predict(X[valid], model=model)
+        return [None if math.isnan(grade) else grade for grade in grades.tolist()], int((~valid).sum()), model.version
+
+    @staticmethod
+    def process(chunk, worker):
+        """Score a claimed chunk and record the result; False if the lease was lost meanwhile"""
+        started = time.perf_counter()
+        grades, invalid, model_version = JobService.score(chunk["columns"])
+        seconds = time.perf_counter() - started
+
+        written = PredictionJobChunk._get_collection().update_one(
+            {"_id": chunk["_id"], "worker": worker, "status": "claimed"},
+            {"$set": {"status": "done", "grades": grades, "invalid_rows": invalid, "model_version": model_version}},
+        )
+        if not written.modified_count:
+            logger.warning("job %s chunk %d: lease lost, result dropped", chunk["job_id"], chunk["index"])
+            return False
+
+        JobService.count_chunk(chunk["job_id"], chunk["index"], len(grades), invalid, model_version, seconds)
+        return True
+
+    @staticmethod
+    def count_chunk(job_id, index, rows, invalid, model_version, seconds=0.0):
+        """Add a done chunk to its job's progress, at most once per chunk index"""
+        now = datetime.utcnow()
+        jobs = PredictionJob._get_collection()
+        # Chunk đã done nhưng worker có thể chết trước lệnh này: reconcile() đếm lại,
+        # counted_chunks đảm bảo không chunk nào bị cộng hai lần
+        job = jobs.find_one_and_update(
+            {"_id": job_id, "counted_chunks": {"$ne": index}},
+            {
+                "$inc": {"done_chunks": 1, "processed_rows": rows, "invalid_rows": invalid,
+                         "scoring_seconds": seconds},
+                "$min": {"started_at": now - timedelta(seconds=seconds)},
+                "$set": {"updated_at": now},
+                "$addToSet": {"model_versions": model_version, "counted_chunks": index},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if job is None:
+            return  # job đã bị xóa, hoặc chunk đã được đếm
+        if job["done_chunks"] >= job["total_chunks"]:
+            jobs.update_one({"_id": job["_id"], "status": {"$in": ["queued", "running"]}},
+                            {"$set": {"status": "done", "finished_at": now}})
+            logger.info("job %s done: %d rows, %d invalid", job["_id"], job["processed_rows"], job["invalid_rows"])
+        elif job["status"] == "queued":
+            jobs.update_one({"_id": job["_id"], "status": "queued"}, {"$set": {"status": "running"}})
+
+    @staticmethod
+    def reconcile():
+        """Count done chunks that a crashed worker left out of their job's progress, returns how many"""
+        stale = datetime.utcnow() - timedelta(seconds=settings.PREDICTION_JOB_LEASE_SECONDS)
+        chunks = PredictionJobChunk._get_collection()
+        recovered = 0
+        # Chỉ job không có tiến triển trong một lease: worker còn sống sẽ tự đếm chunk của nó
+        for job in PredictionJob._get_collection().find(
+            {"status": {"$in": ["queued", "running"]}, "updated_at": {"$lte": stale}}, {"counted_chunks": 1},
+        ):
+            for chunk in chunks.find(
+                {"job_id": job["_id"], "status": "done", "index": {"$nin": job.get("counted_chunks", [])}},
+                {"index": 1, "grades": 1, "invalid_rows": 1, "model_version": 1},
+            ):
+                logger.warning("job %s chunk %d: done but not counted, recovering", job["_id"], chunk["index"])
+                JobService.count_chunk(job["_id"], chunk["index"], len(chunk["grades"]),
+                                       chunk["invalid_rows"], chunk["model_version"])
+                recovered += 1
+        return recovered
+
+    @staticmethod
+    def release(chunk, worker, error):
+        """Give a chunk that raised back to the queue, or fail the job after PREDICTION_JOB_MAX_ATTEMPTS"""
+        now = datetime.utcnow()
+        chunks = PredictionJobChunk._get_collection()
+        if chunk["attempts"] < settings.PREDICTION_JOB_MAX_ATTEMPTS:
+            chunks.update_one({"_id": chunk["_id"], "worker": worker},
+                              {"$set": {"status": "pending", "lease_until": now, "error": error}})
+            return
+        chunks.update_one({"_id": chunk["_id"], "worker": worker}, {"$set": {"status": "failed", "error": error}})
+        PredictionJob._get_collection().update_one(
+            {"_id": chunk["job_id"]},
+            {"$set": {"status": "failed", "error": f"chunk {chunk['index']}: {error}", "finished_at": now}},
+        )
+        # Các chunk còn lại của job không cần tính nữa
+        chunks.update_many({"job_id": chunk["job_id"], "status": "pending"}, {"$set": {"status": "failed"}})
+
+    @staticmethod
+    def result_cursor(job_id, collection=None):
+        # batch nhỏ: mỗi chunk đã là vài nghìn dòng
+        collection = collection if collection is not None else PredictionJobChunk._get_collection()
+        return collection.find(
+            {"job_id": job_id}, {"columns": 1, "grades": 1, "index": 1}, sort=[("index", 1)], batch_size=4,
+        )
+
+    @staticmethod
+    def aresult_cursor(job_id):
+        return JobService.result_cursor(job_id, get_async_db()[PredictionJobChunk._meta["collection"]])
+
+    @staticmethod
+    def result_lines(chunk, first_row):
+        """CSV text of one scored chunk, rows numbered from first_row"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        inputs = zip(*chunk["columns"])
+        writer.writerows(
+            [first_row + i, *map(format_value, values), format_value(grade)]
+            for i, (values, grade) in enumerate(zip(inputs, chunk["grades"]))
+        )
+        return buffer.getvalue().encode()
+
+    @staticmethod
+    def stream_results(cursor):
+        try:
+            yield (",".join(RESULT_COLUMNS) + "\r\n").encode()
+            row = 1
+            for chunk in cursor:
+                yield JobService.result_lines(chunk, row)
+                row += len(chunk["grades"])
+        finally:
+            cursor.close()
+
+    @staticmethod
+    async def astream_results(cursor):
+        try:
+            yield (",".join(RESULT_COLUMNS) + "\r\n").encode()
+            row = 1
+            async for chunk in cursor:
+                yield JobService.result_lines(chunk, row)
+                row += len(chunk["grades"])
+        finally:
+            await cursor.close()
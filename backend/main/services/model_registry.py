@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+# File trong MODEL_ARTIFACTS_DIR chứa tên version đang được dùng
+CURRENT_POINTER = "CURRENT"
+WEIGHTS_FILE = "weights.npy"
+META_FILE = "meta.json"
+
+# Công thức giả lập của PredictPage.jsx, dùng khi chưa có artifact nào
+BASELINE_VERSION = "baseline"
+BASELINE_WEIGHTS = np.array([0.3, 0.4, 0.2, 0.1])
+BASELINE_INTERCEPT = 0.0
+
+
+class GradeModel:
+    """Linear model applied to the output of predict_services.transform_features"""
+
+    def __init__(self, version, weights, intercept, meta=None):
+        self.version = version
+        self.weights = weights
+        self.intercept = float(intercept)
+        self.meta = meta or {}
+
+    def predict(self, Z):
+        return Z @ self.weights + self.intercept
+
+    def __repr__(self):
+        return f"GradeModel(version={self.version!r})"
+
+
+BASELINE_MODEL = GradeModel(BASELINE_VERSION, BASELINE_WEIGHTS, BASELINE_INTERCEPT, {"source": "PredictPage.jsx"})
+
+
+class ModelRegistry:
+    """
+    Versioned model artifacts on disk, one directory per version:
+
+        <root>/<version>/weights.npy   [intercept, w1, w2, w3, w4]
+        <root>/<version>/meta.json
+        <root>/CURRENT                 name of the active version
+
+    Weights are opened with mmap_mode='r' so every gunicorn worker maps the
+    same page-cache pages instead of holding its own copy. Workers re-read
+    CURRENT at most every reload_interval seconds and swap the model in place
+    when it changes, without a restart.
+    """
+
+    def __init__(self, root, reload_interval=5.0):
+        self.root = Path(root)
+        self.reload_interval = reload_interval
+        self._model = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def pointer_path(self):
+        return self.root / CURRENT_POINTER
+
+    def preload(self):
+        """Load the active model, called once per worker from MainConfig.ready()"""
+        with self._lock:
+            self._reload_locked()
+        return self._model
+
+    def get_model(self):
+        model = self._model
+        if model is None or time.monotonic() - self._last_check >= self.reload_interval:
+            with self._lock:
+                self._maybe_reload_locked()
+            model = self._model
+        return model
+
+    def reload(self):
+        with self._lock:
+            self._reload_locked()
+        return self._model
+
+    def _maybe_reload_locked(self):
+        self._last_check = time.monotonic()
+        if self._model is None or (self.active_version() or BASELINE_VERSION) != self._model.version:
+            self._reload_locked()
+
+    def _reload_locked(self):
+        self._last_check = time.monotonic()
+        version = self.active_version()
+        if version is None:
+            model = BASELINE_MODEL
+        else:
+            try:
+                model = self.load(version)
+            except (OSError, ValueError) as e:
+                logger.error("Failed to load model %s, keeping %s: %s", version, self._model, e)
+                model = self._model or BASELINE_MODEL
+
+        if self._model is None or model.version != self._model.version:
+            logger.info("Serving grade model %s", model.version)
+        self._model = model
+
+    def active_version(self):
+        try:
+            version = self.pointer_path.read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def versions(self):
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            p.name for p in self.root.iterdir()
+            if not p.name.startswith(".") and (p / WEIGHTS_FILE).is_file()
+        )
+
+    def load(self, version):
+        path = self.root / version
+        weights = np.load(path / WEIGHTS_FILE, mmap_mode="r")
+        if weights.ndim != 1 or weights.shape[0] != len(BASELINE_WEIGHTS) + 1:
+            raise ValueError(f"unexpected weights shape {weights.shape}")
+        meta_path = path / META_FILE
+        meta = json.loads(meta_path.read_text()) if meta_path.is_file() else {}
+        return GradeModel(version, weights[1:], weights[0], meta)
+
+    def save(self, version, weights, intercept, meta=None):
+        """Write a new immutable version (atomically, via a temp directory)"""
+        if not version or version in (CURRENT_POINTER, BASELINE_VERSION) or os.sep in version:
+            raise ValueError(f"invalid model version {version!r}")
+        target = self.root / version
+        if target.exists():
+            raise ValueError(f"model version {version!r} already exists")
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{version}.", dir=self.root))
+        try:
+            np.save(tmp / WEIGHTS_FILE, np.concatenate([[intercept], np.asarray(weights, dtype=np.float64)]))
+            meta = {
+                **(meta or {}),
+                "version": version,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            (tmp / META_FILE).write_text(json.dumps(meta, indent=2))
+            os.replace(tmp, target)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return target
+
+    def activate(self, version):
+        """Point CURRENT at version; running workers pick it up on their next check"""
+        if version != BASELINE_VERSION and version not in self.versions():
+            raise ValueError(f"unknown model version {version!r}")
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".CURRENT.", dir=self.root)
+        with os.fdopen(fd, "w") as f:
+            f.write("" if version == BASELINE_VERSION else version)
+        os.replace(tmp, self.pointer_path)
+
+
+model_registry = ModelRegistry(settings.MODEL_ARTIFACTS_DIR, settings.MODEL_RELOAD_INTERVAL)
@@ -0,0 +1,251 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+import mongoengine
+from django.conf import settings
+from mongoengine import connection as me_connection
+from mongoengine.base.common import _get_documents_by_db
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+from main.metrics import command_listener
+
+
+logger = logging.getLogger(__name__)
+
+SERVER_PROGRAMS = ("gunicorn", "uvicorn", "daphne")
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts pool events for one process; callbacks run on the thread checking out"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_seconds += waited
+            self.max_checkout_wait_seconds = max(self.max_checkout_wait_seconds, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+        logger.warning("mongo pool %s: checkout failed (%s)", event.address, event.reason)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checkins += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+        logger.warning("mongo pool %s cleared", event.address)
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self):
+        return {
+            "open_connections": self.connections_created - self.connections_closed,
+            "in_use": self.checkouts - self.checkins,
+            "connections_created": self.connections_created,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "pool_clears": self.pool_clears,
+            "avg_checkout_wait_seconds": self.checkout_wait_seconds / self.checkouts if self.checkouts else 0.0,
+            "max_checkout_wait_seconds": self.max_checkout_wait_seconds,
+        }
+
+
+class MongoConnectionManager:
+    """
+    Owns the mongoengine connection of one process.
+
+    Nothing is registered at startup: install() hooks mongoengine's
+    get_connection so the first collection access registers the alias
+    (with mongodb+srv:// that is where the DNS lookup happens). A failed
+    registration is retried on a later access, after a backoff that doubles
+    up to max_retry_delay, instead of leaving the worker without a
+    connection until it restarts.
+
+    pymongo opens sockets on the first query, so with gunicorn (no --preload)
+    every worker builds its own pool after the fork. If a client does exist
+    before a fork, the child forgets it and lazily builds a fresh one instead
+    of sharing the parent's sockets.
+    """
+
+    retry_delay = 1.0
+    max_retry_delay = 30.0
+
+    def __init__(self, alias=me_connection.DEFAULT_CONNECTION_NAME):
+        self.alias = alias
+        self.listener = PoolStatsListener()
+        self._init_state()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork_in_child)
+
+    def _init_state(self):
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._retry_at = 0.0
+
+    @property
+    def registered(self):
+        return self.alias in me_connection._connection_settings
+
+    def install(self):
+        """Register the connection on first use (idempotent, no I/O)"""
+        get_connection = me_connection.get_connection
+        if getattr(get_connection, "lazy_manager", None) is self:
+            return
+
+        def lazy_get_connection(alias=me_connection.DEFAULT_CONNECTION_NAME, reconnect=False):
+            if alias == self.alias and not self.registered:
+                self.ensure_registered()
+            return get_connection(alias, reconnect)
+
+        lazy_get_connection.lazy_manager = self
+        # get_db() và Document._get_collection() đều đi qua hàm này của module
+        me_connection.get_connection = lazy_get_connection
+
+    def ensure_registered(self):
+        """Register unless already done; after a failure only once the backoff has passed"""
+        with self._lock:
+            if self.registered:
+                return True
+            if time.monotonic() < self._retry_at:
+                return False
+            if self.register():
+                self._failures = 0
+                return True
+            self._failures += 1
+            delay = min(self.max_retry_delay, self.retry_delay * 2 ** (self._failures - 1))
+            self._retry_at = time.monotonic() + delay
+            logger.warning("mongo connection %r: retrying registration in %.0fs", self.alias, delay)
+            return False
+
+    def client_options(self):
+        """Pool sizing and timeouts shared by the pymongo and motor clients"""
+        return {
+            "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+            "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS or None,
+            "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS or None,
+            "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+            "event_listeners": [self.listener, command_listener],
+        }
+
+    def register(self):
+        # Với mongodb+srv://, pymongo tra DNS ngay lúc parse URI
+        try:
+            mongoengine.register_connection(
+                self.alias,
+                db=settings.MONGO_DATABASE_NAME,
+                host=settings.MONGODB_URI,
+                **self.client_options(),
+            )
+        except PyMongoError as e:
+            logger.error("mongo connection %r not registered: %s", self.alias, e)
+            return False
+        return True
+
+    def warm(self):
+        """Open the pool now (minPoolSize connections are then kept by pymongo)"""
+        started = time.perf_counter()
+        try:
+            me_connection.get_connection(self.alias).admin.command("ping")
+        except (PyMongoError, me_connection.ConnectionFailure) as e:
+            logger.warning("mongo pool warm-up failed: %s", e)
+            return False
+        logger.info("mongo pool warm in %.0f ms", (time.perf_counter() - started) * 1000)
+        return True
+
+    def warm_in_background(self):
+        threading.Thread(target=self.warm, name="mongo-warmup", daemon=True).start()
+
+    def _after_fork_in_child(self):
+        # Không close(): socket của client cũ vẫn thuộc về process cha
+        me_connection._connections.pop(self.alias, None)
+        if me_connection._dbs.pop(self.alias, None) is not None:
+            for doc_cls in _get_documents_by_db(self.alias, me_connection.DEFAULT_CONNECTION_NAME):
+                if issubclass(doc_cls, mongoengine.Document):
+                    doc_cls._disconnect()
+        self.listener.reset()
+        self._init_state()
+
+    def stats(self):
+        return {
+            **self.listener.stats(),
+            "connected": self.alias in me_connection._connections,
+            "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+            "min_pool_size": settings.MONGO_MIN_POOL_SIZE,
+        }
+
+
+def management_command(argv=None):
+    argv = sys.argv if argv is None else argv
+    if len(argv) > 1 and os.path.basename(argv[0]) in ("manage.py", "django-admin", "__main__.py"):
+        return argv[1]
+    return None
+
+
+def is_serving_process(argv=None):
+    """True for gunicorn/uvicorn workers and the runserver child process"""
+    argv = sys.argv if argv is None else argv
+    program = argv[0] if argv else ""  # cả "python -m gunicorn" (.../gunicorn/__main__.py)
+    if any(name in program for name in SERVER_PROGRAMS):
+        return True
+    if management_command(argv) == "runserver":
+        # Với autoreload, chỉ process con (RUN_MAIN) mới phục vụ request
+        return os.environ.get("RUN_MAIN") == "true" or "--noreload" in argv
+    return False
+
+
+def should_warm_pool(argv=None):
+    if settings.MONGO_WARM_POOL in ("1", "true", "yes"):
+        return True
+    if settings.MONGO_WARM_POOL in ("0", "false", "no"):
+        return False
+    return is_serving_process(argv)
+
+
+mongo_connection = MongoConnectionManager()
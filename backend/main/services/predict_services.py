@@ -0,0 +1,205 @@
+import numpy as np
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+
+from main.metrics import PREDICT_SECONDS, PREDICTED_ROWS, timed
+from main.services.model_registry import model_registry
+from main.services.prediction_cache import PredictionCache, SweepCache
+
+
+# Thứ tự cột của ma trận đặc trưng (giống form trên PredictPage)
+FEATURES = (
+    "studyHourPerWeek",
+    "previousGrade",
+    "attendanceRate",
+    "extracurricularActivities",
+)
+
+# (min, max) cho từng đặc trưng, giống utils/validation.js ở FE
+FEATURE_BOUNDS = {
+    "studyHourPerWeek": (0.0, 168.0),
+    "previousGrade": (0.0, 100.0),
+    "attendanceRate": (0.0, 100.0),
+    "extracurricularActivities": (0.0, np.inf),
+}
+
+# Nhiễu ±2.5 điểm, chỉ bật khi client truyền seed
+NOISE_AMPLITUDE = 5.0
+
+prediction_cache = PredictionCache(
+    max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES,
+    ttl=settings.PREDICTION_CACHE_TTL,
+    quantum=settings.PREDICTION_CACHE_QUANTUM,
+    backend_alias=settings.PREDICTION_CACHE_BACKEND or None,
+)
+
+sweep_cache = SweepCache(
+    max_entries=settings.PREDICT_SWEEP_CACHE_MAX_ENTRIES,
+    ttl=settings.PREDICTION_CACHE_TTL,
+    backend_alias=settings.PREDICTION_CACHE_BACKEND or None,
+)
+
+_LOWER = np.array([FEATURE_BOUNDS[name][0] for name in FEATURES])
+_UPPER = np.array([FEATURE_BOUNDS[name][1] for name in FEATURES])
+
+
+def transform_features(X):
+    """Map raw inputs (n, 4) to the normalized model inputs (n, 4)"""
+    Z = np.empty_like(X, dtype=np.float64)
+    np.multiply(np.minimum(X[:, 0] / 40.0, 1.0), 100.0, out=Z[:, 0])  # 40h/tuần = 100 điểm
+    Z[:, 1] = X[:, 1]
+    Z[:, 2] = X[:, 2]
+    np.multiply(np.minimum(X[:, 3] / 10.0, 1.0), 20.0, out=Z[:, 3])  # 10 hoạt động = 20 điểm cộng
+    return Z
+
+
+def round_grades(grades):
+    """Round half up to one decimal, same as Math.round(x * 10) / 10 in the FE"""
+    return np.floor(grades * 10.0 + 0.5) / 10.0
+
+
+class PredictService:
+
+    @staticmethod
+    def to_matrix(students):
+        """Build the (n, 4) feature matrix from a list of records or a dict of columns"""
+        try:
+            if isinstance(students, dict):
+                columns = [np.asarray(students[name], dtype=np.float64) for name in FEATURES]
+                X = np.column_stack(columns) if columns[0].ndim else np.array([columns])
+            else:
+                X = np.array(
+                    [[student[name] for name in FEATURES] for student in students],
+                    dtype=np.float64,
+                ).reshape(-1, len(FEATURES))
+        except KeyError as e:
+            raise ValidationError({str(e.args[0]): ["This field is required."]})
+        except (TypeError, ValueError):
+            raise ValidationError({"students": ["All features must be numbers."]})
+
+        PredictService.validate(X)
+        return X
+
+    @staticmethod
+    def validate(X):
+        """Vectorized range check, reports the first offending row per feature"""
+        errors = {}
+        invalid = ~np.isfinite(X) | (X < _LOWER) | (X > _UPPER)
+        invalid[:, 3] |= X[:, 3] != np.floor(X[:, 3])
+        for column in np.flatnonzero(invalid.any(axis=0)):
+            name = FEATURES[column]
+            row = int(np.argmax(invalid[:, column]))
+            errors[name] = [f"Row {row}: invalid value {X[row, column]:g}."]
+        if errors:
+            raise ValidationError(errors)
+
+    @staticmethod
+    def predict(X, seed=None, model=None):
+        """Score a whole feature matrix in one vectorized pass"""
+        model = model or model_registry.get_model()
+        grades = model.predict(transform_features(X))
+
+        if seed is not None:
+            rng = np.random.default_rng(seed)
+            grades += (rng.random(len(grades)) - 0.5) * NOISE_AMPLITUDE
+
+        np.clip(grades, 0.0, 100.0, out=grades)
+        return round_grades(grades)
+
+    @staticmethod
+    def predict_one(inputs, seed=None):
+        """Return (grade, model_version) for one student, cached unless a seed is given"""
+        with timed(PREDICT_SECONDS, "one"):
+            X = PredictService.to_matrix([inputs])
+            model = model_registry.get_model()
+            PREDICTED_ROWS.inc("one")
+            if seed is not None:
+                return float(PredictService.predict(X, seed=seed, model=model)[0]), model.version
+
+            X = prediction_cache.quantize(X)
+            grade = prediction_cache.get(model.version, X[0])
+            if grade is None:
+                grade = float(PredictService.predict(X, model=model)[0])
+                prediction_cache.set(model.version, X[0], grade)
+            return grade, model.version
+
+    @staticmethod
+    def predict_batch(students, seed=None):
+        """Return (grades, model_version) for a batch of students"""
+        max_size = settings.PREDICT_BATCH_MAX_SIZE
+        if isinstance(students, dict):
+            # Kiểm tra mọi cột, không chỉ cột đầu tiên, trước khi chuyển sang ma trận
+            sizes = {len(column) if isinstance(column, (list, tuple)) else np.size(column)
+                     for column in students.values()}
+            size = max(sizes, default=0)
+            if size <= max_size and len(sizes) > 1:
+                raise ValidationError({"students": ["All feature columns must have the same length."]})
+        else:
+            size = len(students)
+        if size > max_size:
+            raise ValidationError({"students": [f"Batch size must not exceed {max_size}."]})
+        with timed(PREDICT_SECONDS, "batch"):
+            X = PredictService.to_matrix(students)
+            model = model_registry.get_model()
+            PREDICTED_ROWS.inc("batch", amount=len(X))
+            return PredictService.predict(X, seed=seed, model=model), model.version
+
+    @staticmethod
+    def sweep_values(axis):
+        """Validated values of one swept feature, as float64"""
+        name = axis["feature"]
+        max_points = settings.PREDICT_SWEEP_MAX_POINTS
+        if "values" in axis:
+            values = np.asarray(axis["values"], dtype=np.float64)
+        else:
+            start, stop, step = (np.float64(axis[key]) for key in ("start", "stop", "step"))
+            if not step > 0 or not stop >= start:
+                raise ValidationError({name: ["Requires step > 0 and stop >= start."]})
+            # Đếm số điểm (dạng float) trước khi tạo mảng để không cấp phát một lưới khổng lồ;
+            # tỉ số có thể tràn thành inf (vd. stop=1e300, step=1e-300)
+            with np.errstate(over="ignore", invalid="ignore"):
+                ratio = (stop - start) / step
+            if not np.isfinite(ratio) or np.floor(ratio + 1e-9) + 1 > max_points:
+                raise ValidationError({name: [f"A sweep must not exceed {max_points} points."]})
+            count = int(np.floor(ratio + 1e-9)) + 1
+            values = np.round(start + np.arange(count) * step, 9)  # 0.1 * 3 -> 0.3
+        if len(values) > max_points:
+            raise ValidationError({name: [f"A sweep must not exceed {max_points} points."]})
+
+        low, high = FEATURE_BOUNDS[name]
+        invalid = ~np.isfinite(values) | (values < low) | (values > high)
+        if name == "extracurricularActivities":
+            invalid |= values != np.floor(values)
+        if invalid.any():
+            raise ValidationError({name: [f"Invalid value {values[np.argmax(invalid)]:g}."]})
+        return values
+
+    @staticmethod
+    def sweep(inputs, axes):
+        """
+        Return (grades, swept values, model_version): grades has one dimension
+        per swept feature, every other feature fixed at inputs. The whole grid is one
+        broadcast feature matrix scored in a single predict() call.
+        """
+        base = PredictService.to_matrix([inputs])[0]
+        columns = [FEATURES.index(axis["feature"]) for axis in axes]
+        values = [PredictService.sweep_values(axis) for axis in axes]
+        shape = tuple(len(v) for v in values)
+        max_cells = settings.PREDICT_SWEEP_MAX_CELLS
+        if np.prod(shape) > max_cells:
+            raise ValidationError({"sweep": [f"The grid must not exceed {max_cells} points, got {np.prod(shape)}."]})
+
+        with timed(PREDICT_SECONDS, "sweep"):
+            model = model_registry.get_model()
+            spec = {"inputs": base.tolist(), "axes": [[c, v.tolist()] for c, v in zip(columns, values)]}
+            grades = sweep_cache.get(model.version, spec)
+            if grades is None:
+                X = np.empty((*shape, len(FEATURES)))
+                X[...] = base
+                for axis, (column, axis_values) in enumerate(zip(columns, values)):
+                    # Trục thứ i chạy theo chiều i của lưới, các chiều khác broadcast
+                    X[..., column] = axis_values.reshape([-1 if i == axis else 1 for i in range(len(shape))])
+                grades = PredictService.predict(X.reshape(-1, len(FEATURES)), model=model).reshape(shape)
+                sweep_cache.set(model.version, spec, grades)
+            PREDICTED_ROWS.inc("sweep", amount=grades.size)
+            return grades, values, model.version
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.core.cache import caches
+
+
+class PredictionCache:
+    """
+    Two-level cache for single predictions, keyed on the model version plus
+    the feature vector snapped to a grid of `quantum`.
+
+    L1 is an in-process LRU with a TTL; L2 is an optional Django cache alias
+    shared by all workers. A new model version changes every key, and L1 is
+    dropped as soon as a different version is seen.
+    """
+
+    def __init__(self, max_entries=10_000, ttl=300, quantum=0.01, backend_alias=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.quantum = quantum
+        self.backend_alias = backend_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.backend_hits = 0
+        self.invalidations = 0
+
+    @property
+    def backend(self):
+        return caches[self.backend_alias] if self.backend_alias else None
+
+    def quantize(self, X):
+        """Snap features to the cache grid; callers predict on the snapped values"""
+        return np.round(X / self.quantum) * self.quantum
+
+    def make_key(self, version, row):
+        steps = np.rint(np.asarray(row) / self.quantum).astype(np.int64)
+        return f"pred:{version}:{':'.join(map(str, steps.tolist()))}"
+
+    def get(self, version, row):
+        key = self.make_key(version, row)
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version:
+                self._invalidate_locked(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        backend = self.backend
+        value = backend.get(key) if backend is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.backend_hits += 1
+            self._store_locked(key, value, now)
+        return value
+
+    def set(self, version, row, value):
+        key = self.make_key(version, row)
+        with self._lock:
+            if version != self._version:
+                self._invalidate_locked(version)
+            self._store_locked(key, value, time.monotonic())
+        backend = self.backend
+        if backend is not None:
+            backend.set(key, value, self.ttl)
+
+    def _store_locked(self, key, value, now):
+        self._entries[key] = (now + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _invalidate_locked(self, version):
+        if self._version is not None:
+            self.invalidations += 1
+        self._entries.clear()
+        self._version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "backend_hits": self.backend_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "model_version": self._version,
+        }
+
+
+class SweepCache(PredictionCache):
+    """
+    Same cache for whole what-if grids: the key is a digest of the base
+    inputs and the swept values (a grid can hold thousands of points), the
+    value the array of grades.
+    """
+
+    def make_key(self, version, spec):
+        digest = hashlib.sha1(json.dumps(spec, separators=(",", ":")).encode()).hexdigest()
+        return f"sweep:{version}:{digest}"
@@ -0,0 +1,11 @@
+import os
+
+
+def init_worker():
+    """ProcessPoolExecutor initializer for pools that use Django settings or models"""
+    # Với start method "spawn" process con phải tự nạp Django (fork thì đã có sẵn)
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Predict_Learning_Web.settings")
+        django.setup()
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from django.conf import settings
+from pymongo.errors import DuplicateKeyError
+
+from main.models import RevokedToken
+
+
+class RevocationStore:
+    """
+    Revoked refresh-token jtis. Each worker keeps an in-memory dict
+    (jti -> expiry) for O(1) checks and pulls newly revoked jtis from the
+    TTL-indexed `revoked_tokens` collection at most every sync_interval
+    seconds. revoke() inserts with the jti as _id, so the database stays
+    authoritative: a token that another worker already revoked fails the
+    insert even if this worker has not synced yet.
+    """
+
+    # Bù cho lệch đồng hồ giữa các worker khi đồng bộ theo revoked_at
+    SYNC_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, sync_interval=30.0):
+        self.sync_interval = sync_interval
+        self._reset()
+
+    def _reset(self):
+        self._revoked = {}
+        self._synced_until = None
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @staticmethod
+    def collection():
+        return RevokedToken._get_collection()
+
+    def is_revoked(self, jti):
+        self.maybe_sync()
+        return jti in self._revoked
+
+    def revoke(self, jti, user_id, expires_at):
+        """Record jti as revoked; returns False if it already was (token reuse)"""
+        expires = datetime.fromtimestamp(expires_at, tz=timezone.utc).replace(tzinfo=None)
+        try:
+            self.collection().insert_one({
+                "_id": jti,
+                "user_id": ObjectId(user_id),
+                "revoked_at": datetime.utcnow(),
+                "expires_at": expires,
+            })
+        except DuplicateKeyError:
+            self._revoked[jti] = expires_at
+            return False
+        self._revoked[jti] = expires_at
+        return True
+
+    def maybe_sync(self):
+        if self._pid != os.getpid():
+            self._reset()
+        if time.monotonic() < self._next_sync:
+            return
+        with self._lock:
+            if time.monotonic() < self._next_sync:
+                return
+            self.sync()
+
+    def sync(self):
+        started = datetime.utcnow()
+        query = {}
+        if self._synced_until is not None:
+            query["revoked_at"] = {"$gte": self._synced_until - self.SYNC_OVERLAP}
+        for doc in self.collection().find(query, {"expires_at": 1}):
+            self._revoked[doc["_id"]] = doc["expires_at"].replace(tzinfo=timezone.utc).timestamp()
+
+        now = time.time()
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        self._synced_until = started
+        self._next_sync = time.monotonic() + self.sync_interval
+
+
+revocation_store = RevocationStore(settings.REVOCATION_SYNC_INTERVAL)
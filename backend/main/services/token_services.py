@@ -0,0 +1,79 @@
+import time
+import uuid
+from functools import lru_cache
+
+import jwt
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+_jwt = jwt.PyJWT()
+
+
+@lru_cache(maxsize=1)
+def signing_keys():
+    """
+    kid -> key bytes, computed once per process. JWT_SIGNING_KEYS may hold
+    several keys so tokens signed with a retired key stay valid until they
+    expire while new ones are signed with JWT_ACTIVE_KID.
+    """
+    keys = {kid: secret.encode() for kid, secret in settings.JWT_SIGNING_KEYS.items()}
+    if settings.JWT_ACTIVE_KID not in keys:
+        raise ValueError(f"JWT_ACTIVE_KID {settings.JWT_ACTIVE_KID!r} is not in JWT_SIGNING_KEYS")
+    return keys
+
+
+@receiver(setting_changed)
+def _reset_signing_keys(setting, **kwargs):
+    if setting in ("JWT_SIGNING_KEYS", "JWT_ACTIVE_KID"):
+        signing_keys.cache_clear()
+
+
+class TokenService:
+
+    @staticmethod
+    def encode(claims, token_type, lifetime):
+        now = int(time.time())
+        payload = {
+            **claims,
+            "type": token_type,
+            "jti": uuid.uuid4().hex,
+            "iat": now,
+            "exp": now + lifetime,
+        }
+        kid = settings.JWT_ACTIVE_KID
+        return _jwt.encode(payload, signing_keys()[kid], algorithm=settings.JWT_ALGORITHM, headers={"kid": kid})
+
+    @staticmethod
+    def issue_pair(user_id, username):
+        claims = {"user_id": user_id, "username": username}
+        return {
+            "access": TokenService.encode(claims, ACCESS, settings.JWT_ACCESS_TOKEN_LIFETIME),
+            "refresh": TokenService.encode(claims, REFRESH, settings.JWT_REFRESH_TOKEN_LIFETIME),
+        }
+
+    @staticmethod
+    def decode(token, token_type=ACCESS):
+        """
+        Verify signature, expiry and type using only the in-memory keys.
+        Raises jwt.InvalidTokenError (or a subclass) on any problem.
+        """
+        keys = signing_keys()
+        kid = jwt.get_unverified_header(token).get("kid", settings.JWT_ACTIVE_KID)
+        key = keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+
+        payload = _jwt.decode(
+            token, key,
+            algorithms=[settings.JWT_ALGORITHM],
+            options={"require": ["exp", "user_id", "type"]},
+        )
+        # Token cũ không có "type" (refresh token cũ sống 24h) thì bị từ chối, không coi là access
+        if payload["type"] != token_type:
+            raise jwt.InvalidTokenError(f"Expected a {token_type} token")
+        return payload
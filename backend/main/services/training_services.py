@@ -0,0 +1,199 @@
+import argparse
+import csv
+
+import numpy as np
+
+from main.services.predict_services import FEATURES, FEATURE_BOUNDS, transform_features
+
+
+TARGET_COLUMN = "finalGrade"
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Trọng số "thật" dùng để sinh dữ liệu giả lập, khác baseline để có cái mà học
+SYNTHETIC_WEIGHTS = np.array([0.25, 0.5, 0.15, 0.2])
+SYNTHETIC_INTERCEPT = 3.0
+SYNTHETIC_NOISE = 5.0
+
+
+def positive_int(value):
+    """argparse type for --chunk-size and the like: an integer >= 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def check_chunk_size(chunk_size):
+    # chunk_size 0 làm vòng lặp sinh dữ liệu không bao giờ dừng
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+
+
+def generate_synthetic_students(n_rows, seed=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (X, y) chunks of fake students, reproducible for a given seed"""
+    check_chunk_size(chunk_size)
+    rng = np.random.default_rng(seed)
+    remaining = n_rows
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        X = np.empty((size, len(FEATURES)))
+        X[:, 0] = rng.gamma(4.0, 4.0, size).clip(0, 168)
+        X[:, 1] = rng.normal(65, 15, size).clip(0, 100)
+        X[:, 2] = (100 - rng.exponential(10, size)).clip(0, 100)
+        X[:, 3] = rng.poisson(2, size)
+        y = transform_features(X) @ SYNTHETIC_WEIGHTS + SYNTHETIC_INTERCEPT
+        y += rng.normal(0, SYNTHETIC_NOISE, size)
+        yield X, y.clip(0, 100)
+        remaining -= size
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def iter_csv_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, target=TARGET_COLUMN):
+    """Stream (X, y) chunks from a CSV file with a header row"""
+    check_chunk_size(chunk_size)
+    columns = (*FEATURES, target)
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        try:
+            indexes = [header.index(name) for name in columns]
+        except ValueError as e:
+            raise ValueError(f"{path}: missing column ({e})")
+
+        rows = []
+        for row in reader:
+            # Ô thiếu hoặc không phải số -> NaN, clean_chunk sẽ bỏ và đếm dòng đó
+            rows.append([to_float(row[i]) if i < len(row) else np.nan for i in indexes])
+            if len(rows) == chunk_size:
+                yield _split(np.array(rows, dtype=np.float64))
+                rows = []
+        if rows:
+            yield _split(np.array(rows, dtype=np.float64))
+
+
+def iter_parquet_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, target=TARGET_COLUMN):
+    """Stream (X, y) chunks from a Parquet file, one record batch at a time"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet requires pyarrow (pip install pyarrow)")
+
+    columns = [*FEATURES, target]
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+        data = np.column_stack([
+            batch.column(i).to_numpy(zero_copy_only=False).astype(np.float64)
+            for i in range(len(columns))
+        ])
+        yield _split(data)
+
+
+def iter_mongo_chunks(collection_name, chunk_size=DEFAULT_CHUNK_SIZE, target=TARGET_COLUMN):
+    """Stream (X, y) chunks from a MongoDB collection through a server-side cursor"""
+    check_chunk_size(chunk_size)
+    from mongoengine.connection import get_db
+
+    columns = (*FEATURES, target)
+    projection = {name: 1 for name in columns}
+    projection["_id"] = 0
+    cursor = get_db()[collection_name].find({}, projection, batch_size=min(chunk_size, 10_000))
+
+    rows = []
+    for doc in cursor:
+        rows.append([to_float(doc.get(name)) for name in columns])
+        if len(rows) == chunk_size:
+            yield _split(np.array(rows, dtype=np.float64))
+            rows = []
+    if rows:
+        yield _split(np.array(rows, dtype=np.float64))
+
+
+def write_csv(path, chunks, target=TARGET_COLUMN):
+    """Write (X, y) chunks to a CSV file that iter_csv_chunks can read back"""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([*FEATURES, target])
+        rows = 0
+        for X, y in chunks:
+            data = np.column_stack([X, y])
+            np.savetxt(f, data, delimiter=",", fmt=["%.2f", "%.2f", "%.2f", "%d", "%.2f"])
+            rows += len(data)
+    return rows
+
+
+def _split(data):
+    return data[:, :-1], data[:, -1]
+
+
+def clean_chunk(X, y):
+    """Drop rows with missing or out-of-range values, returns (X, y, dropped)"""
+    lower = np.array([FEATURE_BOUNDS[name][0] for name in FEATURES])
+    upper = np.array([FEATURE_BOUNDS[name][1] for name in FEATURES])
+    keep = (
+        np.isfinite(X).all(axis=1) & np.isfinite(y)
+        & (X >= lower).all(axis=1) & (X <= upper).all(axis=1)
+    )
+    return X[keep], y[keep], int(len(y) - keep.sum())
+
+
+class NormalEquationAccumulator:
+    """
+    Incremental least squares: only A'A, A'y and y'y are kept (A is the
+    transformed feature matrix with a leading column of ones), so memory is
+    O(features^2) whatever the number of rows.
+    """
+
+    def __init__(self, n_features=len(FEATURES)):
+        size = n_features + 1
+        self.AtA = np.zeros((size, size))
+        self.Aty = np.zeros(size)
+        self.yty = 0.0
+        self.y_sum = 0.0
+        self.n_rows = 0
+
+    def partial_fit(self, X, y):
+        A = np.empty((len(X), X.shape[1] + 1))
+        A[:, 0] = 1.0
+        A[:, 1:] = transform_features(X)
+        self.AtA += A.T @ A
+        self.Aty += A.T @ y
+        self.yty += float(y @ y)
+        self.y_sum += float(y.sum())
+        self.n_rows += len(y)
+
+    def merge(self, other):
+        self.AtA += other.AtA
+        self.Aty += other.Aty
+        self.yty += other.yty
+        self.y_sum += other.y_sum
+        self.n_rows += other.n_rows
+
+    def solve(self, ridge=0.0):
+        """Return (intercept, weights); ridge > 0 adds L2 regularisation (not on the intercept)"""
+        if self.n_rows == 0:
+            raise ValueError("no training rows")
+        penalty = np.eye(len(self.Aty)) * ridge
+        penalty[0, 0] = 0.0
+        try:
+            beta = np.linalg.solve(self.AtA + penalty, self.Aty)
+        except np.linalg.LinAlgError:
+            beta = np.linalg.lstsq(self.AtA + penalty, self.Aty, rcond=None)[0]
+        return float(beta[0]), beta[1:]
+
+    def metrics(self, intercept, weights):
+        """Training RMSE and R² computed from the accumulated sums, no second pass"""
+        beta = np.concatenate([[intercept], weights])
+        sse = self.yty - 2 * beta @ self.Aty + beta @ self.AtA @ beta
+        sst = self.yty - self.y_sum ** 2 / self.n_rows
+        return {
+            "rmse": float(np.sqrt(max(sse, 0.0) / self.n_rows)),
+            "r2": float(1 - sse / sst) if sst > 0 else 0.0,
+        }
@@ -0,0 +1,161 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+class BulkWriteBuffer:
+    """
+    Write-behind buffer for one collection, kept per worker process.
+
+    add() only appends to an in-memory list; a background thread flushes it
+    with insert_many(ordered=False) once max_size documents are waiting or
+    max_delay seconds have passed, and once more when the process exits.
+    If MongoDB falls behind and max_queue documents are waiting, add()
+    flushes in the caller's thread instead of letting the queue grow.
+    on_flush, when given, is called with the documents each flush actually
+    inserted (e.g. to maintain aggregates derived from them).
+
+    A failed flush is requeued whole, but the server may have stored part of
+    it before the error (e.g. a timeout on the reply). On the retry, a
+    duplicate _id of a requeued document therefore means "already inserted":
+    it is counted as written and still passed to on_flush.
+    """
+
+    def __init__(self, get_collection, max_size=500, max_delay=1.0, max_queue=10_000, name=None, on_flush=None):
+        self.get_collection = get_collection
+        self.on_flush = on_flush
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.name = name or "buffer"
+        self._init_state()
+        atexit.register(self.close)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._init_state)
+
+    def _init_state(self):
+        # Sau khi fork, tài liệu đang chờ thuộc về process cha, worker con bắt đầu rỗng
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._docs = []
+        self._retried_ids = set()
+        self._thread = None
+        self._closed = False
+        self._flushed_docs = 0
+        self._failed_docs = 0
+        self._flush_count = 0
+        self._last_flush_seconds = 0.0
+        self._max_flush_seconds = 0.0
+        self._total_flush_seconds = 0.0
+
+    def add(self, doc):
+        with self._lock:
+            self._docs.append(doc)
+            depth = len(self._docs)
+            if self._thread is None and not self._closed:
+                self._start_thread()
+
+        if depth >= self.max_queue or self._closed:
+            self.flush()
+        elif depth >= self.max_size:
+            self._wakeup.set()
+
+    def _start_thread(self):
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.max_delay)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Insert everything queued so far, returns the number of documents written"""
+        with self._flush_lock:
+            with self._lock:
+                docs, self._docs = self._docs, []
+            if not docs:
+                return 0
+
+            started = time.perf_counter()
+            written = 0
+            inserted = docs
+            try:
+                written = len(self.get_collection().insert_many(docs, ordered=False).inserted_ids)
+            except BulkWriteError as e:
+                errors = [
+                    error for error in e.details.get("writeErrors", [])
+                    if not self._inserted_before(docs[error["index"]], error)
+                ]
+                written = len(docs) - len(errors)
+                if errors:
+                    self._failed_docs += len(errors)
+                    logger.error("%s: %d of %d documents rejected: %s", self.name,
+                                 len(errors), len(docs), errors[:1])
+                rejected = {error["index"] for error in errors}
+                inserted = [doc for index, doc in enumerate(docs) if index not in rejected]
+            except PyMongoError as e:
+                inserted = None
+                self._requeue(docs)
+                logger.error("%s: flush of %d documents failed: %s", self.name, len(docs), e)
+            finally:
+                elapsed = time.perf_counter() - started
+                self._flush_count += 1
+                self._flushed_docs += written
+                self._last_flush_seconds = elapsed
+                self._max_flush_seconds = max(self._max_flush_seconds, elapsed)
+                self._total_flush_seconds += elapsed
+            if self._retried_ids and inserted is not None:
+                self._retried_ids.difference_update(doc.get("_id") for doc in docs)
+            if self.on_flush and inserted:
+                try:
+                    self.on_flush(inserted)
+                except Exception:
+                    logger.exception("%s: on_flush hook failed", self.name)
+            return written
+
+    def _inserted_before(self, doc, error):
+        """Duplicate _id of a document this buffer already sent once"""
+        if error.get("code") != DUPLICATE_KEY or doc.get("_id") not in self._retried_ids:
+            return False
+        return error.get("keyPattern", {"_id": 1}) == {"_id": 1}
+
+    def _requeue(self, docs):
+        # Giữ lại để thử lần sau, nhưng không vượt quá max_queue
+        with self._lock:
+            room = max(self.max_queue - len(self._docs), 0)
+            kept = docs[-room:] if room else []
+            self._docs[:0] = kept
+            # insert_many đã gán _id cho từng tài liệu, lần thử lại giữ nguyên _id đó
+            self._retried_ids.update(doc["_id"] for doc in kept if "_id" in doc)
+            dropped = len(docs) - len(kept)
+        if dropped:
+            self._failed_docs += dropped
+            logger.error("%s: dropped %d documents, queue is full", self.name, dropped)
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
+
+    def stats(self):
+        return {
+            "queue_depth": len(self._docs),
+            "flushed_docs": self._flushed_docs,
+            "failed_docs": self._failed_docs,
+            "flush_count": self._flush_count,
+            "last_flush_seconds": self._last_flush_seconds,
+            "max_flush_seconds": self._max_flush_seconds,
+            "total_flush_seconds": self._total_flush_seconds,
+        }
@@ -0,0 +1,40 @@
+import io
+
+from bson import ObjectId
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from main.benchmarks.fixtures import benchmark_db
+from main.models import User
+from main.services.history_services import prediction_buffer
+from main.services.revocation_services import revocation_store
+from main.services.token_services import TokenService
+from main.throttling import get_store
+
+
+STUDENT = {"studyHourPerWeek": 20, "previousGrade": 80, "attendanceRate": 95, "extracurricularActivities": 2}
+
+
+class MongoTestCase(SimpleTestCase):
+    """Each test runs against its own mongomock database (the fixture `manage.py bench` uses)"""
+
+    def setUp(self):
+        db = benchmark_db()
+        db.__enter__()
+        self.addCleanup(db.__exit__, None, None, None)
+        prediction_buffer.flush()  # không để tài liệu của test trước rơi vào DB này
+        revocation_store._reset()
+        get_store().clear()
+        call_command("ensure_indexes", stdout=io.StringIO())
+
+    def make_user(self, username):
+        """Insert a user directly, returns (id, auth headers for the test client)"""
+        user_id = ObjectId()
+        User._get_collection().insert_one({"_id": user_id, "username": username, "password_hash": "x"})
+        access = TokenService.issue_pair(str(user_id), username)["access"]
+        return user_id, {"HTTP_AUTHORIZATION": f"Bearer {access}"}
+
+    def predict(self, auth, **extra):
+        response = self.client.post("/predict/", {**STUDENT, **extra}, content_type="application/json", **auth)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
@@ -0,0 +1,70 @@
+import io
+from datetime import datetime, timedelta
+
+from django.core.management import call_command
+
+from main.models import PredictionDailyRollup
+from main.permissions import can_view_cohort
+from main.services.analytics_services import AnalyticsService, start_of_day
+from main.services.history_services import prediction_buffer
+from main.tests.base import MongoTestCase
+
+
+class AnalyticsTestCase(MongoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.alice_id, self.alice = self.make_user("alice")
+        _, self.bob = self.make_user("bob")
+        self.grades = [self.predict(self.alice, studyHourPerWeek=hours, cohort="12A1")["finalGrade"]
+                       for hours in (5, 20, 40)]
+        self.predict(self.bob, cohort="12A2")
+        prediction_buffer.flush()
+
+    def analytics(self, auth, **params):
+        return self.client.get("/predictions/analytics/", params, **auth)
+
+
+class AnalyticsTests(AnalyticsTestCase):
+
+    def test_own_summary_from_rollups(self):
+        body = self.analytics(self.alice).json()
+        self.assertEqual((body["scope"], body["count"]), ("user", 3))
+        self.assertEqual(body["grade"]["max"], max(self.grades))
+        self.assertEqual(sum(bucket["count"] for bucket in body["distribution"]), 3)
+        self.assertEqual(body["timeline"][-1]["count"], 3)
+
+    def test_rollups_can_be_rebuilt(self):
+        before = self.analytics(self.alice).json()
+        PredictionDailyRollup._get_collection().delete_many({})
+        self.assertEqual(self.analytics(self.alice).json()["count"], 0)
+        # Lệnh rebuild_rollups bỏ qua hôm nay, nên gọi thẳng với until = ngày mai
+        AnalyticsService.rebuild_rollups(until=start_of_day(datetime.utcnow()) + timedelta(days=1))
+        self.assertEqual(self.analytics(self.alice).json(), before)
+
+    def test_bad_parameters_are_400(self):
+        self.assertEqual(self.analytics(self.alice, days="x").status_code, 400)
+        self.assertEqual(self.analytics(self.alice, source="nope").status_code, 400)
+
+
+class CohortAccessTests(AnalyticsTestCase):
+
+    def test_cohort_name_alone_grants_nothing(self):
+        # Có dự đoán trong lớp 12A1 cũng không đủ để xem thống kê của cả lớp
+        for auth in (self.alice, self.bob):
+            self.assertEqual(self.analytics(auth, cohort="12A1").status_code, 403)
+        self.assertFalse(can_view_cohort(str(self.alice_id), "12A1"))
+
+    def test_granted_cohort(self):
+        call_command("grant_cohort", "bob", "12A1", stdout=io.StringIO())
+        body = self.analytics(self.bob, cohort="12A1").json()
+        self.assertEqual((body["scope"], body["count"]), ("cohort", 3))
+        self.assertEqual(self.analytics(self.bob, cohort="12A2").status_code, 403)
+
+        call_command("grant_cohort", "bob", "12A1", "--revoke", stdout=io.StringIO())
+        self.assertEqual(self.analytics(self.bob, cohort="12A1").status_code, 403)
+
+    def test_staff_sees_every_cohort(self):
+        call_command("grant_cohort", "bob", "--staff", stdout=io.StringIO())
+        self.assertEqual(self.analytics(self.bob, cohort="12A1").json()["count"], 3)
+        self.assertEqual(self.analytics(self.bob, cohort="12A2").json()["count"], 1)
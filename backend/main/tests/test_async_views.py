@@ -0,0 +1,38 @@
+import json
+
+from django.test import AsyncRequestFactory, SimpleTestCase
+
+from main.services.predict_services import PredictService
+from main.tests.base import STUDENT
+from main.views.async_auth_views import AsyncLoginView
+from main.views.async_predict_views import AsyncPredictBatchView, AsyncPredictView
+
+
+class AsyncViewTests(SimpleTestCase):
+    """The ASGI-mode views, called directly (the URLconf only routes to them when API_MODE=asgi)"""
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+    async def post(self, view, body):
+        data = body if isinstance(body, str) else json.dumps(body)
+        response = await view.as_view()(self.factory.post("/", data, content_type="application/json"))
+        return response.status_code, json.loads(response.content)
+
+    async def test_predict_matches_the_sync_service(self):
+        status, body = await self.post(AsyncPredictView, STUDENT)
+        self.assertEqual(status, 200)
+        self.assertEqual(body["finalGrade"], PredictService.predict_one(STUDENT)[0])
+
+    async def test_batch_validation(self):
+        status, body = await self.post(AsyncPredictBatchView, {"students": [STUDENT, STUDENT], "seed": 3})
+        self.assertEqual((status, body["count"]), (200, 2))
+        for payload in ({"students": [STUDENT], "seed": True}, {"students": "x"}):
+            self.assertEqual((await self.post(AsyncPredictBatchView, payload))[0], 400)
+
+    async def test_bad_bodies_are_400(self):
+        self.assertEqual(await self.post(AsyncPredictView, "{not json"), (400, {"detail": "Invalid JSON body"}))
+        self.assertEqual((await self.post(AsyncPredictView, [STUDENT]))[0], 400)
+        status, body = await self.post(AsyncLoginView, {"username": {"$regex": "^a"}, "password": "x"})
+        self.assertEqual(status, 400)
+        self.assertIn("username", body)
@@ -0,0 +1,135 @@
+import io
+
+from asgiref.sync import async_to_sync
+from bson import ObjectId
+from django.core.management import CommandError, call_command
+from pymongo.errors import DuplicateKeyError
+from rest_framework.exceptions import ValidationError
+
+from main.checks import check_unique_indexes, missing_unique_indexes
+from main.models import User
+from main.services.auth_services import AuthService
+from main.services.revocation_services import RevocationStore, revocation_store
+from main.services.token_services import REFRESH, TokenService
+from main.tests.base import MongoTestCase
+
+
+class AuthTestCase(MongoTestCase):
+
+    def register(self, username, password="S3cret-pass", **extra):
+        return self.client.post("/auth/register/", {"username": username, "password": password, **extra},
+                                content_type="application/json")
+
+
+class RegisterTests(AuthTestCase):
+
+    def test_register_creates_user(self):
+        response = self.register("alice", email="alice@example.com")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["user"], {"username": "alice", "email": "alice@example.com"})
+        doc = User._get_collection().find_one({"username": "alice"})
+        self.assertTrue(doc["password_hash"].startswith("argon2"))
+
+    def test_register_rejects_duplicate_username(self):
+        self.assertEqual(self.register("alice").status_code, 201)
+        response = self.register("alice")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("username", response.json())
+        self.assertEqual(User._get_collection().count_documents({}), 1)
+
+    def test_duplicate_error_names_the_field(self):
+        # mongomock không cho biết index nào bị trùng, nên dựng lỗi giống của MongoDB
+        for field in ("username", "email"):
+            error = DuplicateKeyError(
+                f"E11000 duplicate key error collection: db.users index: {field}_1 dup key", 11000,
+                {"code": 11000, "keyPattern": {field: 1}},
+            )
+            with self.assertRaises(ValidationError) as raised:
+                AuthService.raise_duplicate(error)
+            self.assertEqual(list(raised.exception.detail), [field])
+
+    def test_users_without_email_do_not_collide(self):
+        self.assertEqual(self.register("alice").status_code, 201)
+        self.assertEqual(self.register("bob", email="").status_code, 201)
+
+
+class UniqueIndexTests(AuthTestCase):
+
+    def test_check_reports_missing_indexes(self):
+        self.assertEqual(check_unique_indexes(None, databases=["default"]), [])
+        User._get_collection().drop_indexes()
+        self.assertEqual(missing_unique_indexes(), ["username", "email"])
+        errors = check_unique_indexes(None, databases=["default"])
+        self.assertEqual([error.id for error in errors], ["main.E001"])
+
+    def test_unique_index_is_not_built_over_duplicates(self):
+        collection = User._get_collection()
+        collection.drop_indexes()
+        collection.insert_many([{"username": "alice"}, {"username": "alice"}])
+        with self.assertRaisesMessage(CommandError, "duplicate values must be fixed first"):
+            call_command("ensure_indexes", stdout=io.StringIO())
+        self.assertIn("username", missing_unique_indexes())
+
+
+class LoginTests(AuthTestCase):
+
+    def login(self, username, password="S3cret-pass"):
+        return self.client.post("/auth/login/", {"username": username, "password": password},
+                                content_type="application/json")
+
+    def setUp(self):
+        super().setUp()
+        self.register("alice")
+
+    def test_login_returns_working_tokens(self):
+        response = self.login("alice")
+        self.assertEqual(response.status_code, 200)
+        tokens = response.json()
+        self.assertEqual(tokens["user"]["username"], "alice")
+        response = self.client.get("/predictions/", HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(response.status_code, 200)
+
+    def test_wrong_password_or_unknown_user(self):
+        self.assertEqual(self.login("alice", "wrong").status_code, 400)
+        self.assertEqual(self.login("nobody").status_code, 400)
+
+    def test_username_must_be_a_string(self):
+        for username in ({"$regex": "^ali"}, {"$ne": None}, ["alice"], None, ""):
+            response = self.login(username)
+            self.assertEqual(response.status_code, 400, username)
+            self.assertNotIn("access", response.json())
+        self.assertIsNone(AuthService.get_login_user({"$regex": "^ali"}))
+        self.assertIsNone(async_to_sync(AuthService.aget_login_user)({"$regex": "^ali"}))
+
+
+class RefreshTests(AuthTestCase):
+
+    def refresh(self, token):
+        return self.client.post("/auth/refresh/", {"refresh": token}, content_type="application/json")
+
+    def setUp(self):
+        super().setUp()
+        self.tokens = TokenService.issue_pair(str(ObjectId()), "alice")
+
+    def test_refresh_rotates_and_rejects_replay(self):
+        response = self.refresh(self.tokens["refresh"])
+        self.assertEqual(response.status_code, 200)
+        second = response.json()["refresh"]
+        self.assertNotEqual(second, self.tokens["refresh"])
+
+        self.assertEqual(self.refresh(self.tokens["refresh"]).status_code, 401)  # đã dùng một lần
+        self.assertEqual(self.refresh(second).status_code, 200)
+
+    def test_refresh_rejects_other_tokens(self):
+        self.assertEqual(self.refresh(self.tokens["access"]).status_code, 401)
+        self.assertEqual(self.refresh("not-a-jwt").status_code, 401)
+        self.assertEqual(self.refresh("").status_code, 400)
+
+    def test_revocation_is_shared_through_the_database(self):
+        payload = TokenService.decode(self.tokens["refresh"], REFRESH)
+        other_worker = RevocationStore(sync_interval=0)
+        self.assertTrue(other_worker.revoke(payload["jti"], payload["user_id"], payload["exp"]))
+
+        self.assertFalse(revocation_store.revoke(payload["jti"], payload["user_id"], payload["exp"]))
+        self.assertTrue(RevocationStore(sync_interval=0).is_revoked(payload["jti"]))
+        self.assertEqual(self.refresh(self.tokens["refresh"]).status_code, 401)
@@ -0,0 +1,99 @@
+import os
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from main.benchmarks.compare import compare
+from main.models import Prediction
+from main.services.backtest_services import (
+    BacktestStats,
+    backtest_models,
+    backtest_predictions,
+    iter_outcome_chunks,
+)
+from main.services.history_services import prediction_buffer
+from main.services.model_registry import BASELINE_VERSION
+from main.services.training_services import generate_synthetic_students
+from main.tests.base import MongoTestCase
+
+
+def write_csv(test, content):
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    test.addCleanup(os.remove, path)
+    with os.fdopen(fd, "w") as f:
+        f.write(content)
+    return path
+
+
+class BacktestStatsTests(SimpleTestCase):
+
+    def test_merged_shards_match_one_pass(self):
+        rng = np.random.default_rng(0)
+        actual = rng.uniform(0, 100, 1_000)
+        predicted = actual + rng.normal(0, 5, 1_000)
+        whole = BacktestStats()
+        whole.update(predicted, actual)
+        merged = BacktestStats()
+        for part in range(4):
+            shard = BacktestStats()
+            shard.update(predicted[part::4], actual[part::4])
+            merged.merge(shard)
+
+        self.assertEqual(merged.result(), whole.result())
+        result = whole.result()
+        self.assertAlmostEqual(result["rmse"], np.sqrt(np.mean((predicted - actual) ** 2)), places=4)
+        self.assertEqual(sum(bucket["count"] for bucket in result["calibration"]), 1_000)
+
+    def test_no_rows(self):
+        self.assertEqual(BacktestStats().result(), {"rows": 0})
+
+    def test_backtest_models_on_synthetic_students(self):
+        chunks = generate_synthetic_students(5_000, seed=3, chunk_size=2_000)
+        totals, dropped = backtest_models(chunks, [BASELINE_VERSION])
+        result = totals[BASELINE_VERSION].result()
+        self.assertEqual(result["rows"] + dropped, 5_000)
+        self.assertTrue(np.isfinite([result["mae"], result["rmse"], result["r2"]]).all())
+
+    def test_compare_with_negative_baseline(self):
+        rows = compare({"results": {"m": {"r2": -0.5}}}, {"results": {"m": {"r2": -0.1}}})
+        self.assertFalse(rows[0][4])
+        rows = compare({"results": {"m": {"r2": -0.5}}}, {"results": {"m": {"r2": -0.9}}})
+        self.assertTrue(rows[0][4])
+
+
+class OutcomeBacktestTests(MongoTestCase):
+
+    def test_outcome_rows_must_have_an_id_and_a_finite_grade(self):
+        first, second = "6a0000000000000000000001", "6a0000000000000000000002"
+        path = write_csv(self, (
+            f"id,finalGrade\n{first},70\nnot-an-id,70\n{second},nan\n{second},inf\n"
+            f"{second},-inf\n{second},\n{second},81.5\n"
+        ))
+        chunks = list(iter_outcome_chunks(path, chunk_size=10, target="finalGrade"))
+        self.assertEqual(len(chunks), 1)
+        ids, actual = chunks[0]
+        self.assertEqual([str(i) for i in ids], [first, second])
+        np.testing.assert_array_equal(actual, [70, 81.5])
+
+    def test_missing_column_is_an_error(self):
+        path = write_csv(self, "id,grade\n")
+        with self.assertRaises(ValueError):
+            list(iter_outcome_chunks(path, chunk_size=10, target="finalGrade"))
+
+    def test_stored_predictions_are_joined_with_outcomes(self):
+        _, alice = self.make_user("alice")
+        for hours in (5, 20, 40):
+            self.predict(alice, studyHourPerWeek=hours)
+        prediction_buffer.flush()
+        served = list(Prediction._get_collection().find({}, {"final_grade": 1, "model_version": 1}))
+        self.assertEqual(len(served), 3)
+
+        lines = [f"{doc['_id']},{doc['final_grade'] + 2}" for doc in served]
+        path = write_csv(self, "\n".join(["id,finalGrade", *lines, "6a0000000000000000000001,50"]) + "\n")
+        totals, unmatched = backtest_predictions(iter_outcome_chunks(path, chunk_size=2, target="finalGrade"))
+        self.assertEqual(unmatched, 1)
+        (version, stats), = totals.items()
+        self.assertEqual(version, served[0]["model_version"])
+        result = stats.result()
+        self.assertEqual((result["rows"], result["bias"], result["mae"]), (3, -2.0, 2.0))
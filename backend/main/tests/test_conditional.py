@@ -0,0 +1,40 @@
+from main.services.history_services import prediction_buffer
+from main.tests.base import MongoTestCase
+
+
+class ConditionalGetTests(MongoTestCase):
+
+    def test_history_etag_until_next_flush(self):
+        _, auth = self.make_user("alice")
+        self.predict(auth)
+        prediction_buffer.flush()
+
+        response = self.client.get("/predictions/", **auth)
+        etag = response["ETag"]
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        response = self.client.get("/predictions/", HTTP_IF_NONE_MATCH=etag, **auth)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(self.client.get("/predictions/", HTTP_IF_NONE_MATCH=f"W/{etag}", **auth).status_code, 304)
+        self.assertEqual(self.client.get("/predictions/", {"limit": 1}, HTTP_IF_NONE_MATCH=etag, **auth).status_code,
+                         200)
+
+        self.predict(auth)
+        prediction_buffer.flush()
+        response = self.client.get("/predictions/", HTTP_IF_NONE_MATCH=etag, **auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_is_per_user(self):
+        _, alice = self.make_user("alice")
+        _, bob = self.make_user("bob")
+        etag = self.client.get("/predictions/", **alice)["ETag"]
+        self.assertEqual(self.client.get("/predictions/", HTTP_IF_NONE_MATCH=etag, **bob).status_code, 200)
+
+    def test_model_info_is_public_and_cacheable(self):
+        response = self.client.get("/models/current/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Cache-Control"].startswith("public, max-age="))
+        response = self.client.get("/models/current/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+
+import pyarrow.parquet as pq
+from bson import ObjectId
+from django.core.management import call_command
+from django.test import AsyncRequestFactory
+
+from main.services.export_services import COHORT_COLUMNS, COLUMNS, CsvEncoder, ExportService
+from main.services.history_services import prediction_buffer
+from main.services.token_services import TokenService
+from main.tests.base import MongoTestCase
+from main.views.async_predict_views import AsyncPredictionExportView
+
+
+class ExportTests(MongoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.alice_id, self.alice = self.make_user("alice")
+        _, self.bob = self.make_user("bob")
+        for hours in (5, 20, 40):
+            self.predict(self.alice, studyHourPerWeek=hours, cohort="12A1")
+        self.predict(self.bob, cohort="12A1")
+        prediction_buffer.flush()
+
+    def export(self, auth, **params):
+        return self.client.get("/predictions/export/", params, **auth)
+
+    def test_csv_export_of_own_history(self):
+        response = self.export(self.alice)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('filename="predictions-user-', response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], COLUMNS)
+        self.assertEqual([row[COLUMNS.index("studyHourPerWeek")] for row in rows[1:]], ["5.0", "20.0", "40.0"])
+        self.assertEqual({row[COLUMNS.index("userId")] for row in rows[1:]}, {str(self.alice_id)})
+
+    def test_parquet_export(self):
+        response = self.export(self.alice, type="parquet")
+        self.assertEqual(response.status_code, 200)
+        table = pq.read_table(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(table.column_names, COLUMNS)
+        self.assertEqual(table.column("studyHourPerWeek").to_pylist(), [5.0, 20.0, 40.0])
+
+    def test_unknown_type_is_400(self):
+        self.assertEqual(self.export(self.alice, type="xlsx").status_code, 400)
+
+    def test_stream_encodes_batch_by_batch(self):
+        cursor = ExportService.cursor("user", str(self.alice_id))
+        chunks = list(ExportService.stream(cursor, CsvEncoder(), batch_size=2))
+        self.assertEqual([chunk.count(b"\n") for chunk in chunks], [1, 2, 1, 0])  # header, 2, 1, close
+
+    def test_cohort_export_requires_access_and_drops_user_ids(self):
+        self.assertEqual(self.export(self.bob, cohort="12A1").status_code, 403)
+
+        call_command("grant_cohort", "bob", "12A1", stdout=io.StringIO())
+        for kind in ("csv", "parquet"):
+            content = b"".join(self.export(self.bob, cohort="12A1", type=kind).streaming_content)
+            if kind == "csv":
+                header, *rows = csv.reader(io.StringIO(content.decode()))
+                self.assertEqual((header, len(rows)), (COHORT_COLUMNS, 4))
+            else:
+                self.assertEqual(pq.read_table(io.BytesIO(content)).column_names, COHORT_COLUMNS)
+
+    async def test_async_cohort_export_requires_access(self):
+        access = TokenService.issue_pair(str(ObjectId()), "mallory")["access"]
+        request = AsyncRequestFactory().get("/", {"cohort": "12A1"}, headers={"Authorization": f"Bearer {access}"})
+        response = await AsyncPredictionExportView.as_view()(request)
+        self.assertEqual(response.status_code, 403)
+        self.assertIn("cohort", json.loads(response.content)["detail"])
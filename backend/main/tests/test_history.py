@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from rest_framework.exceptions import ValidationError
+
+from main.models import Prediction
+from main.services.history_services import decode_cursor, encode_cursor, prediction_buffer
+from main.tests.base import MongoTestCase
+
+
+class HistoryPaginationTests(MongoTestCase):
+
+    def test_cursor_round_trip(self):
+        created_at, prediction_id = datetime(2024, 12, 28, 10, 0, 0, 123000), ObjectId()
+        self.assertEqual(decode_cursor(encode_cursor(created_at, prediction_id)), (created_at, prediction_id))
+        with self.assertRaises(ValidationError):
+            decode_cursor("not-a-cursor")
+
+    def test_pages_cover_every_prediction_once(self):
+        user_id, auth = self.make_user("alice")
+        now = datetime.utcnow().replace(microsecond=0)
+        # Ba dự đoán cùng created_at: ranh giới trang phải phân biệt bằng _id
+        times = [now, now, now, now - timedelta(seconds=1), now - timedelta(seconds=2)]
+        docs = [{
+            "_id": ObjectId(), "user_id": user_id, "created_at": created_at, "final_grade": 70.0,
+            "study_hour_per_week": 20.0, "previous_grade": 80.0, "attendance_rate": 95.0,
+            "extracurricular_activities": 2,
+        } for created_at in times]
+        Prediction._get_collection().insert_many(docs)
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = self.client.get("/predictions/", params, **auth).json()
+            seen += [item["id"] for item in page["results"]]
+            cursor = page["next"]
+            if not cursor:
+                break
+        expected = sorted(docs, key=lambda doc: (doc["created_at"], doc["_id"]), reverse=True)
+        self.assertEqual(seen, [str(doc["_id"]) for doc in expected])
+
+    def test_history_is_per_user(self):
+        _, alice = self.make_user("alice")
+        _, bob = self.make_user("bob")
+        grade = self.predict(alice)["finalGrade"]
+        prediction_buffer.flush()
+
+        results = self.client.get("/predictions/", **alice).json()["results"]
+        self.assertEqual([item["finalGrade"] for item in results], [grade])
+        self.assertEqual(self.client.get("/predictions/", **bob).json()["results"], [])
+
+    def test_invalid_cursor_and_limit_are_400(self):
+        _, auth = self.make_user("alice")
+        self.assertEqual(self.client.get("/predictions/", {"cursor": "!!"}, **auth).status_code, 400)
+        self.assertEqual(self.client.get("/predictions/", {"limit": "abc"}, **auth).status_code, 400)
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.client.get("/predictions/").status_code, 401)
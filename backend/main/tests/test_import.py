@@ -0,0 +1,62 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+from pymongo.errors import BulkWriteError
+
+from main.models import User
+from main.services.import_services import UserImporter, duplicate_field, iter_user_chunks
+from main.tests.base import MongoTestCase
+
+
+class UserImportTests(MongoTestCase):
+
+    def write(self, content):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        return path
+
+    def test_invalid_rows_are_reported_with_their_line(self):
+        path = self.write("username,password,email\nalice,pw1,\n,pw2,\nbob,,\ncarol,pw3,not-an-email\n")
+        (users, rejected), = list(iter_user_chunks(path, chunk_size=10))
+        self.assertEqual([user["username"] for user in users], ["alice"])
+        self.assertEqual([line for line, _ in rejected], [3, 4, 5])
+
+    def test_import_skips_existing_and_duplicated_usernames(self):
+        User._get_collection().insert_one({"username": "alice", "password_hash": "x"})
+        path = self.write("username,password,email\nalice,pw,\nbob,pw-bob,bob@example.com\nbob,pw,\ncarol,pw,\n")
+        out = io.StringIO()
+        call_command("import_users", path, "--workers", "1", "--chunk-size", "2", stdout=out, stderr=io.StringIO())
+        self.assertIn("2 inserted, 1 already existed, 1 duplicated in the file", out.getvalue())
+
+        bob = User._get_collection().find_one({"username": "bob"})
+        self.assertEqual(bob["email"], "bob@example.com")
+        self.assertTrue(check_password("pw-bob", bob["password_hash"]))
+
+    def test_dry_run_inserts_nothing(self):
+        path = self.write("username,password\nalice,pw\n")
+        call_command("import_users", path, "--dry-run", "--workers", "1", stdout=io.StringIO())
+        self.assertEqual(User._get_collection().count_documents({}), 0)
+
+    def test_database_rejections_name_the_colliding_field(self):
+        def write_error(index, field):
+            return {"index": index, "code": 11000, "keyPattern": {field: 1},
+                    "errmsg": f"E11000 duplicate key error collection: db.users index: {field}_1 dup key"}
+
+        error = BulkWriteError({"nInserted": 1, "writeErrors": [write_error(0, "username"), write_error(2, "email")]})
+        collection = mock.Mock(**{"find.return_value": [], "insert_many.side_effect": error})
+        users = [{"username": name, "password": "pw"} for name in ("alice", "bob", "carol")]
+        with UserImporter(workers=1) as importer, \
+                mock.patch.object(User, "_get_collection", return_value=collection):
+            errors = importer.import_chunk(users, [])
+        self.assertEqual(errors, [("alice", "username already exists"), ("carol", "email already exists")])
+        self.assertEqual((importer.stats["inserted"], importer.stats["rejected_by_db"]), (1, 2))
+
+    def test_duplicate_field_falls_back_to_errmsg(self):
+        self.assertEqual(duplicate_field({"errmsg": "E11000 duplicate key error index: email_1 dup key"}), "email")
+        self.assertIsNone(duplicate_field({"errmsg": "E11000 Duplicate Key Error"}))
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from main.models import PredictionJob, PredictionJobChunk
+from main.services.job_services import JobService
+from main.tests.base import MongoTestCase
+
+
+@override_settings(PREDICTION_JOB_CHUNK_SIZE=2, PREDICTION_JOB_MAX_ATTEMPTS=2)
+class JobTests(MongoTestCase):
+
+    def create_job(self, rows):
+        lines = ["studyHourPerWeek,previousGrade,attendanceRate,extracurricularActivities", *rows]
+        upload = SimpleUploadedFile("school.csv", ("\n".join(lines) + "\n").encode())
+        return JobService.create(str(ObjectId()), upload)
+
+    def get_job(self, job):
+        return PredictionJob._get_collection().find_one({"_id": job["_id"]})
+
+    def test_claim_process_and_results(self):
+        job = self.create_job(["20,80,95,2", "10,60,70,1", "x,60,70,1"])
+        self.assertEqual((job["total_rows"], job["total_chunks"]), (3, 2))
+        while (chunk := JobService.claim("w1")) is not None:
+            self.assertTrue(JobService.process(chunk, "w1"))
+
+        job = self.get_job(job)
+        self.assertEqual((job["status"], job["processed_rows"], job["invalid_rows"]), ("done", 3, 1))
+        lines = b"".join(JobService.stream_results(JobService.result_cursor(job["_id"]))).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[3].endswith(","))  # dòng không hợp lệ: finalGrade rỗng
+
+    def test_expired_lease_moves_chunk_to_another_worker(self):
+        job = self.create_job(["20,80,95,2"])
+        chunk = JobService.claim("w1")
+        self.assertIsNone(JobService.claim("w2"))
+
+        PredictionJobChunk._get_collection().update_one(
+            {"_id": chunk["_id"]}, {"$set": {"lease_until": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        taken = JobService.claim("w2")
+        self.assertEqual((taken["_id"], taken["attempts"]), (chunk["_id"], 2))
+        self.assertFalse(JobService.process(chunk, "w1"))  # lease đã mất
+        self.assertTrue(JobService.process(taken, "w2"))
+        self.assertEqual((self.get_job(job)["status"], self.get_job(job)["done_chunks"]), ("done", 1))
+
+    def test_failed_chunk_is_retried_then_fails_the_job(self):
+        job = self.create_job(["20,80,95,2"])
+        chunk = JobService.claim("w1")
+        JobService.release(chunk, "w1", "boom")
+        chunk = JobService.claim("w1")
+        self.assertEqual(chunk["attempts"], 2)
+        JobService.release(chunk, "w1", "boom")
+
+        self.assertEqual(self.get_job(job)["status"], "failed")
+        self.assertIsNone(JobService.claim("w1"))
+
+    def test_chunk_done_but_not_counted_is_recovered(self):
+        job = self.create_job(["20,80,95,2", "10,60,70,1", "x,60,70,1"])
+        first = JobService.claim("w1")
+        self.assertTrue(JobService.process(first, "w1"))
+
+        # Worker chết giữa lúc ghi chunk done và lúc cộng tiến độ của job
+        last = JobService.claim("w1")
+        grades, invalid, version = JobService.score(last["columns"])
+        PredictionJobChunk._get_collection().update_one({"_id": last["_id"]}, {"$set": {
+            "status": "done", "grades": grades, "invalid_rows": invalid, "model_version": version,
+        }})
+        self.assertIsNone(JobService.claim("w2"))
+        self.assertEqual(JobService.reconcile(), 0)  # job vừa có tiến triển, chưa quá một lease
+        self.assertEqual(self.get_job(job)["status"], "running")
+
+        PredictionJob._get_collection().update_one(
+            {"_id": job["_id"]}, {"$set": {"updated_at": datetime.utcnow() - timedelta(hours=1)}}
+        )
+        self.assertEqual(JobService.reconcile(), 1)
+        self.assertEqual(JobService.reconcile(), 0)
+        job = self.get_job(job)
+        self.assertEqual((job["status"], job["done_chunks"], job["processed_rows"], job["invalid_rows"]),
+                         ("done", 2, 3, 1))
+
+    def test_a_chunk_is_counted_once(self):
+        job = self.create_job(["20,80,95,2"])
+        chunk = JobService.claim("w1")
+        self.assertTrue(JobService.process(chunk, "w1"))
+        JobService.count_chunk(job["_id"], chunk["index"], 1, 0, "v")
+        job = self.get_job(job)
+        self.assertEqual((job["done_chunks"], job["processed_rows"]), (1, 1))
@@ -0,0 +1,67 @@
+from unittest import mock
+
+import mongoengine
+from django.test import SimpleTestCase, override_settings
+from mongoengine import connection as me_connection
+
+from main.services.mongo_connection import MongoConnectionManager, is_serving_process, mongo_connection
+
+
+@override_settings(MONGODB_URI="mongodb://127.0.0.1:1/", MONGO_DATABASE_NAME="lazy_test")
+class LazyRegistrationTests(SimpleTestCase):
+
+    def setUp(self):
+        self.addCleanup(setattr, me_connection, "get_connection", me_connection.get_connection)
+        self.addCleanup(mongoengine.disconnect, "lazy")
+        self.manager = MongoConnectionManager(alias="lazy")
+        self.manager.install()
+
+    def test_startup_installs_the_hook_without_registering(self):
+        self.assertIs(me_connection.get_connection.lazy_manager, self.manager)
+        self.assertFalse(self.manager.registered)
+        self.assertIs(mongo_connection.registered, "default" in me_connection._connection_settings)
+
+    def test_first_access_registers(self):
+        db = me_connection.get_db("lazy")
+        self.assertTrue(self.manager.registered)
+        self.assertEqual(db.name, "lazy_test")
+
+    def test_failed_registration_is_retried_after_a_backoff(self):
+        calls = []
+        register = self.manager.register
+
+        def flaky_register():
+            calls.append(1)
+            return len(calls) > 1 and register()
+
+        with mock.patch.object(self.manager, "register", flaky_register):
+            with self.assertRaises(me_connection.ConnectionFailure):
+                me_connection.get_db("lazy")
+            with self.assertRaises(me_connection.ConnectionFailure):
+                me_connection.get_db("lazy")  # còn trong thời gian chờ: không thử lại
+            self.assertEqual(len(calls), 1)
+
+            self.manager._retry_at = 0.0
+            me_connection.get_db("lazy")
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(self.manager.registered)
+        self.assertEqual(self.manager._failures, 0)
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        with mock.patch.object(self.manager, "register", return_value=False), \
+                mock.patch("main.services.mongo_connection.time.monotonic", return_value=100.0):
+            delays = []
+            for _ in range(8):
+                self.manager._retry_at = 0.0
+                self.manager.ensure_registered()
+                delays.append(self.manager._retry_at - 100.0)
+        self.assertEqual(delays, [1, 2, 4, 8, 16, 30, 30, 30])
+
+
+class ServingProcessTests(SimpleTestCase):
+
+    def test_only_servers_count(self):
+        self.assertTrue(is_serving_process(["/venv/bin/gunicorn", "Predict_Learning_Web.wsgi"]))
+        self.assertTrue(is_serving_process(["manage.py", "runserver", "--noreload"]))
+        self.assertFalse(is_serving_process(["manage.py", "test"]))
+        self.assertFalse(is_serving_process(["manage.py", "train_model", "--synthetic", "10"]))
@@ -0,0 +1,83 @@
+from django.test import SimpleTestCase, override_settings
+from rest_framework.exceptions import ValidationError
+
+from main.services.predict_services import FEATURES, PredictService
+from main.tests.base import STUDENT
+
+
+class PredictBatchTests(SimpleTestCase):
+
+    def batch(self, students, **extra):
+        return self.client.post("/predict/batch/", {"students": students, **extra}, content_type="application/json")
+
+    def test_records_and_columns_agree(self):
+        other = {**STUDENT, "studyHourPerWeek": 5}
+        records = self.batch([STUDENT, other]).json()
+        columns = self.batch({name: [STUDENT[name], other[name]] for name in FEATURES}).json()
+        self.assertEqual(records["grades"], columns["grades"])
+        single, _ = PredictService.predict_one(STUDENT)
+        self.assertEqual(records["grades"][0], single)
+
+    def test_seed_must_be_a_non_negative_integer(self):
+        for seed, expected in ((True, 400), (-1, 400), ("1", 400), (1, 200)):
+            self.assertEqual(self.batch([STUDENT], seed=seed).status_code, expected, seed)
+
+    @override_settings(PREDICT_BATCH_MAX_SIZE=3)
+    def test_size_limit_applies_to_every_column(self):
+        self.assertEqual(self.batch([STUDENT] * 4).status_code, 400)
+        columns = {name: [STUDENT[name]] * 3 for name in FEATURES}
+        self.assertEqual(self.batch(columns).status_code, 200)
+
+        columns["extracurricularActivities"] = [2] * 4  # cột vượt giới hạn không phải cột đầu
+        response = self.batch(columns)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("must not exceed 3", response.json()["students"][0])
+
+    def test_columns_must_have_the_same_length(self):
+        columns = {name: [STUDENT[name]] * 2 for name in FEATURES}
+        columns["attendanceRate"] = [95]
+        with self.assertRaises(ValidationError) as raised:
+            PredictService.predict_batch(columns)
+        self.assertIn("same length", str(raised.exception.detail["students"][0]))
+
+    def test_out_of_range_row_is_reported(self):
+        response = self.batch([STUDENT, {**STUDENT, "previousGrade": 101}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"previousGrade": ["Row 1: invalid value 101."]})
+
+
+class SweepTests(SimpleTestCase):
+
+    def sweep(self, *axes):
+        return self.client.post("/predict/sweep/", {"inputs": STUDENT, "sweep": list(axes)},
+                                content_type="application/json")
+
+    def test_sweep_matches_single_predictions(self):
+        response = self.sweep({"feature": "studyHourPerWeek", "start": 0, "stop": 40, "step": 10})
+        self.assertEqual(response.status_code, 200)
+        grades = response.json()["grades"]
+        self.assertEqual(len(grades), 5)
+        single, _ = PredictService.predict_one({**STUDENT, "studyHourPerWeek": 30})
+        self.assertEqual(grades[3], single)
+
+    def test_two_axes_make_a_grid(self):
+        response = self.sweep(
+            {"feature": "studyHourPerWeek", "values": [10, 20, 30]},
+            {"feature": "attendanceRate", "values": [50, 100]},
+        )
+        grades = response.json()["grades"]
+        self.assertEqual((len(grades), len(grades[0])), (3, 2))
+        single, _ = PredictService.predict_one({**STUDENT, "studyHourPerWeek": 20, "attendanceRate": 50})
+        self.assertEqual(grades[1][0], single)
+
+    def test_sweep_overflow_and_bad_ranges_are_400(self):
+        feature = {"feature": "studyHourPerWeek"}
+        self.assertEqual(self.sweep({**feature, "start": 0, "stop": 1e300, "step": 1e-300}).status_code, 400)
+        self.assertEqual(self.sweep({**feature, "start": 0, "stop": 168, "step": 0.001}).status_code, 400)
+        self.assertEqual(self.sweep({**feature, "values": [200]}).status_code, 400)
+        self.assertEqual(self.sweep(feature, {**feature, "values": [1]}).status_code, 400)
+        for axis in ({"start": 0, "stop": 10, "step": 0}, {"start": 0, "stop": 10, "step": -1},
+                     {"start": 10, "stop": 0, "step": 1}):
+            self.assertEqual(self.sweep({**feature, **axis}).status_code, 400)
+            with self.assertRaises(ValidationError):
+                PredictService.sweep_values({**feature, **axis})
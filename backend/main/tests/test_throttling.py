@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from main.tests.base import MongoTestCase
+from main.throttling import LocalBucketStore, parse_rate
+
+
+class TokenBucketTests(SimpleTestCase):
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/min"), (10, 10 / 60))
+        self.assertEqual(parse_rate("2/s"), (2, 2.0))
+        self.assertIsNone(parse_rate(None))
+
+    def test_local_bucket_refills(self):
+        store = LocalBucketStore()
+        with mock.patch("main.throttling.time.monotonic", return_value=0.0):
+            self.assertTrue(store.consume("k", 2, 1.0)[0])
+            self.assertTrue(store.consume("k", 2, 1.0)[0])
+            self.assertEqual(store.consume("k", 2, 1.0), (False, 1.0))
+            self.assertTrue(store.consume("other", 2, 1.0)[0])
+        with mock.patch("main.throttling.time.monotonic", return_value=1.0):
+            self.assertTrue(store.consume("k", 2, 1.0)[0])
+
+
+class AuthThrottleTests(MongoTestCase):
+
+    def post(self, url, data):
+        return self.client.post(url, data, content_type="application/json")
+
+    @override_settings(THROTTLE_ENABLED=True, THROTTLE_RATES={"register_ip": "2/min"})
+    def test_register_is_throttled_per_ip(self):
+        for username in ("a1", "a2"):
+            self.assertEqual(self.post("/auth/register/", {"username": username, "password": "pw"}).status_code, 201)
+        response = self.post("/auth/register/", {"username": "a3", "password": "pw"})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    @override_settings(THROTTLE_ENABLED=True, THROTTLE_RATES={"login_username": "2/min"})
+    def test_login_is_throttled_per_username(self):
+        statuses = [self.post("/auth/login/", {"username": name, "password": "x"}).status_code
+                    for name in ("alice", "Alice ", "alice", "bob")]
+        self.assertEqual(statuses, [400, 400, 429, 400])
+
+    @override_settings(THROTTLE_ENABLED=True, THROTTLE_RATES={"login_username": "2/min"})
+    def test_malformed_usernames_share_one_bucket(self):
+        statuses = [
+            self.post("/auth/login/", {"username": username, "password": "x"}).status_code
+            for username in ({"$regex": "^a"}, {"$regex": "^b"}, ["alice"], None, "")
+        ]
+        self.assertEqual(statuses, [400, 400, 429, 429, 429])
+
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_disabled(self):
+        for _ in range(15):
+            self.assertEqual(self.post("/auth/login/", {"username": "alice", "password": "x"}).status_code, 400)
@@ -0,0 +1,59 @@
+import time
+
+import jwt
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from main.services.token_services import ACCESS, REFRESH, TokenService, signing_keys
+
+
+def legacy_token(**claims):
+    """Token shaped like the ones issued before the "type" claim existed"""
+    key = signing_keys()[settings.JWT_ACTIVE_KID]
+    return jwt.encode({"user_id": "u1", "username": "alice", "exp": time.time() + 86400, **claims}, key, "HS256")
+
+
+class TokenServiceTests(SimpleTestCase):
+
+    def test_pair_round_trip(self):
+        pair = TokenService.issue_pair("u1", "alice")
+        self.assertEqual(TokenService.decode(pair["access"])["username"], "alice")
+        self.assertEqual(TokenService.decode(pair["refresh"], REFRESH)["type"], REFRESH)
+
+    def test_token_type_is_enforced(self):
+        pair = TokenService.issue_pair("u1", "alice")
+        with self.assertRaises(jwt.InvalidTokenError):
+            TokenService.decode(pair["refresh"], ACCESS)
+        with self.assertRaises(jwt.InvalidTokenError):
+            TokenService.decode(pair["access"], REFRESH)
+
+    def test_untyped_tokens_are_rejected(self):
+        for token_type in (ACCESS, REFRESH):
+            with self.assertRaises(jwt.InvalidTokenError):
+                TokenService.decode(legacy_token(), token_type)
+
+    def test_expired_token(self):
+        token = TokenService.encode({"user_id": "u1"}, ACCESS, -1)
+        with self.assertRaises(jwt.ExpiredSignatureError):
+            TokenService.decode(token)
+
+    def test_retired_key_still_verifies(self):
+        with override_settings(JWT_SIGNING_KEYS={"old": "old-secret"}, JWT_ACTIVE_KID="old"):
+            token = TokenService.issue_pair("u1", "alice")["access"]
+        with override_settings(JWT_SIGNING_KEYS={"new": "new-secret", "old": "old-secret"}, JWT_ACTIVE_KID="new"):
+            self.assertEqual(TokenService.decode(token)["user_id"], "u1")
+        with override_settings(JWT_SIGNING_KEYS={"new": "new-secret"}, JWT_ACTIVE_KID="new"):
+            with self.assertRaises(jwt.InvalidTokenError):
+                TokenService.decode(token)
+
+
+class JWTAuthenticationTests(SimpleTestCase):
+
+    def get(self, token):
+        return self.client.get("/predictions/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_only_typed_access_tokens_authenticate(self):
+        pair = TokenService.issue_pair("64b000000000000000000000", "alice")
+        self.assertEqual(self.get(pair["refresh"]).status_code, 401)
+        self.assertEqual(self.get(legacy_token()).status_code, 401)
+        self.assertEqual(self.get("not-a-jwt").status_code, 401)
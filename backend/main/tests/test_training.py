@@ -0,0 +1,87 @@
+import os
+import tempfile
+
+import numpy as np
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from main.services.training_services import (
+    SYNTHETIC_INTERCEPT,
+    SYNTHETIC_WEIGHTS,
+    NormalEquationAccumulator,
+    clean_chunk,
+    generate_synthetic_students,
+    iter_csv_chunks,
+    transform_features,
+    write_csv,
+)
+
+
+class NormalEquationAccumulatorTests(SimpleTestCase):
+
+    def test_recovers_the_synthetic_weights(self):
+        accumulator = NormalEquationAccumulator()
+        for X, y in generate_synthetic_students(50_000, seed=1, chunk_size=7_000):
+            accumulator.partial_fit(*clean_chunk(X, y)[:2])
+        intercept, weights = accumulator.solve()
+        self.assertEqual(accumulator.n_rows, 50_000)
+        np.testing.assert_allclose(weights, SYNTHETIC_WEIGHTS, atol=0.02)
+        self.assertAlmostEqual(intercept, SYNTHETIC_INTERCEPT, delta=1.5)
+
+    def test_chunked_and_merged_fits_match_one_pass(self):
+        (X, y), = generate_synthetic_students(3_000, seed=2, chunk_size=3_000)
+        whole = NormalEquationAccumulator()
+        whole.partial_fit(X, y)
+        merged = NormalEquationAccumulator()
+        for part in range(3):
+            shard = NormalEquationAccumulator()
+            shard.partial_fit(X[part::3], y[part::3])
+            merged.merge(shard)
+
+        np.testing.assert_allclose(merged.solve()[1], whole.solve()[1])
+        A = np.column_stack([np.ones(len(X)), transform_features(X)])
+        beta, *_ = np.linalg.lstsq(A, y, rcond=None)
+        np.testing.assert_allclose(whole.solve()[1], beta[1:], rtol=1e-6)
+
+        # RMSE tính từ các tổng tích luỹ phải khớp với tính trực tiếp trên dữ liệu
+        intercept, weights = whole.solve()
+        residual = y - (intercept + transform_features(X) @ weights)
+        self.assertAlmostEqual(whole.metrics(intercept, weights)["rmse"], np.sqrt(np.mean(residual ** 2)), places=6)
+
+    def test_solve_without_rows_fails(self):
+        with self.assertRaises(ValueError):
+            NormalEquationAccumulator().solve()
+
+
+class DatasetTests(SimpleTestCase):
+
+    def write(self, content):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        return path
+
+    def test_bad_csv_rows_are_dropped_not_fatal(self):
+        path = self.write(
+            "studyHourPerWeek,previousGrade,attendanceRate,extracurricularActivities,finalGrade\n"
+            "10,70,90,1,70\n10,abc,90,1,70\n10,70\n12,75,91,2,72\n"
+        )
+        (X, y), = list(iter_csv_chunks(path))
+        X, y, dropped = clean_chunk(X, y)
+        self.assertEqual((len(y), dropped), (2, 2))
+        np.testing.assert_array_equal(y, [70, 72])
+
+    def test_csv_round_trip_in_chunks(self):
+        path = self.write("")
+        self.assertEqual(write_csv(path, generate_synthetic_students(25, seed=3, chunk_size=10)), 25)
+        chunks = list(iter_csv_chunks(path, chunk_size=10))
+        self.assertEqual([len(y) for _, y in chunks], [10, 10, 5])
+
+    def test_chunk_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            next(generate_synthetic_students(10, chunk_size=0))
+        for command in ("train_model", "backtest", "generate_students"):
+            args = ["out.csv"] if command == "generate_students" else ["--synthetic", "10"]
+            with self.assertRaisesMessage(CommandError, "must be at least 1"):
+                call_command(command, *args, "--chunk-size", "0")
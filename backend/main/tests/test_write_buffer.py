@@ -0,0 +1,71 @@
+import mongomock
+from bson import ObjectId
+from django.test import SimpleTestCase
+from pymongo.errors import AutoReconnect
+
+from main.services.write_buffer import BulkWriteBuffer
+
+
+class BulkWriteBufferTests(SimpleTestCase):
+
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.docs
+        self.flushed = []
+
+    def buffer(self, get_collection, **options):
+        options = {"max_size": 100, "max_delay": 100, **options}
+        buffer = BulkWriteBuffer(get_collection, on_flush=self.flushed.extend, **options)
+        self.addCleanup(setattr, buffer, "_closed", True)
+        return buffer
+
+    def test_flush_writes_in_one_batch(self):
+        buffer = self.buffer(lambda: self.collection)
+        for i in range(3):
+            buffer.add({"i": i})
+        self.assertEqual(buffer.stats()["queue_depth"], 3)
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(self.collection.count_documents({}), 3)
+        self.assertEqual([doc["i"] for doc in self.flushed], [0, 1, 2])
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_full_queue_flushes_in_the_caller(self):
+        buffer = self.buffer(lambda: self.collection, max_queue=2)
+        buffer.add({"i": 0})
+        buffer.add({"i": 1})
+        self.assertEqual(self.collection.count_documents({}), 2)
+        self.assertEqual(buffer.stats()["queue_depth"], 0)
+
+    def test_partial_write_before_error_is_not_lost(self):
+        collection, calls = self.collection, []
+
+        class LostReply:
+            """Stores the first two documents, then fails as if the reply timed out"""
+            def insert_many(self, docs, ordered=False):
+                calls.append(len(docs))
+                if len(calls) == 1:
+                    for doc in docs:
+                        doc["_id"] = ObjectId()
+                    collection.insert_many(docs[:2])
+                    raise AutoReconnect("timed out")
+                return collection.insert_many(docs, ordered=ordered)
+
+        buffer = self.buffer(LostReply)
+        for i in range(5):
+            buffer.add({"i": i})
+        self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(buffer.stats()["queue_depth"], 5)
+
+        self.assertEqual(buffer.flush(), 5)
+        self.assertEqual(len(self.flushed), 5)
+        self.assertEqual(buffer.stats()["failed_docs"], 0)
+        self.assertEqual(collection.count_documents({}), 5)
+
+    def test_real_duplicates_are_rejected(self):
+        buffer = self.buffer(lambda: self.collection)
+        existing = ObjectId()
+        self.collection.insert_one({"_id": existing})
+        buffer.add({"_id": existing})
+        buffer.add({"i": 1})
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(buffer.stats()["failed_docs"], 1)
+        self.assertEqual([doc.get("i") for doc in self.flushed], [1])
@@ -0,0 +1,201 @@
+"""
+Token-bucket throttles for the auth endpoints.
+
+A bucket holds up to `capacity` tokens and refills at `capacity / period`
+tokens per second; each request takes one. The check runs in DRF's
+initial(), before the view touches the database or the password hasher.
+Buckets live in the store picked by settings.THROTTLE_STORE:
+
+    local  in-process dict, exact but per worker
+    cache  Django cache alias (THROTTLE_CACHE_ALIAS); shared when the cache
+           is (Redis/Memcached), may let a few extra requests through under
+           races since the cache API has no compare-and-set
+    mongo  one atomic findAndModify per check on `throttle_buckets`
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from pymongo import ReturnDocument
+from rest_framework.throttling import BaseThrottle
+
+from main.metrics import registry
+
+
+THROTTLED = registry.counter("throttled_requests_total", "Requests rejected by a throttle", ("scope",))
+
+PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (capacity 10, refill 10/60 tokens per second); None disables"""
+    if not rate:
+        return None
+    count, period = rate.split("/")
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period.strip()]
+
+
+class LocalBucketStore:
+    max_keys = 100_000
+
+    def __init__(self):
+        self._init_state()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._init_state)
+
+    def _init_state(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def consume(self, key, capacity, rate):
+        """Take one token, returns (allowed, seconds until a token is available)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now, capacity / rate)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def _prune(self, now, refill_seconds):
+        # Bucket đã đầy lại thì bỏ đi cũng như nhau
+        for key, (_tokens, updated) in list(self._buckets.items()):
+            if now - updated > refill_seconds:
+                del self._buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def consume(self, key, capacity, rate):
+        cache = caches[self.alias]
+        cache_key = f"throttle:{key}"
+        now = time.time()
+        tokens, updated = cache.get(cache_key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        cache.set(cache_key, (tokens, now), timeout=int(capacity / rate) + 1)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+class MongoBucketStore:
+
+    def consume(self, key, capacity, rate):
+        from main.models import ThrottleBucket
+
+        now = datetime.utcnow()
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [elapsed, rate]}]}]}
+        bucket = ThrottleBucket._get_collection().find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "updated_at": now,
+                    "expires_at": now + timedelta(seconds=capacity / rate),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        allowed = bool(bucket["allowed"])
+        return allowed, 0.0 if allowed else (1 - bucket["tokens"]) / rate
+
+    def clear(self):
+        from main.models import ThrottleBucket
+        ThrottleBucket._get_collection().delete_many({})
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    kind = settings.THROTTLE_STORE
+    if kind == "local":
+        return LocalBucketStore()
+    if kind == "cache":
+        return CacheBucketStore(settings.THROTTLE_CACHE_ALIAS)
+    if kind == "mongo":
+        return MongoBucketStore()
+    raise ValueError(f"Unknown THROTTLE_STORE {kind!r}, expected local, cache or mongo")
+
+
+@receiver(setting_changed)
+def _reset_store(setting, **kwargs):
+    if setting == "THROTTLE_STORE":
+        get_store.cache_clear()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Subclasses set `scope` (a key of settings.THROTTLE_RATES) and get_key()"""
+
+    scope = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = parse_rate(settings.THROTTLE_RATES.get(self.scope)) if settings.THROTTLE_ENABLED else None
+        key = self.get_key(request, view) if rate else None
+        if key is None:
+            return True
+        allowed, self._wait = get_store().consume(f"{self.scope}:{key}", *rate)
+        if not allowed:
+            THROTTLED.inc(self.scope)
+        return allowed
+
+    def wait(self):
+        return getattr(self, "_wait", None)
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = "login_ip"
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class LoginUsernameThrottle(TokenBucketThrottle):
+    """
+    Per target account, so rotating IPs does not help against one user.
+    Requests without a usable username (missing, blank or not a string)
+    share one bucket rather than skipping the check.
+    """
+    scope = "login_username"
+    invalid_key = "<invalid>"
+
+    def get_key(self, request, view):
+        username = request.data.get("username") if hasattr(request.data, "get") else None
+        if not isinstance(username, str) or not username.strip():
+            return self.invalid_key
+        return username.strip().lower()[:150]
+
+
+class RegisterIPThrottle(TokenBucketThrottle):
+    scope = "register_ip"
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
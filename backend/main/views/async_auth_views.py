@@ -0,0 +1,48 @@
+from django.http import JsonResponse
+from rest_framework import status
+
+from main.serializers import LoginSerializer, RegisterSerializer
+from main.services.auth_services import AuthService
+from main.throttling import LoginIPThrottle, LoginUsernameThrottle, RegisterIPThrottle
+from main.views.async_base import AsyncAPIView
+
+
+class AsyncRegisterView(AsyncAPIView):
+    """RegisterView for the ASGI mode: hashing on the pool, insert through motor"""
+    throttle_classes = (RegisterIPThrottle,)
+
+    async def post(self, request):
+        serializer = RegisterSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user = await AuthService.aregister_user(serializer.validated_data)
+        return JsonResponse({
+            "message": "Register successful",
+            "user": {
+                "username": user.username,
+                "email": user.email
+            }
+        }, status=status.HTTP_201_CREATED)
+
+
+class AsyncLoginView(AsyncAPIView):
+    """
+    LoginView for the ASGI mode: the lookup goes through motor and password
+    verification runs on the bounded hashing pool, so the event loop keeps
+    serving other requests.
+    """
+    throttle_classes = (LoginIPThrottle, LoginUsernameThrottle)
+
+    async def post(self, request):
+        serializer = LoginSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        tokens = await AuthService.alogin_user(
+            serializer.validated_data["username"], serializer.validated_data["password"]
+        )
+        return JsonResponse({
+            "message": "Login successful",
+            **tokens
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,82 @@
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled, ValidationError
+
+from main.views.conditional import ConditionalGetMixin
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of DRF's APIView for the ASGI mode: parses the
+    JSON body into request.data, runs the authentication classes (which
+    only read headers) and turns DRF exceptions into JSON responses.
+    """
+    authentication_classes = ()
+    throttle_classes = ()
+    login_required = False
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.data = self.parse_body(request)
+            request.user = self.authenticate(request)
+            if self.throttle_classes:
+                # Store mongo/cache có thể chặn I/O, chạy ngoài event loop
+                await sync_to_async(self.check_throttles, thread_sensitive=False)(request)
+            if self.login_required and not request.user.is_authenticated:
+                return JsonResponse(
+                    {"detail": "Authentication credentials were not provided."},
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+            if isinstance(self, ConditionalGetMixin):
+                # get_etag() dùng pymongo, chạy ngoài event loop như throttle
+                if await sync_to_async(self.not_modified, thread_sensitive=False)(request, *args, **kwargs):
+                    return self.cache_headers(HttpResponseNotModified())
+                return self.cache_headers(await super().dispatch(request, *args, **kwargs))
+            return await super().dispatch(request, *args, **kwargs)
+        except ValidationError as e:
+            return JsonResponse(e.detail, status=status.HTTP_400_BAD_REQUEST, safe=False)
+        except Throttled as e:
+            response = JsonResponse({"detail": e.detail}, status=e.status_code)
+            if e.wait is not None:
+                response["Retry-After"] = str(math.ceil(e.wait))
+            return response
+        except APIException as e:
+            return JsonResponse({"detail": e.detail}, status=e.status_code)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def parse_body(self, request):
+        if request.method not in ("POST", "PUT", "PATCH") or not request.body:
+            return {}
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            raise ValidationError({"detail": "Invalid JSON body"})
+        if not isinstance(data, dict):
+            raise ValidationError({"detail": "Expected a JSON object"})
+        return data
+
+    def check_throttles(self, request):
+        waits = [
+            throttle.wait() for throttle in (cls() for cls in self.throttle_classes)
+            if not throttle.allow_request(request, self)
+        ]
+        if waits:
+            raise Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+    def authenticate(self, request):
+        # Không dùng request.user của AuthenticationMiddleware: nó đọc session (sync)
+        for authentication in self.authentication_classes:
+            result = authentication().authenticate(request)
+            if result is not None:
+                return result[0]
+        return AnonymousUser()
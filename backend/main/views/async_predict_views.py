@@ -0,0 +1,136 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
+
+from main.authentication import JWTAuthentication
+from main.permissions import COHORT_DENIED, can_view_cohort
+from main.serializers import PredictSerializer, SweepSerializer
+from main.services.export_services import ExportService
+from main.services.history_services import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, HistoryService
+from main.services.job_services import JobService
+from main.services.predict_services import FEATURES, PredictService
+from main.views.async_base import AsyncAPIView
+from main.views.conditional import ConditionalGetMixin
+from main.views.history_views import export_params, export_response, history_etag
+from main.views.job_views import job_not_ready, results_response
+from main.views.predict_views import sweep_response
+
+
+class AsyncPredictView(AsyncAPIView):
+    authentication_classes = (JWTAuthentication,)
+
+    async def post(self, request):
+        serializer = PredictSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        inputs = {name: serializer.validated_data[name] for name in FEATURES}
+        final_grade, model_version = PredictService.predict_one(
+            inputs, seed=serializer.validated_data.get("seed")
+        )
+        if request.user.is_authenticated:
+            # Chỉ thêm vào buffer trong bộ nhớ, không chặn event loop
+            HistoryService.record(
+                request.user.id, inputs, final_grade, model_version,
+                cohort=serializer.validated_data.get("cohort")
+            )
+
+        return JsonResponse({
+            "finalGrade": final_grade,
+            "modelVersion": model_version,
+            "inputs": inputs
+        }, status=status.HTTP_200_OK)
+
+
+class AsyncPredictBatchView(AsyncAPIView):
+    authentication_classes = (JWTAuthentication,)
+
+    async def post(self, request):
+        students = request.data.get("students")
+        seed = request.data.get("seed")
+        if not isinstance(students, (list, dict)):
+            return JsonResponse(
+                {"students": ["A list of students is required."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+            return JsonResponse(
+                {"seed": ["A valid non-negative integer is required."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Batch lớn tốn CPU, chạy ngoài event loop
+        grades, model_version = await sync_to_async(PredictService.predict_batch, thread_sensitive=False)(
+            students, seed=seed
+        )
+        return JsonResponse({
+            "count": len(grades),
+            "modelVersion": model_version,
+            "grades": grades.tolist()
+        }, status=status.HTTP_200_OK)
+
+
+class AsyncPredictSweepView(AsyncAPIView):
+    authentication_classes = (JWTAuthentication,)
+
+    async def post(self, request):
+        serializer = SweepSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        inputs = {name: serializer.validated_data["inputs"][name] for name in FEATURES}
+        axes = serializer.validated_data["sweep"]
+        # Lưới lớn tốn CPU, chạy ngoài event loop
+        grades, values, model_version = await sync_to_async(PredictService.sweep, thread_sensitive=False)(
+            inputs, axes
+        )
+        return JsonResponse(sweep_response(inputs, axes, grades, values, model_version), status=status.HTTP_200_OK)
+
+
+class AsyncPredictionHistoryView(ConditionalGetMixin, AsyncAPIView):
+    authentication_classes = (JWTAuthentication,)
+    login_required = True
+
+    def get_etag(self, request):
+        return history_etag(request.GET, request.user.id)
+
+    async def get(self, request):
+        try:
+            limit = int(request.GET.get("limit", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return JsonResponse({"limit": ["A valid integer is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        results, next_cursor = await HistoryService.alist_for_user(
+            request.user.id, cursor=request.GET.get("cursor"), limit=limit
+        )
+        return JsonResponse({
+            "results": results,
+            "next": next_cursor
+        }, status=status.HTTP_200_OK)
+
+
+class AsyncPredictionExportView(AsyncAPIView):
+    authentication_classes = (JWTAuthentication,)
+    login_required = True
+
+    async def get(self, request):
+        scope, key, days, encoder = export_params(request.GET, request.user.id)
+        if scope == "cohort" and not await sync_to_async(can_view_cohort, thread_sensitive=False)(request.user.id, key):
+            raise PermissionDenied(COHORT_DENIED)
+        chunks = ExportService.astream(ExportService.acursor(scope, key, days), encoder)
+        return export_response(chunks, scope, key, encoder)
+
+
+class AsyncJobResultsView(AsyncAPIView):
+    authentication_classes = (JWTAuthentication,)
+    login_required = True
+
+    async def get(self, request, job_id):
+        job = await sync_to_async(JobService.get_for_user, thread_sensitive=False)(job_id, request.user.id)
+        if job is None:
+            return JsonResponse({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        if job["status"] != "done":
+            return JsonResponse(job_not_ready(job), status=status.HTTP_409_CONFLICT)
+        return results_response(JobService.astream_results(JobService.aresult_cursor(job["_id"])), job)
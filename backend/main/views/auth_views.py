@@ -1,15 +1,24 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.exceptions import ValidationError
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from main.openapi import swagger_auto_schema
+from main import openapi
 
-from main.serializers import RegisterSerializer
+from main.serializers import LoginSerializer, RegisterSerializer
 from main.services.auth_services import AuthService
+from main.throttling import LoginIPThrottle, LoginUsernameThrottle, RegisterIPThrottle
+
+
+logger = logging.getLogger(__name__)
 
 
 class RegisterView(APIView):
+    authentication_classes = ()
+    throttle_classes = (RegisterIPThrottle,)
+
     @swagger_auto_schema(
         operation_description="Register a new user",
         request_body=RegisterSerializer,
@@ -36,16 +45,16 @@ class RegisterView(APIView):
                         }
                     }
                 }
-            )
+            ),
+            429: openapi.Response(description="Too many registrations from this IP, see Retry-After")
         }
     )
     def post(self, request):
         try:
-            print(f"DEBUG: Register request data: {request.data}")
+            logger.debug("register request", extra={"data": request.data})
             serializer = RegisterSerializer(data=request.data)
 
             if serializer.is_valid():
-                print(f"DEBUG: Serializer valid data: {serializer.validated_data}")
                 user = AuthService.register_user(serializer.validated_data)
                 return Response({
                     "message": "Register successful",
@@ -55,19 +64,21 @@ class RegisterView(APIView):
                     }
                 }, status=status.HTTP_201_CREATED)
 
-            print(f"DEBUG: Serializer errors: {serializer.errors}")
+            logger.debug("register rejected", extra={"errors": serializer.errors})
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except ValidationError as e:
-            print(f"DEBUG: ValidationError: {e.detail}")
+            logger.debug("register rejected", extra={"errors": e.detail})
             return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            print(f"DEBUG: Unexpected error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("register failed")
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 class LoginView(APIView):
+    authentication_classes = ()
+    # Chặn trước khi tra user và hash mật khẩu
+    throttle_classes = (LoginIPThrottle, LoginUsernameThrottle)
+
     @swagger_auto_schema(
         operation_description="Login user",
         request_body=openapi.Schema(
@@ -102,21 +113,19 @@ class LoginView(APIView):
                         "details": {"detail": "Invalid username or password"}
                     }
                 }
-            )
+            ),
+            429: openapi.Response(description="Too many attempts for this IP or username, see Retry-After")
         }
     )
     def post(self, request):
         try:
-            username = request.data.get("username")
-            password = request.data.get("password")
+            serializer = LoginSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            if not username or not password:
-                return Response(
-                    {"detail": "Username and Password are required"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            tokens = AuthService.login_user(username, password)
+            tokens = AuthService.login_user(
+                serializer.validated_data["username"], serializer.validated_data["password"]
+            )
             return Response({
                 "message": "Login successful",
                 **tokens
@@ -125,3 +134,48 @@ class LoginView(APIView):
             return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class RefreshView(APIView):
+    authentication_classes = ()
+
+    @swagger_auto_schema(
+        operation_description="Exchange a refresh token for a new access/refresh pair (the old refresh token is revoked)",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'refresh': openapi.Schema(type=openapi.TYPE_STRING, description='refresh token'),
+            },
+            required=['refresh']
+        ),
+        responses={
+            200: openapi.Response(
+                description="New tokens",
+                examples={
+                    "application/json": {
+                        "access": "jwt_token_here",
+                        "refresh": "refresh_token_here"
+                    }
+                }
+            ),
+            401: openapi.Response(
+                description="Invalid, expired or already used refresh token",
+                examples={"application/json": {"detail": "Refresh token has been revoked"}}
+            )
+        }
+    )
+    def post(self, request):
+        try:
+            refresh_token = request.data.get("refresh")
+            if not refresh_token or not isinstance(refresh_token, str):
+                return Response(
+                    {"detail": "Refresh token is required"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            tokens = AuthService.refresh_tokens(refresh_token)
+            return Response(tokens, status=status.HTTP_200_OK)
+        except AuthenticationFailed as e:
+            return Response({"detail": e.detail}, status=status.HTTP_401_UNAUTHORIZED)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
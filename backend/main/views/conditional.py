@@ -0,0 +1,62 @@
+import hashlib
+
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class NotModified(Exception):
+    pass
+
+
+def make_etag(*parts):
+    """Strong ETag from the values a response depends on"""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match comparison (weak, so gzip'd W/ copies from nginx still match)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ConditionalGetMixin:
+    """
+    ETag / If-None-Match for GET views. get_etag() must be cheap: it runs
+    after authentication and before the handler, so a client whose copy is
+    current gets a 304 without the handler's query ever running.
+
+    Works with DRF's APIView (initial / finalize_response) and with
+    AsyncAPIView, which calls not_modified() and cache_headers() itself.
+    """
+    cache_control = "private, no-cache"
+
+    def get_etag(self, request, *args, **kwargs):
+        return None
+
+    def not_modified(self, request, *args, **kwargs):
+        """Compute self.etag; True when the client already has this version"""
+        self.etag = self.get_etag(request, *args, **kwargs) if request.method in ("GET", "HEAD") else None
+        return self.etag is not None and etag_matches(request.headers.get("If-None-Match"), self.etag)
+
+    def cache_headers(self, response):
+        if getattr(self, "etag", None) and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = self.etag
+            response["Cache-Control"] = self.cache_control
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.not_modified(request, *args, **kwargs):
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        return self.cache_headers(super().finalize_response(request, response, *args, **kwargs))
@@ -0,0 +1,208 @@
+from django.http import StreamingHttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from main.openapi import swagger_auto_schema
+from main import openapi
+from main.permissions import CanViewCohort
+
+from main.services.analytics_services import MAX_DAYS, AnalyticsService
+from main.services.export_services import ENCODERS, ExportService
+from main.services.history_services import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, HistoryService
+from main.views.conditional import ConditionalGetMixin, make_etag
+
+
+DEFAULT_DAYS = 30
+SOURCES = {"rollup": AnalyticsService.from_rollups, "predictions": AnalyticsService.from_predictions}
+
+
+def history_etag(params, user_id):
+    """Changes whenever a flush adds predictions for the user, and per page"""
+    version = HistoryService.history_version(user_id)
+    return make_etag("history", user_id, version, params.get("cursor", ""), params.get("limit", ""))
+
+
+class PredictionHistoryView(ConditionalGetMixin, APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get_etag(self, request):
+        return history_etag(request.query_params, request.user.id)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Prediction history of the current user, newest first (cursor-paginated). "
+            "Send the ETag back in If-None-Match to get a 304 while nothing new was recorded."
+        ),
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='value of "next" from the previous page'),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f'page size (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})'),
+        ],
+        responses={
+            200: openapi.Response(
+                description="One page of predictions",
+                examples={
+                    "application/json": {
+                        "results": [{
+                            "id": "665f1c2e9b1e8a3f4c2d1a0b",
+                            "timestamp": "2024-12-28T10:00:00+00:00",
+                            "finalGrade": 78.5,
+                            "modelVersion": "baseline",
+                            "inputs": {
+                                "studyHourPerWeek": 20,
+                                "previousGrade": 80,
+                                "attendanceRate": 95,
+                                "extracurricularActivities": 2
+                            }
+                        }],
+                        "next": "MTczNTM4MDAwMDAwMDo2NjVmMWMyZTliMWU4YTNmNGMyZDFhMGI"
+                    }
+                }
+            ),
+            304: openapi.Response(description="Not modified since the ETag in If-None-Match"),
+            401: openapi.Response(description="Missing or invalid token")
+        }
+    )
+    def get(self, request):
+        try:
+            try:
+                limit = int(request.query_params.get("limit", DEFAULT_PAGE_SIZE))
+            except ValueError:
+                return Response({"limit": ["A valid integer is required."]}, status=status.HTTP_400_BAD_REQUEST)
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+            results, next_cursor = HistoryService.list_for_user(
+                request.user.id, cursor=request.query_params.get("cursor"), limit=limit
+            )
+            return Response({
+                "results": results,
+                "next": next_cursor
+            }, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class PredictionAnalyticsView(APIView):
+    permission_classes = (IsAuthenticated, CanViewCohort)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Aggregates of the current user's predictions, or of a cohort's with ?cohort= "
+            "(staff, or users granted the cohort), over the last `days` days: grade "
+            "mean/std/min/max, feature means, grade distribution in 10-point buckets and "
+            "the mean grade per day"
+        ),
+        manual_parameters=[
+            openapi.Parameter('cohort', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='cohort name given when predicting'),
+            openapi.Parameter('days', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f'window in days including today (default 30, max {MAX_DAYS})'),
+            openapi.Parameter('source', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(SOURCES),
+                              description='"rollup" (default): daily rollups; "predictions": aggregate the raw history'),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Aggregates",
+                examples={
+                    "application/json": {
+                        "scope": "cohort",
+                        "key": "12A1",
+                        "days": 30,
+                        "source": "rollup",
+                        "count": 42,
+                        "grade": {"mean": 71.3, "std": 8.9, "min": 52.0, "max": 93.5},
+                        "featureMeans": {
+                            "studyHourPerWeek": 14.2,
+                            "previousGrade": 70.1,
+                            "attendanceRate": 88.4,
+                            "extracurricularActivities": 1.6
+                        },
+                        "distribution": [{"from": 50, "to": 60, "count": 6}],
+                        "timeline": [{"day": "2024-12-28", "count": 5, "meanGrade": 72.4}]
+                    }
+                }
+            ),
+            400: openapi.Response(description="Invalid parameter"),
+            401: openapi.Response(description="Missing or invalid token"),
+            403: openapi.Response(description="No access to the cohort")
+        }
+    )
+    def get(self, request):
+        try:
+            try:
+                days = int(request.query_params.get("days", DEFAULT_DAYS))
+            except ValueError:
+                return Response({"days": ["A valid integer is required."]}, status=status.HTTP_400_BAD_REQUEST)
+            days = max(1, min(days, MAX_DAYS))
+            source = request.query_params.get("source", "rollup")
+            if source not in SOURCES:
+                return Response({"source": [f"Choose one of {', '.join(SOURCES)}."]},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            cohort = request.query_params.get("cohort", "").strip()
+            scope, key = ("cohort", cohort) if cohort else ("user", str(request.user.id))
+            return Response(SOURCES[source](scope, key, days), status=status.HTTP_200_OK)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def export_response(chunks, scope, key, encoder):
+    response = StreamingHttpResponse(chunks, content_type=encoder.content_type)
+    response["Content-Disposition"] = f'attachment; filename="{ExportService.filename(scope, key, encoder)}"'
+    response["X-Accel-Buffering"] = "no"  # nginx chuyển tiếp từng chunk thay vì gom vào file tạm
+    return response
+
+
+def export_params(params, user_id):
+    """(scope, key, days, encoder) from the query string, raises ValidationError"""
+    days = params.get("days")
+    if days is not None:
+        try:
+            days = max(1, min(int(days), MAX_DAYS))
+        except ValueError:
+            raise ValidationError({"days": ["A valid integer is required."]})
+    cohort = params.get("cohort", "").strip()
+    scope, key = ("cohort", cohort) if cohort else ("user", str(user_id))
+    return scope, key, days, ExportService.encoder(params.get("type", "csv"), scope)
+
+
+class PredictionExportView(APIView):
+    permission_classes = (IsAuthenticated, CanViewCohort)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Download every prediction of the current user, or of a cohort with ?cohort= "
+            "(staff, or users granted the cohort; without userId), oldest first. Streamed from the database: starts immediately and uses constant "
+            "server memory whatever the size."
+        ),
+        manual_parameters=[
+            openapi.Parameter('type', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(ENCODERS),
+                              description='file format (default csv)'),
+            openapi.Parameter('cohort', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='cohort name given when predicting'),
+            openapi.Parameter('days', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f'only the last N days (default: everything, max {MAX_DAYS})'),
+        ],
+        responses={
+            200: openapi.Response(description="CSV or Parquet file (attachment)"),
+            400: openapi.Response(description="Invalid parameter"),
+            401: openapi.Response(description="Missing or invalid token"),
+            403: openapi.Response(description="No access to the cohort")
+        }
+    )
+    def get(self, request):
+        try:
+            scope, key, days, encoder = export_params(request.query_params, request.user.id)
+            chunks = ExportService.stream(ExportService.cursor(scope, key, days), encoder)
+            return export_response(chunks, scope, key, encoder)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,125 @@
+from django.http import StreamingHttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from main.openapi import swagger_auto_schema
+from main import openapi
+
+from main.services.job_services import JobService, serialize_job
+from main.services.predict_services import FEATURES
+
+
+JOB_EXAMPLE = {
+    "id": "6660a1b29b1e8a3f4c2d1a0c",
+    "status": "running",
+    "filename": "school.csv",
+    "totalRows": 250000,
+    "processedRows": 120000,
+    "invalidRows": 12,
+    "progress": 0.48,
+    "chunks": {"total": 50, "done": 24},
+    "rowsPerSec": 61000.0,
+    "etaSeconds": 2.1,
+    "modelVersions": ["baseline"],
+    "error": None,
+    "createdAt": "2024-12-28T10:00:00+00:00",
+    "startedAt": "2024-12-28T10:00:01+00:00",
+    "finishedAt": None
+}
+
+
+def results_response(chunks, job):
+    response = StreamingHttpResponse(chunks, content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="predictions-{job["_id"]}.csv"'
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def job_not_ready(job):
+    return {"detail": f"Job is {job['status']}, results are available once it is done.", "status": job["status"]}
+
+
+class JobCreateView(APIView):
+    permission_classes = (IsAuthenticated,)
+    parser_classes = (MultiPartParser,)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Upload a CSV of students (header with " + ", ".join(FEATURES) + ", other columns "
+            "are ignored) to be scored in the background. Returns the job at once; poll "
+            "GET /jobs/<id>/ for progress and download GET /jobs/<id>/results/ when done."
+        ),
+        manual_parameters=[
+            openapi.Parameter('file', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True,
+                              description='UTF-8 CSV with a header row'),
+        ],
+        responses={
+            202: openapi.Response(description="Job queued", examples={"application/json": {
+                **JOB_EXAMPLE, "status": "queued", "processedRows": 0, "progress": 0.0,
+            }}),
+            400: openapi.Response(description="Missing file, bad header or too many rows"),
+            401: openapi.Response(description="Missing or invalid token")
+        }
+    )
+    def post(self, request):
+        try:
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response({"file": ["A CSV file is required."]}, status=status.HTTP_400_BAD_REQUEST)
+            job = JobService.create(request.user.id, upload)
+            response = Response(serialize_job(job), status=status.HTTP_202_ACCEPTED)
+            response["Location"] = f"{request.path.rstrip('/')}/{job['_id']}/"
+            return response
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class JobDetailView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @swagger_auto_schema(
+        operation_description="Progress and throughput of one of the current user's jobs",
+        responses={
+            200: openapi.Response(description="Job", examples={"application/json": JOB_EXAMPLE}),
+            404: openapi.Response(description="No such job")
+        }
+    )
+    def get(self, request, job_id):
+        try:
+            job = JobService.get_for_user(job_id, request.user.id)
+            if job is None:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            return Response(serialize_job(job), status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class JobResultsView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Scored rows of a finished job as CSV (row, the four inputs, finalGrade), in upload "
+            "order. Rows with missing or out-of-range inputs have an empty finalGrade."
+        ),
+        responses={
+            200: openapi.Response(description="CSV file (attachment)"),
+            404: openapi.Response(description="No such job"),
+            409: openapi.Response(description="Job not done yet")
+        }
+    )
+    def get(self, request, job_id):
+        try:
+            job = JobService.get_for_user(job_id, request.user.id)
+            if job is None:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            if job["status"] != "done":
+                return Response(job_not_ready(job), status=status.HTTP_409_CONFLICT)
+            return results_response(JobService.stream_results(JobService.result_cursor(job["_id"])), job)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,27 @@
+import hmac
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from main.metrics import registry
+
+
+def scrape_allowed(request):
+    """METRICS_TOKEN as a bearer token when set, otherwise the client address must be in METRICS_ALLOWED_IPS"""
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        return hmac.compare_digest(supplied.encode(), settings.METRICS_TOKEN.encode())
+    # REMOTE_ADDR, không phải X-Forwarded-For (client tự đặt được)
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(address in network for network in settings.METRICS_ALLOWED_IPS)
+
+
+def metrics(request):
+    """Prometheus text exposition of this worker's metrics (denied by nginx, see scrape_allowed)"""
+    if not scrape_allowed(request):
+        return HttpResponseForbidden("Forbidden\n", content_type="text/plain")
+    return HttpResponse(registry.expose(), content_type="text/plain; version=0.0.4; charset=utf-8")
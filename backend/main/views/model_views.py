@@ -0,0 +1,62 @@
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from main.openapi import swagger_auto_schema
+from main import openapi
+
+from main.services.model_registry import model_registry
+from main.services.predict_services import FEATURES
+from main.views.conditional import ConditionalGetMixin, make_etag
+
+
+class ModelInfoView(ConditionalGetMixin, APIView):
+    # Công khai và giống nhau cho mọi client: nginx cache được (proxy_cache trong nginx.conf)
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    cache_control = f"public, max-age={settings.MODEL_INFO_MAX_AGE}"
+
+    def get_etag(self, request):
+        return make_etag("model", model_registry.get_model().version)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Version and coefficients of the model currently serving predictions. Cacheable: "
+            f"public for {settings.MODEL_INFO_MAX_AGE}s, then revalidate with If-None-Match."
+        ),
+        responses={
+            200: openapi.Response(
+                description="Active model",
+                examples={
+                    "application/json": {
+                        "version": "lr-20241228100000",
+                        "features": list(FEATURES),
+                        "intercept": 3.0,
+                        "weights": {
+                            "studyHourPerWeek": 0.25,
+                            "previousGrade": 0.5,
+                            "attendanceRate": 0.15,
+                            "extracurricularActivities": 0.2
+                        },
+                        "createdAt": "2024-12-28T10:00:00+00:00",
+                        "trainingMetrics": {"rmse": 4.99, "r2": 0.766}
+                    }
+                }
+            ),
+            304: openapi.Response(description="Not modified since the ETag in If-None-Match")
+        }
+    )
+    def get(self, request):
+        try:
+            model = model_registry.get_model()
+            return Response({
+                "version": model.version,
+                "features": list(FEATURES),
+                "intercept": model.intercept,
+                "weights": {name: float(weight) for name, weight in zip(FEATURES, model.weights)},
+                "createdAt": model.meta.get("created_at"),
+                "trainingMetrics": model.meta.get("training_metrics"),
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,180 @@
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from main.openapi import swagger_auto_schema
+from main import openapi
+
+from main.serializers import PredictSerializer, SweepSerializer
+from main.services.history_services import HistoryService
+from main.services.predict_services import FEATURES, PredictService
+
+
+class PredictView(APIView):
+    @swagger_auto_schema(
+        operation_description="Predict the final grade of one student (saved to the history when logged in)",
+        request_body=PredictSerializer,
+        responses={
+            200: openapi.Response(
+                description="Prediction result",
+                examples={
+                    "application/json": {
+                        "finalGrade": 78.5,
+                        "modelVersion": "baseline",
+                        "inputs": {
+                            "studyHourPerWeek": 20,
+                            "previousGrade": 80,
+                            "attendanceRate": 95,
+                            "extracurricularActivities": 2
+                        }
+                    }
+                }
+            ),
+            400: openapi.Response(description="Validation error")
+        }
+    )
+    def post(self, request):
+        try:
+            serializer = PredictSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            inputs = {name: serializer.validated_data[name] for name in FEATURES}
+            final_grade, model_version = PredictService.predict_one(
+                inputs, seed=serializer.validated_data.get("seed")
+            )
+            if request.user.is_authenticated:
+                HistoryService.record(
+                    request.user.id, inputs, final_grade, model_version,
+                    cohort=serializer.validated_data.get("cohort")
+                )
+
+            return Response({
+                "finalGrade": final_grade,
+                "modelVersion": model_version,
+                "inputs": inputs
+            }, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class PredictBatchView(APIView):
+    @swagger_auto_schema(
+        operation_description=(
+            "Predict the final grades of many students in one vectorized pass. "
+            "`students` is either a list of records or an object of feature columns."
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'students': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            name: openapi.Schema(type=openapi.TYPE_NUMBER) for name in FEATURES
+                        }
+                    )
+                ),
+                'seed': openapi.Schema(type=openapi.TYPE_INTEGER, description='optional noise seed'),
+            },
+            required=['students']
+        ),
+        responses={
+            200: openapi.Response(
+                description="Predicted grades, in input order",
+                examples={
+                    "application/json": {
+                        "count": 2,
+                        "modelVersion": "baseline",
+                        "grades": [78.5, 64.0]
+                    }
+                }
+            ),
+            400: openapi.Response(description="Validation error")
+        }
+    )
+    def post(self, request):
+        try:
+            students = request.data.get("students")
+            seed = request.data.get("seed")
+            if not isinstance(students, (list, dict)):
+                return Response(
+                    {"students": ["A list of students is required."]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+                return Response(
+                    {"seed": ["A valid non-negative integer is required."]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            grades, model_version = PredictService.predict_batch(students, seed=seed)
+            return Response({
+                "count": len(grades),
+                "modelVersion": model_version,
+                "grades": grades.tolist()
+            }, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class PredictSweepView(APIView):
+    @swagger_auto_schema(
+        operation_description=(
+            "What-if grid: predict the final grade while one or two features vary over a range, "
+            "the others fixed at `inputs`. `grades` is a list (one feature) or a list of rows "
+            f"(two features, rows follow the first). At most {settings.PREDICT_SWEEP_MAX_POINTS} "
+            f"values per feature and {settings.PREDICT_SWEEP_MAX_CELLS} points in total."
+        ),
+        request_body=SweepSerializer,
+        responses={
+            200: openapi.Response(
+                description="Prediction surface",
+                examples={
+                    "application/json": {
+                        "modelVersion": "baseline",
+                        "inputs": {
+                            "studyHourPerWeek": 20,
+                            "previousGrade": 80,
+                            "attendanceRate": 95,
+                            "extracurricularActivities": 2
+                        },
+                        "axes": [{"feature": "studyHourPerWeek", "values": [20.0, 25.0, 30.0]}],
+                        "grades": [78.5, 81.2, 83.9]
+                    }
+                }
+            ),
+            400: openapi.Response(description="Validation error or grid too large")
+        }
+    )
+    def post(self, request):
+        try:
+            serializer = SweepSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            inputs = {name: serializer.validated_data["inputs"][name] for name in FEATURES}
+            axes = serializer.validated_data["sweep"]
+            grades, values, model_version = PredictService.sweep(inputs, axes)
+            return Response(sweep_response(inputs, axes, grades, values, model_version), status=status.HTTP_200_OK)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def sweep_response(inputs, axes, grades, values, model_version):
+    return {
+        "modelVersion": model_version,
+        "inputs": inputs,
+        "axes": [
+            {"feature": axis["feature"], "values": axis_values.tolist()} for axis, axis_values in zip(axes, values)
+        ],
+        "grades": grades.tolist(),
+    }